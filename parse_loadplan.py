@@ -7,11 +7,24 @@ Ground Truth 기준 BAL 컬럼 해석:
 """
 
 import pandas as pd
+import argparse
+import contextlib
+import importlib.util
 import json
+import os
+import pickle
 import re
+import sys
+import tempfile
 import time
 from datetime import datetime
 from pathlib import Path
+from pandas.io.parsers import TextParser
+
+try:
+    import resource  # 피크 RSS 측정 (Unix 전용)
+except ImportError:
+    resource = None
 
 # Factory별 파일 경로
 FACTORY_FILES = {
@@ -21,6 +34,34 @@ FACTORY_FILES = {
     'D': 'D- LOADPLAN ASSEMBLY OF RACHGIA FACTORY D  12.20.2025.xlsx'
 }
 
+# 데이터는 5행부터 시작 (앞 4행은 제목/헤더)
+DATA_START_ROW = 4
+
+# M/D 날짜 연도 기준: (시작 연도, 시작 월)부터 12개월 구간에 들어가도록 연도 결정
+# 12.20.2025 로드플랜 기준 2025-10 ~ 2026-09 (10~12월 → 2025, 1~9월 → 2026)
+# 과거 로드플랜은 year_window_for(로드플랜 날짜)로 바꿔서 파싱
+DEFAULT_YEAR_WINDOW = (2025, 10)
+
+# 스냅샷 기준 구간: 스냅샷 월 2개월 전 ~ 9개월 후 (지난 선적분은 짧게, 앞으로의 일정은 길게)
+YEAR_WINDOW_LOOKBACK_MONTHS = 2
+
+# 청크 모드 기본 배치 크기 (행)
+DEFAULT_BATCH_SIZE = 2000
+
+# Excel 읽기 엔진 (pd.read_excel engine → 필요한 모듈). 설치된 것만 사용 가능
+EXCEL_ENGINES = {
+    'calamine': 'python_calamine',  # Rust 기반, openpyxl보다 수 배 빠름 (pip install python-calamine)
+    'openpyxl': 'openpyxl',
+}
+DEFAULT_ENGINE = 'openpyxl'
+ENGINE_ENV = 'LOADPLAN_EXCEL_ENGINE'  # auto | calamine | openpyxl
+
+# 엔진 보정 결과 (scripts/benchmark_pipeline.py engines 가 기록, auto일 때 사용)
+ENGINE_CALIBRATION_FILE = Path(__file__).parent / '.pipeline_cache' / 'excel_engine.json'
+
+# 메모리 프로파일러 (scripts/memory_profile.py가 --profile-memory일 때 설정)
+stage_profiler = None
+
 # Factory A 컬럼 매핑 (0-indexed)
 COLUMNS_A = {
     'unit': 0,
@@ -244,7 +285,15 @@ def is_numeric(value):
         return False
 
 
-def parse_date_to_string(value, default_year=2025):
+def year_window_for(snapshot):
+    """로드플랜 날짜 (date 또는 'YYYY-MM-DD') → M/D 날짜 연도 구간 (시작 연도, 시작 월) - 스냅샷 월 기준 앞뒤 12개월"""
+    if isinstance(snapshot, str):
+        snapshot = datetime.strptime(snapshot, '%Y-%m-%d').date()
+    start = snapshot.year * 12 + snapshot.month - 1 - YEAR_WINDOW_LOOKBACK_MONTHS
+    return start // 12, start % 12 + 1
+
+
+def parse_date_to_string(value, year_window=DEFAULT_YEAR_WINDOW):
     """날짜 값을 YYYY-MM-DD 문자열로 변환"""
     if pd.isna(value) or value is None:
         return None
@@ -258,7 +307,8 @@ def parse_date_to_string(value, default_year=2025):
     match = re.match(r'^(\d{1,2})/(\d{1,2})$', val_str)
     if match:
         month, day = int(match.group(1)), int(match.group(2))
-        year = default_year if month >= 10 else default_year + 1  # 10월 이후는 2025, 그 전은 2026
+        start_year, start_month = year_window
+        year = start_year if month >= start_month else start_year + 1  # 시작 월 이후는 시작 연도, 그 전은 다음 해
         return f'{year}-{month:02d}-{day:02d}'
 
     # YYYY.MM.DD 형식
@@ -274,7 +324,7 @@ def parse_date_to_string(value, default_year=2025):
     return val_str
 
 
-def parse_bal_column(value, quantity):
+def parse_bal_column(value, quantity, year_window=DEFAULT_YEAR_WINDOW):
     """
     BAL 컬럼 파싱 (Ground Truth 기준)
     - 날짜 = 전량 완료 (completed=qty, pending=0)
@@ -298,7 +348,7 @@ def parse_bal_column(value, quantity):
 
     # 날짜 형식 = 전량 완료 (Ground Truth)
     if is_date_format(value):
-        completion_date = parse_date_to_string(value)
+        completion_date = parse_date_to_string(value, year_window)
         return {
             'completed': qty,
             'pending': 0,
@@ -332,7 +382,7 @@ def parse_bal_column(value, quantity):
     return {'completed': 0, 'pending': qty, 'status': 'unknown', 'expected_date': None, 'raw_value': val_str}
 
 
-def parse_sdd(original, current):
+def parse_sdd(original, current, year_window=DEFAULT_YEAR_WINDOW):
     """SDD 값 파싱 (Current 우선)"""
     # Current 값 먼저 시도
     for val in [current, original]:
@@ -341,7 +391,7 @@ def parse_sdd(original, current):
         val_str = str(val).strip()
         if val_str and val_str not in ['00:00:00', '#N/A', 'nan']:
             if is_date_format(val):
-                return parse_date_to_string(val)
+                return parse_date_to_string(val, year_window)
             return val_str
     return None
 
@@ -392,214 +442,766 @@ def is_valid_quantity(value):
         return False
 
 
-def parse_factory_file(factory, filepath):
-    """단일 공장 파일 파싱"""
-    print(f'Parsing Factory {factory}: {filepath}')
+def get_factory_columns(factory):
+    """Factory별 컬럼 매핑 선택"""
+    if factory == 'A':
+        return COLUMNS_A
+    elif factory == 'B':
+        return COLUMNS_B
+    elif factory == 'C':
+        return COLUMNS_C
+    elif factory == 'D':
+        return COLUMNS_D
+    return COLUMNS_A  # 기본값
 
-    try:
-        df = pd.read_excel(filepath, header=None, skiprows=4)  # 데이터는 5행부터 시작
-    except Exception as e:
-        print(f'Error reading {filepath}: {e}')
-        return []
 
-    records = []
-    skipped_count = 0
-    error_count = 0
-    # 데이터 품질 카운터 (Agent #R03)
-    quality_stats = {
+def new_quality_stats():
+    """행 처리 카운터 + 데이터 품질 카운터 (Agent #R03)"""
+    return {
+        'records': 0,
+        'skipped': 0,
+        'errors': 0,
         'empty_destinations': 0,
         'invalid_dates': 0,
-        'auto_corrected': 0
+        'auto_corrected': 0,
+        'filtered': 0
     }
 
-    # Factory별 컬럼 매핑 선택
-    if factory == 'A':
-        cols = COLUMNS_A
-    elif factory == 'B':
-        cols = COLUMNS_B
-    elif factory == 'C':
-        cols = COLUMNS_C
-    elif factory == 'D':
-        cols = COLUMNS_D
+
+def build_row_filter(factories=None, seasons=None, destinations=None, sdd_from=None, sdd_to=None, open_only=False):
+    """
+    조건부 파싱 필터 (조건이 하나도 없으면 None)
+
+    factories / seasons / destinations: 허용 값 목록 (하나라도 같으면 통과, 시즌/목적지는 대소문자 무시)
+    sdd_from / sdd_to: sddYearMonth 범위 'YYYY-MM' (양 끝 포함, SDD가 없는 행은 제외)
+    open_only: wh_out이 완료되지 않은 오더만
+    """
+    for value in (sdd_from, sdd_to):
+        if value and not re.match(r'^\d{4}-\d{2}$', value):
+            raise ValueError(f'SDD 범위는 YYYY-MM 형식이어야 합니다: {value!r}')
+    row_filter = {
+        'factories': {f.strip().upper() for f in factories} if factories else None,
+        'seasons': {s.strip().casefold() for s in seasons} if seasons else None,
+        'destinations': {d.strip().casefold() for d in destinations} if destinations else None,
+        'sdd_from': sdd_from or None,
+        'sdd_to': sdd_to or None,
+        'open_only': bool(open_only),
+    }
+    return row_filter if any(row_filter.values()) else None
+
+
+def factory_selected(factory, row_filter):
+    """공장 필터 통과 여부 (탈락하면 파일을 읽지 않음)"""
+    return row_filter is None or row_filter['factories'] is None or factory in row_filter['factories']
+
+
+def text_selected(value, allowed):
+    return allowed is None or value.casefold() in allowed
+
+
+def sdd_selected(sdd_year_month, row_filter):
+    if row_filter['sdd_from'] is None and row_filter['sdd_to'] is None:
+        return True
+    if not sdd_year_month:
+        return False
+    if row_filter['sdd_from'] and sdd_year_month < row_filter['sdd_from']:
+        return False
+    return not (row_filter['sdd_to'] and sdd_year_month > row_filter['sdd_to'])
+
+
+def record_matches(record, row_filter):
+    """완성된 레코드가 필터를 통과하는지 (parse_row 조기 탈락과 같은 기준)"""
+    if row_filter is None:
+        return True
+    return (factory_selected(record['factory'], row_filter)
+            and text_selected(record['destination'], row_filter['destinations'])
+            and text_selected(record['season'], row_filter['seasons'])
+            and sdd_selected(record['sddYearMonth'], row_filter)
+            and not (row_filter['open_only'] and record['production']['wh_out']['status'] == 'completed'))
+
+
+def parse_stage_cell(row, col_idx, qty, year_window=DEFAULT_YEAR_WINDOW):
+    """BAL 셀 하나 파싱 (컬럼이 없으면 미착수)"""
+    if col_idx < len(row):
+        return parse_bal_column(row.iloc[col_idx], qty, year_window)
+    return {'completed': 0, 'pending': qty, 'status': 'pending', 'expected_date': None}
+
+
+def parse_row(factory, row, cols, quality_stats, row_filter=None, year_window=DEFAULT_YEAR_WINDOW):
+    """
+    데이터 행 하나를 레코드로 변환
+
+    헤더/합계 행이나 수량이 없는 행은 None.
+    quality_stats의 skipped/품질 카운터를 누적한다.
+    row_filter(build_row_filter)가 있으면 싼 컬럼부터 확인해서
+    탈락한 행은 SDD/BAL 단계 파싱 전에 None (filtered 카운터).
+    year_window: M/D 날짜 연도 구간 (시작 연도, 시작 월) (year_window_for)
+    """
+    # 헤더 행 스킵
+    if is_header_row(row, cols):
+        quality_stats['skipped'] += 1
+        return None
+
+    quantity = row.iloc[cols['quantity']] if cols['quantity'] < len(row) else None
+
+    # 유효한 수량인지 확인
+    if not is_valid_quantity(quantity):
+        return None
+
+    qty = int(float(str(quantity).strip()))
+
+    # 기본 정보 체크 (model 또는 unit이 있어야 데이터 행)
+    unit_val = row.iloc[cols['unit']] if cols['unit'] < len(row) else None
+    model_val = row.iloc[cols['model']] if cols['model'] < len(row) else None
+
+    unit_str = str(unit_val).strip() if pd.notna(unit_val) else ''
+    model_str = str(model_val).strip() if pd.notna(model_val) else ''
+
+    # 합계 행 스킵 (모델과 유닛이 모두 비어있으면 합계/소계 행)
+    if not unit_str and not model_str:
+        quality_stats['skipped'] += 1
+        return None
+
+    # 기본 정보
+    # Destination 자동 수정 (Agent #R03: Data Quality Guardian)
+    dest_raw = row.iloc[cols['destination']] if cols['destination'] < len(row) else None
+    dest_str = str(dest_raw).strip() if pd.notna(dest_raw) else ''
+
+    # 빈 destination 자동 수정
+    if not dest_str or dest_str in ['nan', 'None', '#N/A']:
+        dest_str = 'Unknown'
+        quality_stats['empty_destinations'] += 1
+        quality_stats['auto_corrected'] += 1
+
+    season_str = str(row.iloc[cols['season']]).strip() if pd.notna(row.iloc[cols['season']]) else ''
+
+    # 조건부 파싱 1단계: 문자열 컬럼만으로 판단
+    if row_filter is not None and not (text_selected(dest_str, row_filter['destinations'])
+                                       and text_selected(season_str, row_filter['seasons'])):
+        quality_stats['filtered'] += 1
+        return None
+
+    # SDD (Current 우선) - 잘못된 날짜 검증
+    sdd_orig = row.iloc[cols['sdd_original']] if cols['sdd_original'] < len(row) else None
+    sdd_curr = row.iloc[cols['sdd_current']] if cols['sdd_current'] < len(row) else None
+
+    # '00:00:00' 형식 필터링
+    if sdd_curr and str(sdd_curr).strip() == '00:00:00':
+        quality_stats['invalid_dates'] += 1
+        sdd_curr = None
+    if sdd_orig and str(sdd_orig).strip() == '00:00:00':
+        quality_stats['invalid_dates'] += 1
+        sdd_orig = None
+
+    sdd_value = parse_sdd(sdd_orig, sdd_curr, year_window) or ''
+    sdd_year_month = get_year_month(sdd_value) or ''
+
+    # 조건부 파싱 2단계: SDD 월 범위 → wh_out 셀 하나 (나머지 BAL 단계는 통과한 행만)
+    wh_out = None
+    if row_filter is not None:
+        if not sdd_selected(sdd_year_month, row_filter):
+            quality_stats['filtered'] += 1
+            return None
+        if row_filter['open_only']:
+            wh_out = parse_stage_cell(row, cols['wh_out_bal'], qty, year_window)
+            if wh_out['status'] == 'completed':
+                quality_stats['filtered'] += 1
+                return None
+
+    record = {
+        'factory': factory,
+        'unit': str(row.iloc[cols['unit']]).strip() if pd.notna(row.iloc[cols['unit']]) else '',
+        'season': season_str,
+        'model': str(row.iloc[cols['model']]).strip() if pd.notna(row.iloc[cols['model']]) else '',
+        'article': str(row.iloc[cols['article']]).strip() if pd.notna(row.iloc[cols['article']]) else '',
+        'color': str(row.iloc[cols['color']]).strip() if pd.notna(row.iloc[cols['color']]) else '',
+        'destination': dest_str,
+        'quantity': qty,
+        'poNumber': str(row.iloc[cols['setp']]).strip() if pd.notna(row.iloc[cols['setp']]) else '',
+    }
+
+    # CRD - 잘못된 날짜 검증 (Agent #R03)
+    crd_val = row.iloc[cols['crd']] if cols['crd'] < len(row) else None
+    if crd_val and str(crd_val).strip() == '00:00:00':
+        quality_stats['invalid_dates'] += 1
+        record['crd'] = ''
     else:
-        cols = COLUMNS_A  # 기본값
+        record['crd'] = parse_date_to_string(crd_val, year_window) if is_date_format(crd_val) else (str(crd_val).strip() if pd.notna(crd_val) else '')
+    record['crdYearMonth'] = get_year_month(record['crd']) or ''
 
-    for idx, row in df.iterrows():
-        try:
-            # 헤더 행 스킵
-            if is_header_row(row, cols):
-                skipped_count += 1
-                continue
+    record['sddValue'] = sdd_value
+    record['sddYearMonth'] = sdd_year_month
 
-            quantity = row.iloc[cols['quantity']] if cols['quantity'] < len(row) else None
+    # Code 04 (지연 승인)
+    code04 = row.iloc[cols['code04']] if cols['code04'] < len(row) else None
+    record['code04'] = str(code04).strip() if pd.notna(code04) and str(code04).strip() not in ['nan', '-', ''] else None
 
-            # 유효한 수량인지 확인
-            if not is_valid_quantity(quantity):
-                continue
+    # 아웃솔 벤더
+    outsole_vendor = row.iloc[cols['outsole_vendor']] if cols['outsole_vendor'] < len(row) else None
+    record['outsoleVendor'] = str(outsole_vendor).strip() if pd.notna(outsole_vendor) else ''
 
-            qty = int(float(str(quantity).strip()))
+    # MRP 정보
+    mrp_qty = row.iloc[cols['mrp_qty']] if cols['mrp_qty'] < len(row) else None
+    record['mrpQty'] = int(float(mrp_qty)) if pd.notna(mrp_qty) and is_numeric(mrp_qty) else None
 
-            # 기본 정보 체크 (model 또는 unit이 있어야 데이터 행)
-            unit_val = row.iloc[cols['unit']] if cols['unit'] < len(row) else None
-            model_val = row.iloc[cols['model']] if cols['model'] < len(row) else None
+    mrp_date = row.iloc[cols['mrp_date']] if cols['mrp_date'] < len(row) else None
+    record['mrpDate'] = parse_date_to_string(mrp_date, year_window) if is_date_format(mrp_date) else None
 
-            unit_str = str(unit_val).strip() if pd.notna(unit_val) else ''
-            model_str = str(model_val).strip() if pd.notna(model_val) else ''
+    # W.H return Fac (불량 리턴)
+    wh_return = row.iloc[cols['wh_return_fac']] if cols['wh_return_fac'] < len(row) else None
+    record['whReturnFac'] = int(float(wh_return)) if pd.notna(wh_return) and is_numeric(wh_return) else 0
 
-            # 합계 행 스킵 (모델과 유닛이 모두 비어있으면 합계/소계 행)
-            if not unit_str and not model_str:
-                skipped_count += 1
-                continue
+    # Inspection (검사 완료일)
+    inspection = row.iloc[cols['inspection']] if cols['inspection'] < len(row) else None
+    record['inspection'] = parse_date_to_string(inspection, year_window) if is_date_format(inspection) else None
 
-            # 기본 정보
-            # Destination 자동 수정 (Agent #R03: Data Quality Guardian)
-            dest_raw = row.iloc[cols['destination']] if cols['destination'] < len(row) else None
-            dest_str = str(dest_raw).strip() if pd.notna(dest_raw) else ''
-
-            # 빈 destination 자동 수정
-            if not dest_str or dest_str in ['nan', 'None', '#N/A']:
-                dest_str = 'Unknown'
-                quality_stats['empty_destinations'] += 1
-                quality_stats['auto_corrected'] += 1
-
-            record = {
-                'factory': factory,
-                'unit': str(row.iloc[cols['unit']]).strip() if pd.notna(row.iloc[cols['unit']]) else '',
-                'season': str(row.iloc[cols['season']]).strip() if pd.notna(row.iloc[cols['season']]) else '',
-                'model': str(row.iloc[cols['model']]).strip() if pd.notna(row.iloc[cols['model']]) else '',
-                'article': str(row.iloc[cols['article']]).strip() if pd.notna(row.iloc[cols['article']]) else '',
-                'color': str(row.iloc[cols['color']]).strip() if pd.notna(row.iloc[cols['color']]) else '',
-                'destination': dest_str,
-                'quantity': qty,
-                'poNumber': str(row.iloc[cols['setp']]).strip() if pd.notna(row.iloc[cols['setp']]) else '',
-            }
+    # Intertek (AQL 검사 여부)
+    if 'intertek' in cols:
+        intertek_val = row.iloc[cols['intertek']] if cols['intertek'] < len(row) else None
+        intertek_str = str(intertek_val).strip().upper() if pd.notna(intertek_val) else ''
+        # YES/Y/OK = AQL 검사 대상, NO/N/빈값 = 비대상
+        record['aql'] = intertek_str in ['YES', 'Y', 'OK', '1', 'TRUE', 'AQL']
+    else:
+        record['aql'] = False
+
+    # 생산 공정 데이터 (BAL 컬럼들)
+    production = {}
+
+    bal_columns = {
+        's_cut': cols['s_cut_bal'],
+        'pre_sew': cols['pre_sew_bal'],
+        'sew_input': cols['sew_input_bal'],
+        'sew_bal': cols['sew_bal'],
+        's_fit': cols['s_fit_bal'],
+        'ass_bal': cols['ass_bal'],
+        'wh_in': cols['wh_in_bal'],
+        'wh_out': cols['wh_out_bal']
+    }
 
-            # CRD - 잘못된 날짜 검증 (Agent #R03)
-            crd_val = row.iloc[cols['crd']] if cols['crd'] < len(row) else None
-            if crd_val and str(crd_val).strip() == '00:00:00':
-                quality_stats['invalid_dates'] += 1
-                record['crd'] = ''
-            else:
-                record['crd'] = parse_date_to_string(crd_val) if is_date_format(crd_val) else (str(crd_val).strip() if pd.notna(crd_val) else '')
-            record['crdYearMonth'] = get_year_month(record['crd']) or ''
-
-            # SDD (Current 우선) - 잘못된 날짜 검증
-            sdd_orig = row.iloc[cols['sdd_original']] if cols['sdd_original'] < len(row) else None
-            sdd_curr = row.iloc[cols['sdd_current']] if cols['sdd_current'] < len(row) else None
-
-            # '00:00:00' 형식 필터링
-            if sdd_curr and str(sdd_curr).strip() == '00:00:00':
-                quality_stats['invalid_dates'] += 1
-                sdd_curr = None
-            if sdd_orig and str(sdd_orig).strip() == '00:00:00':
-                quality_stats['invalid_dates'] += 1
-                sdd_orig = None
-
-            record['sddValue'] = parse_sdd(sdd_orig, sdd_curr) or ''
-            record['sddYearMonth'] = get_year_month(record['sddValue']) or ''
-
-            # Code 04 (지연 승인)
-            code04 = row.iloc[cols['code04']] if cols['code04'] < len(row) else None
-            record['code04'] = str(code04).strip() if pd.notna(code04) and str(code04).strip() not in ['nan', '-', ''] else None
-
-            # 아웃솔 벤더
-            outsole_vendor = row.iloc[cols['outsole_vendor']] if cols['outsole_vendor'] < len(row) else None
-            record['outsoleVendor'] = str(outsole_vendor).strip() if pd.notna(outsole_vendor) else ''
-
-            # MRP 정보
-            mrp_qty = row.iloc[cols['mrp_qty']] if cols['mrp_qty'] < len(row) else None
-            record['mrpQty'] = int(float(mrp_qty)) if pd.notna(mrp_qty) and is_numeric(mrp_qty) else None
-
-            mrp_date = row.iloc[cols['mrp_date']] if cols['mrp_date'] < len(row) else None
-            record['mrpDate'] = parse_date_to_string(mrp_date) if is_date_format(mrp_date) else None
-
-            # W.H return Fac (불량 리턴)
-            wh_return = row.iloc[cols['wh_return_fac']] if cols['wh_return_fac'] < len(row) else None
-            record['whReturnFac'] = int(float(wh_return)) if pd.notna(wh_return) and is_numeric(wh_return) else 0
-
-            # Inspection (검사 완료일)
-            inspection = row.iloc[cols['inspection']] if cols['inspection'] < len(row) else None
-            record['inspection'] = parse_date_to_string(inspection) if is_date_format(inspection) else None
-
-            # Intertek (AQL 검사 여부)
-            if 'intertek' in cols:
-                intertek_val = row.iloc[cols['intertek']] if cols['intertek'] < len(row) else None
-                intertek_str = str(intertek_val).strip().upper() if pd.notna(intertek_val) else ''
-                # YES/Y/OK = AQL 검사 대상, NO/N/빈값 = 비대상
-                record['aql'] = intertek_str in ['YES', 'Y', 'OK', '1', 'TRUE', 'AQL']
-            else:
-                record['aql'] = False
-
-            # 생산 공정 데이터 (BAL 컬럼들)
-            production = {}
-
-            bal_columns = {
-                's_cut': cols['s_cut_bal'],
-                'pre_sew': cols['pre_sew_bal'],
-                'sew_input': cols['sew_input_bal'],
-                'sew_bal': cols['sew_bal'],
-                's_fit': cols['s_fit_bal'],
-                'ass_bal': cols['ass_bal'],
-                'wh_in': cols['wh_in_bal'],
-                'wh_out': cols['wh_out_bal']
-            }
+    for process_name, col_idx in bal_columns.items():
+        if process_name == 'wh_out' and wh_out is not None:
+            production[process_name] = wh_out  # 필터 확인 때 이미 파싱
+        else:
+            production[process_name] = parse_stage_cell(row, col_idx, qty, year_window)
 
-            for process_name, col_idx in bal_columns.items():
-                if col_idx < len(row):
-                    bal_value = row.iloc[col_idx]
-                    production[process_name] = parse_bal_column(bal_value, qty)
-                else:
-                    production[process_name] = {'completed': 0, 'pending': qty, 'status': 'pending', 'expected_date': None}
-
-            # sew_prod_scan은 스캔 수량일 뿐, BAL 컬럼이 정확한 잔량/완료 정보
-            # sew_prod_scan으로 sew_bal을 덮어쓰지 않음
-
-            record['production'] = production
-
-            # 외주 잔량 (outsourcing_in_bal)
-            osc_in_bal = row.iloc[cols['outsourcing_in_bal']] if cols['outsourcing_in_bal'] < len(row) else None
-            osc_remaining = parse_bal_column(osc_in_bal, qty)
-            record['oscRemaining'] = osc_remaining.get('pending', qty)
-
-            # 편의용 잔량 필드들 (대시보드 표시용)
-            record['remaining'] = {
-                'osc': record['oscRemaining'],  # 외주 잔량
-                'sew': production.get('sew_bal', {}).get('pending', qty),  # 재봉 잔량
-                'ass': production.get('ass_bal', {}).get('pending', qty),  # 제화(조립) 잔량
-                'whIn': production.get('wh_in', {}).get('pending', qty),  # 창고입고 잔량
-                'whOut': production.get('wh_out', {}).get('pending', qty)  # 창고출고 잔량
-            }
-            records.append(record)
+    # sew_prod_scan은 스캔 수량일 뿐, BAL 컬럼이 정확한 잔량/완료 정보
+    # sew_prod_scan으로 sew_bal을 덮어쓰지 않음
 
-        except Exception as e:
-            error_count += 1
-            if error_count <= 5:  # 처음 5개 에러만 출력
-                print(f'  Warning: Row {idx}: {e}')
-            continue
+    record['production'] = production
+
+    # 외주 잔량 (outsourcing_in_bal)
+    osc_in_bal = row.iloc[cols['outsourcing_in_bal']] if cols['outsourcing_in_bal'] < len(row) else None
+    osc_remaining = parse_bal_column(osc_in_bal, qty, year_window)
+    record['oscRemaining'] = osc_remaining.get('pending', qty)
 
-    # 데이터 품질 리포트 (Agent #R03: Data Quality Guardian)
-    print(f'  Factory {factory}: {len(records)} records parsed, {skipped_count} header rows skipped, {error_count} errors')
+    # 편의용 잔량 필드들 (대시보드 표시용)
+    record['remaining'] = {
+        'osc': record['oscRemaining'],  # 외주 잔량
+        'sew': production.get('sew_bal', {}).get('pending', qty),  # 재봉 잔량
+        'ass': production.get('ass_bal', {}).get('pending', qty),  # 제화(조립) 잔량
+        'whIn': production.get('wh_in', {}).get('pending', qty),  # 창고입고 잔량
+        'whOut': production.get('wh_out', {}).get('pending', qty)  # 창고출고 잔량
+    }
+    return record
+
+
+def iter_records(factory, frames, cols, quality_stats, row_filter=None, year_window=DEFAULT_YEAR_WINDOW):
+    """DataFrame(들)의 행을 순서대로 레코드로 변환하는 제너레이터"""
+    for df in frames:
+        for idx, row in df.iterrows():
+            try:
+                record = parse_row(factory, row, cols, quality_stats, row_filter, year_window)
+            except Exception as e:
+                quality_stats['errors'] += 1
+                if quality_stats['errors'] <= 5:  # 처음 5개 에러만 출력
+                    print(f'  Warning: Row {idx}: {e}')
+                continue
+            if record is not None:
+                quality_stats['records'] += 1
+                yield record
+
+
+def print_quality_report(factory, quality_stats):
+    """데이터 품질 리포트 (Agent #R03: Data Quality Guardian)"""
+    print(f'  Factory {factory}: {quality_stats["records"]} records parsed, {quality_stats["skipped"]} header rows skipped, {quality_stats["errors"]} errors')
     if quality_stats['auto_corrected'] > 0 or quality_stats['invalid_dates'] > 0:
         print(f'  📊 Data Quality Report:')
         print(f'     - Empty destinations fixed: {quality_stats["empty_destinations"]}')
         print(f'     - Invalid dates filtered: {quality_stats["invalid_dates"]}')
         print(f'     - Total auto-corrections: {quality_stats["auto_corrected"]}')
+    if quality_stats['filtered'] > 0:
+        print(f'  🔎 Filtered out before stage parsing: {quality_stats["filtered"]} rows')
+
+
+def profile_stage(name):
+    """메모리 프로파일 구간 (프로파일러가 없으면 아무것도 하지 않음)"""
+    if stage_profiler is None:
+        return contextlib.nullcontext()
+    return stage_profiler.stage(name)
 
+
+def available_engines():
+    """설치된 Excel 읽기 엔진 목록 (EXCEL_ENGINES 순서)"""
+    return [engine for engine, module in EXCEL_ENGINES.items() if importlib.util.find_spec(module)]
+
+
+def engine_version(engine):
+    """엔진 모듈 버전 (보정 결과 유효성 확인용)"""
+    module = __import__(EXCEL_ENGINES[engine])
+    return getattr(module, '__version__', '')
+
+
+def load_engine_calibration(path=ENGINE_CALIBRATION_FILE):
+    """보정 결과의 엔진 (파일이 없거나 pandas/엔진 버전이 바뀌었으면 None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            calibration = json.load(f)
+        engine = calibration['engine']
+        if engine not in available_engines():
+            return None
+        if calibration.get('pandas') != pd.__version__ or calibration.get('version') != engine_version(engine):
+            return None
+        return engine
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def resolve_engine(engine=None):
+    """
+    Excel 읽기 엔진 결정
+
+    engine 인자 → LOADPLAN_EXCEL_ENGINE 환경 변수 → auto 순.
+    auto는 보정 결과(가장 빠르고 결과가 같은 엔진), 없으면 DEFAULT_ENGINE.
+    설치되지 않은 엔진을 지정하면 DEFAULT_ENGINE으로 대체한다.
+    """
+    engine = engine or os.environ.get(ENGINE_ENV) or 'auto'
+    if engine == 'auto':
+        return load_engine_calibration() or DEFAULT_ENGINE
+    if engine not in EXCEL_ENGINES:
+        print(f'  ⚠️ 알 수 없는 Excel 엔진 {engine!r} → {DEFAULT_ENGINE}')
+        return DEFAULT_ENGINE
+    if engine not in available_engines():
+        print(f'  ⚠️ Excel 엔진 {engine!r} 미설치 ({EXCEL_ENGINES[engine]}) → {DEFAULT_ENGINE}')
+        return DEFAULT_ENGINE
+    return engine
+
+
+def read_factory_frame(filepath, engine=None):
+    """공장 Excel → DataFrame (데이터는 5행부터 시작)"""
+    return pd.read_excel(filepath, header=None, skiprows=DATA_START_ROW, engine=resolve_engine(engine))
+
+
+def parse_factory_file(factory, filepath, engine=None, row_filter=None, year_window=DEFAULT_YEAR_WINDOW):
+    """
+    단일 공장 파일 파싱 (engine: Excel 읽기 엔진, 생략 시 resolve_engine 규칙)
+    row_filter: build_row_filter 결과 - 공장이 탈락하면 파일을 읽지 않음
+    year_window: M/D 날짜 연도 구간 (시작 연도, 시작 월) (과거 로드플랜은 year_window_for(로드플랜 날짜))
+    """
+    if not factory_selected(factory, row_filter):
+        print(f'Skipping Factory {factory}: not in factory filter')
+        return []
+    print(f'Parsing Factory {factory}: {filepath}')
+
+    try:
+        with profile_stage('excel_read'):
+            df = read_factory_frame(filepath, engine)
+    except Exception as e:
+        print(f'Error reading {filepath}: {e}')
+        return []
+
+    quality_stats = new_quality_stats()
+    with profile_stage('record_build'):
+        records = list(iter_records(factory, [df], get_factory_columns(factory), quality_stats, row_filter,
+                                    year_window))
+    print_quality_report(factory, quality_stats)
     return records
 
 
-def main():
-    # Performance measurement (Agent #R04)
+# ===== 청크 모드 (대용량 Excel 메모리 상한) =====
+
+def convert_cell(cell):
+    """openpyxl 셀 값 변환 (pd.read_excel openpyxl 엔진과 동일 규칙)"""
+    if cell.value is None:
+        return ''
+    elif cell.data_type == 'e':
+        return float('nan')
+    elif cell.data_type == 'n':
+        val = int(cell.value)
+        if val == cell.value:
+            return val
+        return float(cell.value)
+    return cell.value
+
+
+def iter_sheet_rows(filepath):
+    """첫 번째 시트의 행을 스트리밍 (read-only, 행 끝 빈 셀 제거)"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        sheet = wb.worksheets[0]
+        sheet.reset_dimensions()
+        for row in sheet.rows:
+            values = [convert_cell(cell) for cell in row]
+            while values and values[-1] == '':
+                values.pop()
+            yield values
+    finally:
+        wb.close()
+
+
+def iter_raw_batches(filepath, batch_size, layout):
+    """
+    시트를 스트리밍하면서 데이터 행(DATA_START_ROW 이후)을 batch_size개씩 반환 → (시작 인덱스, 행 목록)
+
+    layout['width'] / layout['last_row']는 헤더를 포함해 지금까지 읽은 행 기준으로 갱신된다.
+    """
+    batch = []
+    start = 0
+    for row_number, values in enumerate(iter_sheet_rows(filepath)):
+        layout['width'] = max(layout['width'], len(values))
+        if values:
+            layout['last_row'] = row_number
+        if row_number < DATA_START_ROW:
+            continue
+        batch.append(values)
+        if len(batch) >= batch_size:
+            yield start, batch
+            start += len(batch)
+            batch = []
+    if batch:
+        yield start, batch
+
+
+def pad_rows(rows, width):
+    """모든 행을 같은 폭으로 채우기 (빈 셀 = '')"""
+    return [values + [''] * (width - len(values)) if len(values) < width else values for values in rows]
+
+
+def read_batch_frame(rows, dtype=None):
+    """행 목록 → DataFrame (pd.read_excel과 같은 TextParser 타입 추론/NaN 처리)"""
+    return TextParser(rows, header=None, dtype=dtype, skip_blank_lines=False).read()
+
+
+def merge_column_dtype(kinds, has_nan):
+    """배치별 컬럼 dtype → 파일 전체를 한 번에 읽었을 때의 dtype"""
+    if not kinds:
+        return 'float64'
+    if kinds <= {'int64', 'float64'}:
+        return 'int64' if kinds == {'int64'} and not has_nan else 'float64'
+    if len(kinds) == 1 and kinds != {'bool'}:
+        return next(iter(kinds))  # str, datetime64 등은 빈 배치도 같은 dtype으로
+    if kinds == {'bool'} and not has_nan:
+        return 'bool'
+    return object
+
+
+def infer_batch_dtypes(rows):
+    """배치 하나의 컬럼별 (dtype, NaN 포함 여부) - 값이 모두 NaN인 컬럼은 dtype None"""
+    frame = read_batch_frame(pad_rows(rows, max(len(values) for values in rows)))
+    inferred = {}
+    for col in frame.columns:
+        isna = frame[col].isna()
+        inferred[col] = (None if isna.all() else str(frame[col].dtype), bool(isna.any()))
+    return inferred
+
+
+def spool_sheet(filepath, batch_size, spool):
+    """
+    워크북을 한 번만 스트리밍: 데이터 행 배치를 spool(임시 파일)에 pickle로 기록하면서
+    시트 폭, 마지막 데이터 행, 컬럼별 dtype을 계산 → 2차 읽기는 워크북 대신 spool에서
+
+    pd.read_excel은 컬럼 dtype을 파일 전체 기준으로 추론하므로
+    (예: 정수 컬럼에 빈 셀이 하나라도 있으면 float) 배치별 추론 결과를 합쳐서 맞춘다.
+    배치 끝 빈 행은 뒤에 데이터가 이어지는지(포함) 파일 끝인지(제외) 다음 배치를 봐야 알 수 있으므로
+    그런 배치는 두 경우를 모두 추론해 두고 결정되면 반영한다.
+    메모리에는 현재 배치와 컬럼별 dtype 집합만 남는다.
+    """
+    layout = {'width': 0, 'last_row': -1}
+    kinds = {}
+    nans = {}
+
+    def merge(inferred):
+        for col, (kind, has_nan) in inferred.items():
+            if kind:
+                kinds.setdefault(col, set()).add(kind)
+            nans[col] = nans.get(col, False) or has_nan
+
+    pending = None         # 끝 빈 행이 있는 마지막 배치의 (빈 행 포함, 제외) 추론
+    blank_batch = False    # 데이터 없는 배치가 있었음 (뒤에 데이터가 오면 모든 컬럼 NaN)
+    all_nan = False
+    min_width = None       # 데이터 배치 중 가장 좁은 폭 (그 밖 컬럼은 NaN으로 채워짐)
+    for _, rows in iter_raw_batches(filepath, batch_size, layout):
+        pickle.dump(rows, spool, pickle.HIGHEST_PROTOCOL)
+        filled = [i for i, values in enumerate(rows) if values]
+        if not filled:
+            blank_batch = True
+            continue
+
+        # 데이터가 이어졌으므로 앞 배치의 빈 행은 파일 중간 빈 행
+        if pending:
+            merge(pending[0])
+            pending = None
+        all_nan = all_nan or blank_batch
+        blank_batch = False
+
+        local_width = max(len(values) for values in rows)
+        min_width = local_width if min_width is None else min(min_width, local_width)
+        if filled[-1] < len(rows) - 1:
+            pending = (infer_batch_dtypes(rows), infer_batch_dtypes(rows[:filled[-1] + 1]))
+        else:
+            merge(infer_batch_dtypes(rows))
+    if pending:
+        merge(pending[1])
+
+    width, last_row = layout['width'], layout['last_row']
+    for col in range(width):
+        if all_nan or col >= (min_width or 0):
+            nans[col] = True
+
+    dtypes = {col: merge_column_dtype(kinds.get(col, set()), nans.get(col, False)) for col in range(width)}
+    return width, last_row, dtypes
+
+
+def iter_excel_batches(filepath, batch_size=DEFAULT_BATCH_SIZE):
+    """Excel 데이터 행을 batch_size행 DataFrame으로 나눠서 읽기 (워크북은 한 번만 스트리밍, 인덱스는 전체 읽기와 동일)"""
+    with tempfile.TemporaryFile() as spool:
+        width, last_row, dtypes = spool_sheet(filepath, batch_size, spool)
+        spool.seek(0)
+        data_end = last_row - DATA_START_ROW
+        start = 0
+        while start <= data_end:
+            rows = pickle.load(spool)
+            count = len(rows)
+            frame = read_batch_frame(pad_rows(rows[:data_end - start + 1], width), dtype=dtypes)
+            frame.index = pd.RangeIndex(start, start + len(frame))
+            yield frame
+            start += count
+
+
+class MemoryLimitExceeded(RuntimeError):
+    """청크 모드 피크 RSS가 상한을 넘음"""
+
+
+def peak_rss_mb():
+    """현재 프로세스의 피크 RSS (MB). 측정할 수 없으면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)  # macOS는 바이트 단위
+    return peak / 1024  # Linux는 KB 단위
+
+
+def check_rss_limit(max_rss_mb):
+    """피크 RSS가 상한을 넘었으면 MemoryLimitExceeded"""
+    if not max_rss_mb:
+        return
+    peak = peak_rss_mb()
+    if peak is not None and peak > max_rss_mb:
+        raise MemoryLimitExceeded(f'피크 RSS {peak:.0f}MB > 상한 {max_rss_mb}MB')
+
+
+class JsonArraySink:
+    """레코드를 JSON 배열로 바로 기록 (json.dump(records, indent=2)와 같은 출력)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.count = 0
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write('[')
+
+    def write(self, records):
+        for record in records:
+            text = json.dumps(record, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            self._file.write(('\n  ' if self.count == 0 else ',\n  ') + text)
+            self.count += 1
+        self._file.flush()
+
+    def close(self):
+        self._file.write('\n]' if self.count else ']')
+        self._file.close()
+
+
+class JsonLinesSink:
+    """레코드를 한 줄에 하나씩 기록 (.jsonl)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.count = 0
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def write(self, records):
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.count += 1
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def open_sink(path):
+    """출력 경로 확장자에 맞는 싱크 (.jsonl → JSON Lines, 그 외 → JSON 배열)"""
+    if str(path).endswith('.jsonl'):
+        return JsonLinesSink(path)
+    return JsonArraySink(path)
+
+
+def parse_factory_file_chunked(factory, filepath, sink, batch_size=DEFAULT_BATCH_SIZE, max_rss_mb=None, head=None,
+                               row_filter=None, year_window=DEFAULT_YEAR_WINDOW):
+    """
+    단일 공장 파일 청크 파싱
+
+    batch_size행씩 읽고 파싱해서 바로 sink에 기록하므로
+    메모리에는 현재 배치와 품질 카운터만 남는다.
+    레코드는 parse_factory_file과 동일하다. head(list)가 주어지면 앞 50개 레코드를 보관한다.
+    반환: 품질 카운터 (읽기 실패 시 None)
+    """
+    if not factory_selected(factory, row_filter):
+        print(f'Skipping Factory {factory}: not in factory filter')
+        return new_quality_stats()
+    print(f'Parsing Factory {factory} (chunked, {batch_size} rows/batch): {filepath}')
+
+    quality_stats = new_quality_stats()
+    cols = get_factory_columns(factory)
+    try:
+        for frame in iter_excel_batches(filepath, batch_size):
+            batch = list(iter_records(factory, [frame], cols, quality_stats, row_filter, year_window))
+            sink.write(batch)
+            if head is not None and len(head) < 50:
+                head.extend(batch[:50 - len(head)])
+            del batch, frame
+            check_rss_limit(max_rss_mb)
+    except MemoryLimitExceeded:
+        raise
+    except Exception as e:
+        print(f'Error reading {filepath}: {e}')
+        return None
+
+    print_quality_report(factory, quality_stats)
+    return quality_stats
+
+
+def print_samples(records):
+    """다양한 상태의 샘플 출력"""
+    print('\n=== Sample Records ===')
+    if not records:
+        return
+    samples = []
+    for r in records[:50]:
+        wh_out = r.get('production', {}).get('wh_out', {})
+        if wh_out.get('status') == 'completed' and len(samples) < 2:
+            samples.append(('completed', r))
+        elif wh_out.get('status') == 'pending' and len(samples) < 4:
+            samples.append(('pending', r))
+        if len(samples) >= 4:
+            break
+
+    for label, sample in samples[:2]:
+        print(f'\n--- {label.upper()} ---')
+        print(json.dumps(sample, ensure_ascii=False, indent=2))
+
+
+def print_performance(start_time, output_path):
+    """Performance measurement (Agent #R04)"""
+    elapsed_time = time.time() - start_time
+    print(f'Saved to: {output_path}')
+    print(f'⚡ Performance: {elapsed_time:.2f}초 (목표: <30초)')
+    if elapsed_time < 30:
+        print(f'   ✅ 성능 목표 달성!')
+    else:
+        print(f'   ⚠️ 성능 개선 필요')
+
+
+def run_chunked(base_path, output_path, batch_size, max_rss_mb, row_filter=None):
+    """청크 모드: 공장별로 배치 단위 파싱 → 출력 싱크에 바로 기록"""
     start_time = time.time()
+    totals = new_quality_stats()
+    head = []
+
+    sink = open_sink(output_path)
+    try:
+        for factory, filename in FACTORY_FILES.items():
+            filepath = base_path / filename
+            if not filepath.exists():
+                print(f'File not found: {filepath}')
+                continue
+            stats = parse_factory_file_chunked(factory, filepath, sink, batch_size, max_rss_mb, head, row_filter)
+            for key, value in (stats or {}).items():
+                totals[key] += value
+    finally:
+        sink.close()
+    check_rss_limit(max_rss_mb)
+
+    print(f'\nTotal records: {sink.count}')
+    print_performance(start_time, output_path)
+    peak = peak_rss_mb()
+    if peak is not None:
+        limit = f' (상한: {max_rss_mb}MB)' if max_rss_mb else ''
+        print(f'💾 Peak RSS: {peak:.0f}MB{limit}')
+    print_samples(head)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='로드플랜 Excel 파싱 (v6)')
+    parser.add_argument('--chunked', action='store_true',
+                        help='청크 모드: 배치 단위로 읽고 바로 기록 (대용량 파일 메모리 상한)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'청크 모드 배치 행 수 (기본: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--max-rss-mb', type=int, default=None,
+                        help='청크 모드 피크 RSS 상한 (MB). 배치마다 ru_maxrss로 확인해서 넘었으면 중단 (종료 코드 2) '
+                             '- 사용량을 제한하지는 않고 초과를 감지만 함')
+    parser.add_argument('--engine', choices=['auto'] + list(EXCEL_ENGINES), default=None,
+                        help=f'Excel 읽기 엔진 (기본: ${ENGINE_ENV} 또는 auto, 청크 모드는 openpyxl 스트리밍)')
+    parser.add_argument('--output', default=None,
+                        help='출력 파일 (기본: parsed_loadplan_v6.json, .jsonl이면 JSON Lines)')
+    # 조건부 파싱 (목록은 쉼표 구분 = OR, 탈락한 행은 BAL 단계 파싱 전에 제외)
+    parser.add_argument('--factory', default=None, help='공장 (예: A,C) - 나머지 파일은 읽지 않음')
+    parser.add_argument('--season', default=None, help='시즌 (예: FW25,SS26)')
+    parser.add_argument('--destination', default=None, help='목적지 (예: USA,JPN)')
+    parser.add_argument('--sdd-from', default=None, metavar='YYYY-MM', help='sddYearMonth 시작 (포함)')
+    parser.add_argument('--sdd-to', default=None, metavar='YYYY-MM', help='sddYearMonth 끝 (포함)')
+    parser.add_argument('--open-only', action='store_true', help='wh_out이 완료되지 않은 오더만')
+    args = parser.parse_args(argv)
+
+    def split(value):
+        return [item for item in value.split(',') if item.strip()] if value else None
+
+    try:
+        row_filter = build_row_filter(split(args.factory), split(args.season), split(args.destination),
+                                      args.sdd_from, args.sdd_to, args.open_only)
+    except ValueError as e:
+        parser.error(str(e))
+    if row_filter:
+        active = {key: sorted(value) if isinstance(value, set) else value
+                  for key, value in row_filter.items() if value}
+        print(f'🔎 Row filter: {active}')
 
     # 환경 변수 또는 현재 스크립트 위치 기준
     base_path = Path(__file__).parent.absolute()
+    output_path = Path(args.output) if args.output else base_path / 'parsed_loadplan_v6.json'
+
+    if args.chunked:
+        if args.max_rss_mb and resource is None:
+            print('⚠️ 이 플랫폼에서는 RSS를 측정할 수 없어 --max-rss-mb를 무시합니다')
+        try:
+            run_chunked(base_path, output_path, max(1, args.batch_size), args.max_rss_mb, row_filter)
+        except MemoryLimitExceeded as e:
+            print(f'❌ 메모리 상한 초과: {e}')
+            sys.exit(2)
+        return None
+
+    # Performance measurement (Agent #R04)
+    start_time = time.time()
     all_records = []
+    print(f'📖 Excel engine: {resolve_engine(args.engine)}')
 
     for factory, filename in FACTORY_FILES.items():
         filepath = base_path / filename
         if filepath.exists():
-            records = parse_factory_file(factory, filepath)
+            records = parse_factory_file(factory, filepath, args.engine, row_filter)
             all_records.extend(records)
         else:
             print(f'File not found: {filepath}')
@@ -607,36 +1209,13 @@ def main():
     print(f'\nTotal records: {len(all_records)}')
 
     # JSON 저장
-    output_path = base_path / 'parsed_loadplan_v6.json'
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(all_records, f, ensure_ascii=False, indent=2)
 
-    # Performance measurement
-    elapsed_time = time.time() - start_time
-    print(f'Saved to: {output_path}')
-    print(f'⚡ Performance: {elapsed_time:.2f}초 (목표: <30초)')
-    if elapsed_time < 30:
-        print(f'   ✅ 성능 목표 달성!')
-    else:
-        print(f'   ⚠️ 성능 개선 필요')
+    print_performance(start_time, output_path)
 
     # 샘플 출력
-    print('\n=== Sample Records ===')
-    if all_records:
-        # 다양한 상태의 샘플 출력
-        samples = []
-        for r in all_records[:50]:
-            wh_out = r.get('production', {}).get('wh_out', {})
-            if wh_out.get('status') == 'completed' and len(samples) < 2:
-                samples.append(('completed', r))
-            elif wh_out.get('status') == 'pending' and len(samples) < 4:
-                samples.append(('pending', r))
-            if len(samples) >= 4:
-                break
-
-        for label, sample in samples[:2]:
-            print(f'\n--- {label.upper()} ---')
-            print(json.dumps(sample, ensure_ascii=False, indent=2))
+    print_samples(all_records)
 
     return all_records
 
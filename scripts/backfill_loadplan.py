@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+로드플랜 과거 데이터 백필 스크립트
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+parse_loadplan.py의 FACTORY_FILES는 한 주(12.20.2025) 파일명만 가리키므로,
+아카이브 디렉토리 전체에서 날짜가 붙은 로드플랜 파일을 찾아 주차별 스냅샷으로 파싱한다.
+
+- 파일명 규칙: "... FACTORY <A-D> ... MM.DD.YYYY.xlsx" (하위 디렉토리 포함 검색)
+- 파일 단위 병렬 파싱 (프로세스 풀), 파일마다 체크포인트 저장
+  → 중단 후 다시 실행하면 완료된 파일(크기/수정 시각/파서 동일)은 건너뜀
+- 결과: 스냅샷 태그(snapshot: YYYY-MM-DD)가 붙은 레코드를 하나의 JSON Lines 파일로 통합
+
+사용법:
+    python scripts/backfill_loadplan.py /path/to/archive
+    python scripts/backfill_loadplan.py /path/to/archive --workers 8 --since 2025-01-01 --until 2025-12-31
+    python scripts/backfill_loadplan.py /path/to/archive --verbose   # 파서 로그 그대로 출력
+
+출력 (기본 data/backfill/):
+    checkpoints/<스냅샷>_<공장>.json   파일별 파싱 결과
+    loadplan_history.jsonl            스냅샷 태그가 붙은 전체 레코드 (스냅샷 → 공장 순)
+    loadplan_history.manifest.json    스냅샷별 공장 파일 / 해시 / 레코드 수, 실패 목록
+
+종료 코드:
+    0: 모든 파일 파싱 완료
+    1: 실패한 파일 있음 (나머지로 데이터셋은 생성, 다시 실행하면 실패 파일만 재시도)
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import contextlib
+from pathlib import Path
+from datetime import datetime, date
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# parsed_artifact가 프로젝트 루트를 sys.path에 추가 (parse_loadplan.py import용)
+from parsed_artifact import file_sha256, parser_fingerprint
+from parse_loadplan import year_window_for, parse_factory_file
+
+# 설정
+PROJECT_DIR = Path(__file__).parent.parent
+DEFAULT_OUTPUT_DIR = PROJECT_DIR / 'data' / 'backfill'
+CHECKPOINT_DIRNAME = 'checkpoints'
+DATASET_FILE = 'loadplan_history.jsonl'
+MANIFEST_FILE = 'loadplan_history.manifest.json'
+
+# 체크포인트 포맷 버전 (구조가 바뀌면 증가)
+CHECKPOINT_VERSION = 1
+
+# "FACTORY A ... 12.20.2025.xlsx" (월.일.연도)
+LOADPLAN_RE = re.compile(
+    r'FACTORY\s+(?P<factory>[A-D])\b.*?(?P<month>\d{1,2})\.(?P<day>\d{1,2})\.(?P<year>\d{4})\s*\.xlsx$',
+    re.IGNORECASE,
+)
+
+
+def parse_loadplan_name(filename):
+    """파일명 → (공장, 스냅샷 날짜 'YYYY-MM-DD'), 규칙에 맞지 않으면 None"""
+    match = LOADPLAN_RE.search(filename)
+    if not match:
+        return None
+    try:
+        snapshot = date(int(match['year']), int(match['month']), int(match['day']))
+    except ValueError:
+        return None
+    return match['factory'].upper(), snapshot.isoformat()
+
+
+def discover_loadplans(root, since=None, until=None):
+    """
+    root 아래 모든 로드플랜 파일 검색
+    반환: {스냅샷: {공장: 경로}} (같은 스냅샷/공장이 여러 개면 가장 최근 수정 파일)
+    """
+    found = {}
+    for path in sorted(Path(root).rglob('*.xlsx')):
+        if path.name.startswith('~$'):  # Excel 잠금 파일
+            continue
+        parsed = parse_loadplan_name(path.name)
+        if not parsed:
+            continue
+        factory, snapshot = parsed
+        if (since and snapshot < since) or (until and snapshot > until):
+            continue
+
+        factories = found.setdefault(snapshot, {})
+        current = factories.get(factory)
+        if current is not None:
+            keep = max(current, path, key=lambda p: p.stat().st_mtime_ns)
+            print(f"  ⚠️ 중복 파일 ({snapshot} / {factory}): {keep.name} 사용")
+            path = keep
+        factories[factory] = path
+    return dict(sorted(found.items()))
+
+
+def checkpoint_path(checkpoint_dir, snapshot, factory):
+    return Path(checkpoint_dir) / f'{snapshot}_{factory}.json'
+
+
+def source_stamp(path):
+    """체크포인트 유효성 판단용 (크기, 수정 시각)"""
+    stat = Path(path).stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_checkpoint_meta(path):
+    """체크포인트의 records를 제외한 메타데이터 (없거나 손상되면 None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    checkpoint.pop('records', None)
+    return checkpoint
+
+
+def is_checkpoint_valid(meta, source, parser):
+    return (
+        meta is not None
+        and meta.get('version') == CHECKPOINT_VERSION
+        and meta.get('parser') == parser
+        and meta.get('stamp') == source_stamp(source)
+    )
+
+
+def parse_job(snapshot, factory, source, checkpoint, parser, verbose=False):
+    """
+    워커 프로세스 작업: 파일 하나 파싱 → 체크포인트 저장 (임시 파일에 쓴 뒤 교체)
+    M/D 날짜 연도는 스냅샷 날짜 기준 (year_window_for) - 2024년 로드플랜의 '11/20'은 2024-11-20
+    반환: 체크포인트 메타데이터 (레코드 제외)
+    """
+    stamp = source_stamp(source)
+    start = time.time()
+    year_window = year_window_for(snapshot)
+    if verbose:
+        records = parse_factory_file(factory, str(source), year_window=year_window)
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            records = parse_factory_file(factory, str(source), year_window=year_window)
+    if not records:
+        # 읽기 실패도 빈 목록으로 돌아오므로 체크포인트하지 않고 다음 실행에서 재시도
+        raise ValueError(f"파싱된 레코드 없음: {source}")
+
+    for record in records:
+        record['snapshot'] = snapshot
+
+    meta = {
+        'version': CHECKPOINT_VERSION,
+        'parser': parser,
+        'snapshot': snapshot,
+        'factory': factory,
+        'file': str(source),
+        'stamp': stamp,
+        'sha256': file_sha256(source),
+        'records': len(records),
+        'seconds': round(time.time() - start, 2),
+    }
+
+    checkpoint = Path(checkpoint)
+    tmp_path = checkpoint.with_name(checkpoint.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(meta, records=records), f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, checkpoint)
+    return meta
+
+
+def run_backfill(plans, checkpoint_dir, workers=None, verbose=False):
+    """
+    체크포인트가 없거나 오래된 파일만 병렬 파싱
+    반환: (성공 메타데이터 {(스냅샷, 공장): meta}, 실패 목록, 재사용 수)
+    """
+    checkpoint_dir = Path(checkpoint_dir)
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    parser = parser_fingerprint()
+
+    done, failed, pending = {}, [], []
+    for snapshot, factories in plans.items():
+        for factory, source in sorted(factories.items()):
+            checkpoint = checkpoint_path(checkpoint_dir, snapshot, factory)
+            meta = read_checkpoint_meta(checkpoint)
+            if is_checkpoint_valid(meta, source, parser):
+                done[(snapshot, factory)] = meta
+            else:
+                pending.append((snapshot, factory, source, checkpoint))
+
+    reused = len(done)
+    total = reused + len(pending)
+    print(f"\n🧮 파일 {total}개 (체크포인트 재사용 {reused}개, 파싱 {len(pending)}개)")
+    if not pending:
+        return done, failed, reused
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(parse_job, snapshot, factory, source, checkpoint, parser, verbose): (snapshot, factory, source)
+            for snapshot, factory, source, checkpoint in pending
+        }
+        try:
+            for future in as_completed(futures):
+                snapshot, factory, source = futures[future]
+                try:
+                    meta = future.result()
+                except Exception as e:
+                    failed.append({'snapshot': snapshot, 'factory': factory, 'file': str(source), 'error': str(e)})
+                    print(f"  ❌ [{snapshot} {factory}] {e}")
+                    continue
+                done[(snapshot, factory)] = meta
+                print(f"  ✅ [{snapshot} {factory}] {meta['records']}개 레코드, {meta['seconds']:.2f}초 "
+                      f"({len(done)}/{total})")
+        except KeyboardInterrupt:
+            # 완료된 파일은 이미 체크포인트됨 → 다시 실행하면 이어서 진행
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return done, failed, reused
+
+
+def write_dataset(done, checkpoint_dir, output_dir):
+    """
+    체크포인트를 스냅샷 → 공장 순으로 하나의 JSON Lines 파일로 통합
+    (체크포인트를 하나씩 읽어 바로 쓰므로 메모리는 파일 하나 분량만 사용)
+    """
+    output_dir = Path(output_dir)
+    dataset_path = output_dir / DATASET_FILE
+    tmp_path = dataset_path.with_name(dataset_path.name + '.tmp')
+
+    snapshots = {}
+    total = 0
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for snapshot, factory in sorted(done):
+            with open(checkpoint_path(checkpoint_dir, snapshot, factory), 'r', encoding='utf-8') as f:
+                records = json.load(f)['records']
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                out.write('\n')
+            meta = done[(snapshot, factory)]
+            snapshots.setdefault(snapshot, {})[factory] = {
+                'file': Path(meta['file']).name,
+                'sha256': meta['sha256'],
+                'records': len(records),
+            }
+            total += len(records)
+    os.replace(tmp_path, dataset_path)
+    return dataset_path, snapshots, total
+
+
+def write_manifest(output_dir, snapshots, total, failed):
+    """데이터셋 매니페스트 저장"""
+    manifest = {
+        'version': CHECKPOINT_VERSION,
+        'parser': parser_fingerprint(),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'dataset': DATASET_FILE,
+        'records': total,
+        'snapshots': snapshots,
+        'failed': failed,
+    }
+    path = Path(output_dir) / MANIFEST_FILE
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='로드플랜 아카이브 백필 (주차별 스냅샷 통합)')
+    parser.add_argument('archive', type=Path, help='로드플랜 Excel 아카이브 디렉토리 (하위 포함)')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help=f'출력 디렉토리 (기본 {DEFAULT_OUTPUT_DIR.relative_to(PROJECT_DIR)})')
+    parser.add_argument('--workers', type=int, default=None, help='병렬 파싱 프로세스 수 (기본 CPU 수)')
+    parser.add_argument('--since', help='이 날짜(YYYY-MM-DD) 이후 스냅샷만')
+    parser.add_argument('--until', help='이 날짜(YYYY-MM-DD) 이전 스냅샷만')
+    parser.add_argument('--verbose', action='store_true', help='파서 로그 출력')
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("🗂️ 로드플랜 백필 시작")
+    print(f"   아카이브: {args.archive}")
+    print(f"   시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    if not args.archive.is_dir():
+        print(f"❌ 아카이브 디렉토리가 없습니다: {args.archive}")
+        return 1
+
+    start_time = time.time()
+    plans = discover_loadplans(args.archive, args.since, args.until)
+    files = sum(len(factories) for factories in plans.values())
+    print(f"\n📂 스냅샷 {len(plans)}개, 파일 {files}개 발견")
+    for snapshot, factories in plans.items():
+        print(f"  - {snapshot}: {', '.join(sorted(factories))}")
+    if not plans:
+        print("  ⚠️ 규칙에 맞는 로드플랜 파일이 없습니다 (FACTORY <A-D> ... MM.DD.YYYY.xlsx)")
+        return 1
+
+    checkpoint_dir = args.output / CHECKPOINT_DIRNAME
+    try:
+        done, failed, reused = run_backfill(plans, checkpoint_dir, args.workers, args.verbose)
+    except KeyboardInterrupt:
+        print("\n⏹️ 중단됨 - 다시 실행하면 체크포인트부터 이어서 진행합니다")
+        return 1
+
+    dataset_path, snapshots, total = write_dataset(done, checkpoint_dir, args.output)
+    manifest_path = write_manifest(args.output, snapshots, total, failed)
+
+    elapsed = time.time() - start_time
+    print("\n" + "=" * 60)
+    print("✅ 백필 완료!" if not failed else f"⚠️ 백필 완료 (실패 {len(failed)}개)")
+    print(f"   스냅샷: {len(snapshots)}개, 레코드: {total}개")
+    print(f"   파싱 {len(done) - reused}개 / 재사용 {reused}개 / 실패 {len(failed)}개")
+    print(f"   데이터셋: {dataset_path}")
+    print(f"   매니페스트: {manifest_path}")
+    print(f"   소요 시간: {elapsed:.2f}초")
+    print("=" * 60)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
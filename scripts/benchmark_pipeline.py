@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+파이프라인 벤치마크 스크립트
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+memory: parse_loadplan 청크 모드의 메모리 상한 검증
+    공장 파일마다 전체 읽기(parse_factory_file)와 청크 모드(parse_factory_file_chunked)를
+    각각 별도 프로세스로 실행해서 피크 RSS를 측정하고,
+    - 청크 모드 피크 RSS가 --max-rss-mb 이하인지
+    - 청크 모드 출력이 전체 읽기 출력과 바이트 단위로 같은지
+    확인한다. --scale N이면 데이터 행을 N배로 늘린 대용량 파일을 만들어서 측정한다.
+
+engines: Excel 읽기 엔진 보정
+    설치된 엔진(parse_loadplan.EXCEL_ENGINES)마다 공장 파일 읽기 시간을 재고,
+    각 엔진의 파싱 레코드가 기본 엔진(openpyxl)과 같은지 공장 레이아웃 4종 모두 확인한다.
+    결과가 같은 엔진 중 가장 빠른 것을 .pipeline_cache/excel_engine.json 에 기록하면
+    parse_factory_file은 engine=auto(기본)일 때 그 엔진을 사용한다.
+
+사용법:
+    python scripts/benchmark_pipeline.py memory
+    python scripts/benchmark_pipeline.py memory --scale 50 --max-rss-mb 200 --batch-size 1000
+    python scripts/benchmark_pipeline.py engines
+    python scripts/benchmark_pipeline.py engines --repeat 5 --check-only   # 보정 파일 기록 안 함
+
+종료 코드:
+    0: 모든 검증 통과
+    1: 상한 초과 / 출력 불일치 / 실행 실패
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+# parsed_artifact가 프로젝트 루트를 sys.path에 추가 (parse_loadplan.py import용)
+from parsed_artifact import DATA_DIR, FACTORY_FILES
+from parser_equivalence import first_divergence
+import parse_loadplan
+
+# 설정
+DEFAULT_MAX_RSS_MB = 256
+DEFAULT_REPEAT = 3
+
+
+def build_scaled_workbook(source, target, scale):
+    """데이터 행을 scale배 반복한 대용량 Excel 생성 (read-only → write-only 스트리밍)"""
+    from openpyxl import Workbook, load_workbook
+
+    src = load_workbook(source, read_only=True, data_only=True)
+    rows = [list(row) for row in src.worksheets[0].iter_rows(values_only=True)]
+    src.close()
+
+    header, data = rows[:parse_loadplan.DATA_START_ROW], rows[parse_loadplan.DATA_START_ROW:]
+    wb = Workbook(write_only=True)
+    sheet = wb.create_sheet()
+    for row in header:
+        sheet.append(row)
+    for _ in range(scale):
+        for row in data:
+            sheet.append(row)
+    wb.save(target)
+    return len(data) * scale
+
+
+def run_worker(mode, factory, path, output, batch_size, max_rss_mb):
+    """측정용 자식 프로세스 실행 → (종료 코드, 피크 RSS MB, 소요 시간, stderr)"""
+    cmd = [sys.executable, __file__, 'worker', mode, factory, str(path), str(output),
+           '--batch-size', str(batch_size)]
+    if max_rss_mb:
+        cmd += ['--max-rss-mb', str(max_rss_mb)]
+
+    start = time.time()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = proc.stderr.read().decode('utf-8', 'replace')
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.time() - start
+    proc.stderr.close()
+    peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)  # macOS 바이트, Linux KB
+    return os.waitstatus_to_exitcode(status), peak, elapsed, stderr
+
+
+def worker(args):
+    """자식 프로세스: 한 공장 파일을 지정 모드로 파싱해서 output에 기록 (파서 로그는 버림)"""
+    if args.mode == 'full':
+        records = parse_loadplan.parse_factory_file(args.factory, args.path)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        return 0
+
+    sink = parse_loadplan.JsonArraySink(args.output)
+    try:
+        stats = parse_loadplan.parse_factory_file_chunked(
+            args.factory, args.path, sink, args.batch_size, args.max_rss_mb)
+        sink.close()
+        parse_loadplan.check_rss_limit(args.max_rss_mb)
+    except parse_loadplan.MemoryLimitExceeded as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    return 0 if stats is not None else 1
+
+
+def bench_memory(args):
+    """청크 모드 메모리 상한 + 출력 동일성 검증"""
+    if sys.platform == 'win32':
+        print("❌ 피크 RSS 측정은 Unix 계열에서만 지원합니다")
+        return 1
+
+    print("=" * 60)
+    print("💾 청크 모드 메모리 벤치마크")
+    print(f"   배치: {args.batch_size}행, RSS 상한: {args.max_rss_mb}MB, 배율: x{args.scale}")
+    print("=" * 60)
+
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix='bench_memory_') as tmp:
+        tmp = Path(tmp)
+        print(f"\n{'공장':<6}{'행':>8}{'전체 RSS':>11}{'청크 RSS':>11}{'전체 시간':>11}{'청크 시간':>11}  결과")
+        for factory, filename in FACTORY_FILES.items():
+            source = Path(args.data_dir) / filename
+            if not source.exists():
+                print(f"{factory:<6}  ⚠️ 파일 없음: {source}")
+                continue
+
+            rows = '-'
+            if args.scale > 1:
+                scaled = tmp / f'scaled_{filename}'
+                rows = build_scaled_workbook(source, scaled, args.scale)
+                source = scaled
+
+            full_out, chunk_out = tmp / f'{factory}_full.json', tmp / f'{factory}_chunked.json'
+            full_rc, full_rss, full_time, full_err = run_worker(
+                'full', factory, source, full_out, args.batch_size, None)
+            chunk_rc, chunk_rss, chunk_time, chunk_err = run_worker(
+                'chunked', factory, source, chunk_out, args.batch_size, args.max_rss_mb)
+
+            problems = []
+            if full_rc != 0:
+                problems.append(f'전체 읽기 실패 ({full_rc}): {full_err.strip()[-200:]}')
+            if chunk_rc != 0:
+                problems.append(f'청크 모드 실패 ({chunk_rc}): {chunk_err.strip()[-200:]}')
+            elif chunk_rss > args.max_rss_mb:
+                problems.append(f'피크 RSS {chunk_rss:.0f}MB > 상한 {args.max_rss_mb}MB')
+            if not problems and full_out.read_bytes() != chunk_out.read_bytes():
+                problems.append('출력 불일치 (전체 읽기 ≠ 청크 모드)')
+
+            result = '✅' if not problems else '❌'
+            print(f"{factory:<6}{rows:>8}{full_rss:>9.0f}MB{chunk_rss:>9.0f}MB"
+                  f"{full_time:>10.2f}s{chunk_time:>10.2f}s  {result}")
+            for problem in problems:
+                print(f"      - {problem}")
+            failures += bool(problems)
+
+    print("\n" + "=" * 60)
+    print("✅ 메모리 벤치마크 통과" if not failures else f"❌ 메모리 벤치마크 실패 ({failures}개 공장)")
+    print("=" * 60)
+    return 1 if failures else 0
+
+
+def time_engine_read(engine, path, repeat):
+    """엔진으로 파일 읽기 최소 소요 시간 (repeat회 중 최솟값)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_loadplan.read_factory_frame(path, engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_engines(args):
+    """설치된 Excel 엔진 속도 측정 + 레코드 동일성 확인 → 가장 빠른 엔진 보정 파일 기록"""
+    engines = parse_loadplan.available_engines()
+    reference = parse_loadplan.DEFAULT_ENGINE
+
+    print("=" * 60)
+    print("📖 Excel 읽기 엔진 보정")
+    print(f"   설치된 엔진: {', '.join(engines)} (기준: {reference}, {args.repeat}회 중 최솟값)")
+    missing = [engine for engine in parse_loadplan.EXCEL_ENGINES if engine not in engines]
+    if missing:
+        print(f"   미설치: {', '.join(f'{e} ({parse_loadplan.EXCEL_ENGINES[e]})' for e in missing)}")
+    print("=" * 60)
+
+    timings = {engine: 0.0 for engine in engines}
+    consistent = {engine: True for engine in engines}
+    files = []
+    for factory, filename in FACTORY_FILES.items():
+        path = Path(args.data_dir) / filename
+        if not path.exists():
+            print(f"\n⚠️ 파일 없음: {path}")
+            continue
+        files.append(filename)
+        print(f"\n🏭 Factory {factory}: {filename}")
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            expected = parse_loadplan.parse_factory_file(factory, path, reference)
+        for engine in engines:
+            seconds = time_engine_read(engine, path, args.repeat)
+            timings[engine] += seconds
+            if engine == reference:
+                problem = None
+            else:
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    records = parse_loadplan.parse_factory_file(factory, path, engine)
+                problem = first_divergence(expected, records)
+            consistent[engine] = consistent[engine] and problem is None
+            status = '✅ 동일' if problem is None else f'❌ 불일치 - {problem}'
+            print(f"   {engine:<10} {seconds:7.3f}초  {status}")
+
+    if not files:
+        print("\n❌ 측정할 공장 파일이 없습니다")
+        return 1
+
+    eligible = [engine for engine in engines if consistent[engine]]
+    fastest = min(eligible, key=lambda engine: timings[engine])
+    print("\n" + "=" * 60)
+    for engine in engines:
+        mark = ' ← 선택' if engine == fastest else ''
+        speedup = timings[reference] / timings[engine] if timings[engine] else 0
+        print(f"   {engine:<10} 합계 {timings[engine]:7.3f}초  (x{speedup:.2f}){mark}")
+
+    if not args.check_only:
+        calibration = {
+            'engine': fastest,
+            'version': parse_loadplan.engine_version(fastest),
+            'pandas': parse_loadplan.pd.__version__,
+            'timings': {engine: round(seconds, 4) for engine, seconds in timings.items()},
+            'consistent': consistent,
+            'files': files,
+            'calibrated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(calibration, f, ensure_ascii=False, indent=2)
+        print(f"   💾 보정 결과: {args.output}")
+
+    failed = [engine for engine in engines if not consistent[engine]]
+    print("✅ 모든 엔진 결과 동일" if not failed else f"❌ 결과가 다른 엔진: {', '.join(failed)} (선택에서 제외)")
+    print("=" * 60)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='파이프라인 벤치마크')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    memory = sub.add_parser('memory', help='청크 모드 피크 RSS 상한 + 출력 동일성 검증')
+    memory.add_argument('--data-dir', type=Path, default=DATA_DIR, help='공장 Excel 디렉토리 (기본 data/)')
+    memory.add_argument('--batch-size', type=int, default=parse_loadplan.DEFAULT_BATCH_SIZE,
+                        help=f'청크 모드 배치 행 수 (기본 {parse_loadplan.DEFAULT_BATCH_SIZE})')
+    memory.add_argument('--max-rss-mb', type=int, default=DEFAULT_MAX_RSS_MB,
+                        help=f'청크 모드 피크 RSS 상한 MB (기본 {DEFAULT_MAX_RSS_MB})')
+    memory.add_argument('--scale', type=int, default=1, help='데이터 행을 N배로 늘린 파일로 측정 (기본 1)')
+
+    engines = sub.add_parser('engines', help='Excel 읽기 엔진 속도 측정 + 레코드 동일성 확인 + 보정')
+    engines.add_argument('--data-dir', type=Path, default=DATA_DIR, help='공장 Excel 디렉토리 (기본 data/)')
+    engines.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                         help=f'엔진별 읽기 반복 횟수 (기본 {DEFAULT_REPEAT})')
+    engines.add_argument('--output', type=Path, default=parse_loadplan.ENGINE_CALIBRATION_FILE,
+                         help='보정 결과 파일 (기본 .pipeline_cache/excel_engine.json)')
+    engines.add_argument('--check-only', action='store_true', help='동일성/속도만 확인하고 보정 파일은 기록하지 않음')
+
+    work = sub.add_parser('worker', help=argparse.SUPPRESS)
+    work.add_argument('mode', choices=['full', 'chunked'])
+    work.add_argument('factory')
+    work.add_argument('path')
+    work.add_argument('output')
+    work.add_argument('--batch-size', type=int, default=parse_loadplan.DEFAULT_BATCH_SIZE)
+    work.add_argument('--max-rss-mb', type=int, default=None)
+
+    args = parser.parse_args(argv)
+    if args.command == 'worker':
+        return worker(args)
+    if args.command == 'engines':
+        return bench_engines(args)
+    return bench_memory(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
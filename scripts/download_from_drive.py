@@ -5,134 +5,678 @@ Rachgia Dashboard v19 - 자동화 빌드 시스템
 
 사용법:
     python scripts/download_from_drive.py
+    python scripts/download_from_drive.py --storage local:/path/to/mirror   # 오프라인 (storage.py 참고)
+    python scripts/download_from_drive.py --workers 4 --chunk-size-mb 8 --retries 5
+    python scripts/download_from_drive.py --force   # 다운로드 매니페스트 무시하고 전체 다운로드
+    python scripts/download_from_drive.py --incremental   # Drive changes 토큰 기반 증분 조회
+    python scripts/download_from_drive.py --in-memory [--persist]
+        # 디스크를 거치지 않고 메모리 버퍼를 바로 파싱 → data/parsed_orders.json
+        # (--persist: 보관용으로 data/*.xlsx도 저장)
+    python scripts/download_from_drive.py --pipelined [--queue-size 2] [--in-memory]
+        # 다운로드가 끝난 파일부터 바로 파싱 (네트워크 ∥ CPU) → data/parsed_orders.json
+    python scripts/download_from_drive.py --incremental --defer-commit
+        # 매니페스트/토큰을 .pending 파일에 기록 (run_pipeline.py가 이후 단계 성공 후 확정)
+
+종료 코드:
+    0: 다운로드 성공
+    1: 오류 (인증/조회 실패, 재시도 후에도 다운로드 실패한 파일 있음)
+    3: 변경 없음 (모든 파일이 매니페스트와 일치 → 이후 빌드/배포 단계 생략 가능)
 
 환경 변수:
     GOOGLE_SERVICE_ACCOUNT_KEY: 서비스 계정 JSON 키 (GitHub Secrets에서 제공)
-    GOOGLE_DRIVE_FOLDER_ID: Google Drive 폴더 ID
+    GOOGLE_DRIVE_FOLDER_ID: Google Drive 폴더 ID (local 백엔드에서는 하위 디렉토리, 기본 루트)
+    PIPELINE_STORAGE: 저장소 백엔드 (drive 또는 local:<디렉토리>, 기본 drive)
 """
 
 import os
 import sys
 import json
 import io
+import time
+import random
+import socket
+import ssl
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+import queue
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Google API 라이브러리
+# httplib2는 선택 사항 (Drive 백엔드에서만 사용)
 try:
-    from google.oauth2 import service_account
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaIoBaseDownload
+    import httplib2
 except ImportError:
-    print("Installing required packages...")
-    os.system("pip install google-auth google-auth-oauthlib google-api-python-client")
-    from google.oauth2 import service_account
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaIoBaseDownload
+    httplib2 = None
+
+# 저장소 백엔드 (Google Drive / 로컬 디렉토리)
+from storage import file_md5, open_storage
 
 # 설정
-SCOPES = ['https://www.googleapis.com/auth/drive']
-DATA_DIR = Path(__file__).parent.parent / 'data'
+PROJECT_DIR = Path(__file__).parent.parent
+DATA_DIR = PROJECT_DIR / 'data'
+CACHE_DIR = PROJECT_DIR / '.pipeline_cache'
 
-# 파일 매핑 (Google Drive 파일명 → 로컬 파일명)
-FILE_MAPPING = {
-    'LOADPLAN ASSEMBLY OF RACHGIA FACTORY A': 'Factory_A.xlsx',
-    'LOADPLAN ASSEMBLY OF RACHGIA FACTORY B': 'Factory_B.xlsx',
-    'LOADPLAN ASSEMBLY OF RACHGIA FACTORY C': 'Factory_C.xlsx',
-    'LOADPLAN ASSEMBLY OF RACHGIA FACTORY D': 'Factory_D.xlsx',
-}
+# 증분 조회 상태 (폴더 ID, Drive changes 페이지 토큰)
+CHANGES_STATE_FILE = CACHE_DIR / 'drive_changes.json'
+
+# 다운로드 매니페스트 (로컬 파일명 → Drive id, modifiedTime, md5Checksum, size)
+MANIFEST_FILE = DATA_DIR / 'download_manifest.json'
+
+# 보류 중인 매니페스트/토큰 접미사 (--defer-commit: 이후 단계가 모두 성공하면 commit_pending으로 확정)
+PENDING_SUFFIX = '.pending'
+
+# 파이프라인이 같은 폴더에 올리는 종합 리포트 (generate_consolidated.py) - 증분 조회에서 제외
+REPORT_NAME_PREFIX = '종합_오더현황_'
 
+# 변경 없음 종료 코드 (워크플로우에서 빌드/배포 생략 판단)
+EXIT_UNCHANGED = 3
 
-def get_credentials():
-    """서비스 계정 인증 정보 가져오기"""
-    # GitHub Actions에서 환경 변수로 제공
-    service_account_key = os.environ.get('GOOGLE_SERVICE_ACCOUNT_KEY')
+# 메모리 다운로드 버퍼 한도 (초과분은 임시 파일로 넘김)
+SPOOL_MAX_BYTES = 256 * 1024 * 1024
 
-    if service_account_key:
-        # JSON 문자열에서 직접 로드
-        key_dict = json.loads(service_account_key)
-        return service_account.Credentials.from_service_account_info(key_dict, scopes=SCOPES)
+# 동시 다운로드 워커 수 (공장 파일 4개)
+DEFAULT_WORKERS = 4
 
-    # 로컬 개발용: 파일에서 로드
-    key_file = Path(__file__).parent.parent / 'credentials' / 'service-account.json'
-    if key_file.exists():
-        return service_account.Credentials.from_service_account_file(str(key_file), scopes=SCOPES)
+# 파이프라인 모드: 다운로드 완료 → 파싱 대기열 크기 (가득 차면 다운로드 워커가 대기)
+DEFAULT_QUEUE_SIZE = 2
 
-    raise ValueError(
-        "서비스 계정 키를 찾을 수 없습니다.\n"
-        "1. GOOGLE_SERVICE_ACCOUNT_KEY 환경 변수 설정, 또는\n"
-        "2. credentials/service-account.json 파일 생성"
-    )
+# Range 요청 크기 (청크 단위 재시도/이어받기 - 실패 시 다시 받는 양을 작게 유지)
+DEFAULT_RANGE_SIZE = 8 * 1024 * 1024
 
+# 청크 재시도 (지수 백오프 + 전체 지터, 초 단위)
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
 
-def list_files_in_folder(service, folder_id):
-    """폴더 내 파일 목록 조회"""
-    query = f"'{folder_id}' in parents and mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'"
+# 재시도 대상 HTTP 상태 (그 외 4xx는 즉시 실패)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
 
-    results = service.files().list(
-        q=query,
-        pageSize=100,
-        fields="files(id, name, modifiedTime)"
-    ).execute()
+# 재시도 대상 네트워크 예외 (그 외 예외는 즉시 실패)
+RETRYABLE_ERRORS = (socket.timeout, ConnectionError, ssl.SSLError)
+if httplib2 is not None:
+    RETRYABLE_ERRORS += (httplib2.HttpLib2Error,)
 
-    return results.get('files', [])
+# 파일 매핑 (Google Drive 파일명 → 로컬 파일명)
+FILE_MAPPING = {
+    'LOADPLAN ASSEMBLY OF RACHGIA FACTORY A': 'Factory_A.xlsx',
+    'LOADPLAN ASSEMBLY OF RACHGIA FACTORY B': 'Factory_B.xlsx',
+    'LOADPLAN ASSEMBLY OF RACHGIA FACTORY C': 'Factory_C.xlsx',
+    'LOADPLAN ASSEMBLY OF RACHGIA FACTORY D': 'Factory_D.xlsx',
+}
 
 
-def download_file(service, file_id, local_path):
-    """파일 다운로드"""
-    request = service.files().get_media(fileId=file_id)
+def load_changes_state(folder_id, path=CHANGES_STATE_FILE):
+    """저장된 changes 토큰 (다른 폴더용이면 None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get('folder_id') == folder_id and state.get('page_token') else None
 
-    with io.FileIO(local_path, 'wb') as fh:
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-            if status:
-                print(f"  다운로드 진행: {int(status.progress() * 100)}%")
 
-    print(f"  ✅ 저장 완료: {local_path}")
+def save_changes_state(folder_id, page_token, path=CHANGES_STATE_FILE):
+    """changes 토큰 저장"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'folder_id': folder_id, 'page_token': page_token}, f, indent=2)
 
 
-def main():
+def load_manifest(path=MANIFEST_FILE):
+    """다운로드 매니페스트 로드 (없거나 손상되면 빈 딕셔너리)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    """다운로드 매니페스트 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def pending_path(path):
+    """보류 중인 상태 파일 경로 (확정 전까지 원본은 그대로 유지)"""
+    path = Path(path)
+    return path.with_name(path.name + PENDING_SUFFIX)
+
+
+def commit_pending():
+    """보류 중인 매니페스트/changes 토큰 확정 (이후 단계가 모두 성공한 뒤 호출)"""
+    committed = False
+    for path in (MANIFEST_FILE, CHANGES_STATE_FILE):
+        pending = pending_path(path)
+        if pending.exists():
+            os.replace(pending, path)
+            committed = True
+    return committed
+
+
+def discard_pending():
+    """보류 중인 매니페스트/changes 토큰 폐기 (다음 실행에서 같은 변경을 다시 처리)"""
+    for path in (MANIFEST_FILE, CHANGES_STATE_FILE):
+        pending_path(path).unlink(missing_ok=True)
+
+
+def manifest_entry(file):
+    """Drive 파일 메타데이터 → 매니페스트 항목"""
+    return {
+        'id': file['id'],
+        'name': file.get('name'),
+        'modifiedTime': file.get('modifiedTime'),
+        'md5Checksum': file.get('md5Checksum'),
+        'size': str(file.get('size')) if file.get('size') is not None else None,
+    }
+
+
+def is_unchanged(file, local_path, manifest):
+    """
+    마지막 다운로드 이후 변경이 없는지 확인
+    - 매니페스트의 id / modifiedTime / md5Checksum / size가 모두 같고
+    - 로컬 파일이 남아 있으며 크기와 MD5가 원격과 일치
+    """
+    entry = manifest.get(local_path.name)
+    if not entry or entry != manifest_entry(file):
+        return False
+    if not local_path.exists():
+        return False
+    if entry['size'] is not None and str(local_path.stat().st_size) != entry['size']:
+        return False
+    if entry['md5Checksum'] and file_md5(local_path) != entry['md5Checksum']:
+        return False
+    return True
+
+
+def is_retryable(error):
+    """일시적 오류인지 판단 (HTTP 오류는 상태 코드로, 그 외에는 네트워크 예외만 재시도)"""
+    resp = getattr(error, 'resp', None)
+    status = getattr(resp, 'status', None)
+    if status is not None:
+        return int(status) in RETRYABLE_STATUS
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def with_retry(func, label, retries=MAX_RETRIES):
+    """func 실행, 일시적 오류면 지수 백오프 + 지터로 최대 retries번 재시도"""
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+            print(f"  [{label}] ⚠️ {e} - {delay:.1f}초 후 재시도 ({attempt + 1}/{retries})")
+            time.sleep(delay)
+
+
+def fetch_ranges(storage, file, fh, start, chunk_size, label, retries=MAX_RETRIES):
+    """
+    start 바이트부터 끝까지 Range 요청으로 받아 fh에 이어 쓰기
+    청크마다 따로 재시도하므로 실패해도 마지막으로 받은 바이트부터 다시 요청
+    """
+    size = int(file['size'])
+    offset = start
+    while offset < size:
+        end = min(offset + chunk_size, size) - 1
+        data = with_retry(lambda: storage.get_range(file['id'], offset, end), label, retries)
+        if not data:
+            raise IOError(f"빈 응답 (offset {offset})")
+        fh.write(data)
+        offset += len(data)
+        print(f"  [{label}] 다운로드 진행: {int(offset / size * 100)}%")
+    fh.flush()
+
+
+def fetch_whole(storage, file, fh, chunk_size, label, retries=MAX_RETRIES):
+    """크기 정보가 없는 파일: 전체 다운로드를 통째로 재시도"""
+    def attempt():
+        fh.seek(0)
+        fh.truncate()
+        storage.get(file['id'], fh, chunk_size, label)
+    with_retry(attempt, label, retries)
+
+
+def verify_download(file, actual_size, actual_md5):
+    """원격 size / md5Checksum과 비교 (불일치 시 ValueError)"""
+    if file.get('size') is not None and actual_size != int(file['size']):
+        raise ValueError(f"크기 불일치: remote={file['size']} local={actual_size}")
+    if file.get('md5Checksum') and actual_md5 != file['md5Checksum']:
+        raise ValueError(f"체크섬 불일치: remote={file['md5Checksum']} local={actual_md5}")
+
+
+def partial_paths(local_path):
+    """이어받기용 부분 파일과 상태 파일 경로"""
+    part_path = local_path.with_name(local_path.name + '.part')
+    return part_path, part_path.with_name(part_path.name + '.json')
+
+
+def resume_offset(file, part_path, state_path):
+    """같은 원격 파일(id, md5, size)의 부분 파일이 남아 있으면 이어받을 위치, 아니면 0"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if state != manifest_entry(file) or not part_path.exists():
+        return 0
+    size = part_path.stat().st_size
+    return size if file.get('size') is not None and size < int(file['size']) else 0
+
+
+def download_file(storage, file, local_path, chunk_size=DEFAULT_RANGE_SIZE, label=None,
+                  retries=MAX_RETRIES):
+    """
+    파일 다운로드
+    - <파일>.part에 받고, 중단된 부분 파일이 있으면 Range 요청으로 이어받기
+    - 원격 크기/체크섬 검증 후에만 기존 로컬 파일을 원자적으로 교체
+    """
+    local_path = Path(local_path)
+    label = label or local_path.name
+    part_path, state_path = partial_paths(local_path)
+
+    start = resume_offset(file, part_path, state_path)
+    if start:
+        print(f"  [{label}] ↪️ 이어받기: {start}바이트부터")
+    else:
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest_entry(file), f)
+
+    with io.FileIO(part_path, 'ab' if start else 'wb') as fh:
+        if file.get('size') is not None:
+            fetch_ranges(storage, file, fh, start, chunk_size, label, retries)
+        else:
+            fetch_whole(storage, file, fh, chunk_size, label, retries)
+
+    try:
+        verify_download(file, part_path.stat().st_size, file_md5(part_path))
+    except ValueError:
+        part_path.unlink()
+        state_path.unlink()
+        if start:
+            # 이전 부분 파일이 손상됐을 수 있으므로 처음부터 한 번 더
+            print(f"  [{label}] ⚠️ 이어받은 파일 검증 실패 - 처음부터 다시 다운로드")
+            return download_file(storage, file, local_path, chunk_size, label, retries)
+        raise
+
+    os.replace(part_path, local_path)
+    state_path.unlink()
+    print(f"  [{label}] ✅ 저장 완료 (검증됨): {local_path}")
+
+
+def download_to_buffer(storage, file, chunk_size=DEFAULT_RANGE_SIZE, label=None, retries=MAX_RETRIES):
+    """파일을 메모리 버퍼로 다운로드 (SPOOL_MAX_BYTES 초과 시 임시 파일로 넘김, 검증 포함)"""
+    label = label or file['id']
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    if file.get('size') is not None:
+        fetch_ranges(storage, file, buffer, 0, chunk_size, label, retries)
+    else:
+        fetch_whole(storage, file, buffer, chunk_size, label, retries)
+
+    size = buffer.seek(0, os.SEEK_END)
+    buffer.seek(0)
+    digest = hashlib.md5()
+    for chunk in iter(lambda: buffer.read(1024 * 1024), b''):
+        digest.update(chunk)
+    buffer.seek(0)
+    try:
+        verify_download(file, size, digest.hexdigest())
+    except ValueError:
+        buffer.close()
+        raise
+
+    print(f"  [{label}] ✅ 메모리 버퍼 수신 완료 (검증됨)")
+    return buffer
+
+
+def download_job(storage, file, local_path, chunk_size, in_memory=False, retries=MAX_RETRIES):
+    """워커 스레드 작업: 다운로드 후 (소요 시간, 크기, 메모리 버퍼 또는 None) 반환"""
+    start = time.time()
+    if in_memory:
+        buffer = download_to_buffer(storage, file, chunk_size, Path(local_path).name, retries)
+        size = buffer.seek(0, os.SEEK_END)
+        buffer.seek(0)
+        return time.time() - start, size, buffer
+
+    download_file(storage, file, local_path, chunk_size, retries=retries)
+    return time.time() - start, Path(local_path).stat().st_size, None
+
+
+def download_all(storage, jobs, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_RANGE_SIZE,
+                 in_memory=False, retries=MAX_RETRIES):
+    """
+    (Drive 파일, 로컬 경로) 목록을 제한된 스레드 풀로 동시 다운로드
+    반환: 성공한 (Drive 파일, 로컬 경로, 메모리 버퍼 또는 None) 목록
+    """
+    if not jobs:
+        return []
+
+    succeeded = []
+    timings = []
+    start = time.time()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        futures = {
+            pool.submit(download_job, storage, file, local_path, chunk_size, in_memory, retries): (file, local_path)
+            for file, local_path in jobs
+        }
+        for future in as_completed(futures):
+            file, local_path = futures[future]
+            try:
+                elapsed, size, buffer = future.result()
+            except Exception as e:
+                print(f"  [{local_path.name}] ❌ 다운로드 실패: {e}")
+                continue
+            succeeded.append((file, local_path, buffer))
+            timings.append(elapsed)
+            print(f"  [{local_path.name}] {size / 1024:.1f} KB, {elapsed:.2f}초")
+
+    wall = time.time() - start
+    if timings:
+        print(f"\n  ⏱️ 전체 {wall:.2f}초 (파일별 합계 {sum(timings):.2f}초, 최대 {max(timings):.2f}초)")
+    return succeeded
+
+
+def parse_worker(work, parsed, spans, failed):
+    """
+    소비자 스레드: 큐에서 (로컬 경로, 버퍼 또는 None)를 꺼내 파싱, None이면 종료
+    parsed: {공장: (소스 정보, 레코드)}, spans: 파싱 구간 (시작, 끝) 목록, failed: 파싱 실패 파일명 목록
+    """
+    from parsed_artifact import FACTORY_FILES, buffer_source, file_source
+    from parse_loadplan import parse_factory_file
+
+    factory_by_file = {filename: factory for factory, filename in FACTORY_FILES.items()}
+    while True:
+        item = work.get()
+        if item is None:
+            return
+        local_path, buffer = item
+        factory = factory_by_file.get(local_path.name)
+        if not factory:
+            continue
+
+        begin = time.perf_counter()
+        try:
+            if buffer is not None:
+                source = buffer_source(local_path.name, buffer)
+                records = parse_factory_file(factory, buffer)
+            else:
+                source = file_source(local_path)
+                records = parse_factory_file(factory, str(local_path))
+        except Exception as e:
+            # 소비자가 죽으면 생산자가 큐에서 영원히 대기하므로 파일 단위로 처리
+            print(f"  [{local_path.name}] ❌ 파싱 실패: {e}")
+            failed.append(local_path.name)
+            continue
+        finally:
+            spans.append((begin, time.perf_counter()))
+        parsed[factory] = (source, records)
+        print(f"  [{local_path.name}] 🧩 파싱 완료: {len(records)}개 레코드, {spans[-1][1] - begin:.2f}초")
+
+
+def download_and_parse(storage, jobs, ready=(), workers=DEFAULT_WORKERS, chunk_size=DEFAULT_RANGE_SIZE,
+                       in_memory=False, retries=MAX_RETRIES, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    생산자/소비자 모드: 다운로드가 끝난 파일부터 파싱 워커에 넘겨 네트워크와 CPU 시간을 겹침
+    - 다운로드 워커(생산자)는 받은 파일을 크기 제한 큐에 넣고, 큐가 가득 차면 파싱이 따라올 때까지 대기 (역압)
+      → 메모리 모드에서 동시에 들고 있는 버퍼는 워커 수 + 큐 크기 + 1개 이하
+    - 파싱 워커(소비자)는 스레드 1개 (Excel 파싱은 GIL을 잡으므로 늘려도 빨라지지 않음)
+    - ready: 변경 없이 로컬에 있는 파일 - 다운로드 없이 바로 파싱 대기열에 넣음
+    반환: (성공한 (Drive 파일, 로컬 경로, 메모리 버퍼 또는 None) 목록, {공장: (소스 정보, 레코드)},
+           파싱 실패 파일명 목록, 시간 통계)
+    """
+    import parsed_artifact  # noqa: F401 - 파서(pandas) import 시간은 측정에서 제외
+
+    work = queue.Queue(maxsize=max(1, queue_size))
+    parsed = {}
+    spans = []
+    waits = []
+    parse_failed = []
+
+    def produce(file, local_path):
+        elapsed, size, buffer = download_job(storage, file, local_path, chunk_size, in_memory, retries)
+        finished = time.perf_counter()
+        work.put((local_path, buffer))  # 큐가 가득 차면 여기서 대기
+        waits.append(time.perf_counter() - finished)
+        return elapsed, size, buffer, finished
+
+    succeeded = []
+    timings = []
+    start = time.perf_counter()
+    download_end = start
+    consumer = threading.Thread(target=parse_worker, args=(work, parsed, spans, parse_failed),
+                                name='parse-worker', daemon=True)
+    consumer.start()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs) or 1))) as pool:
+        futures = {
+            pool.submit(produce, file, local_path): (file, local_path)
+            for file, local_path in jobs
+        }
+        # 다운로드를 먼저 시작해 두고 이미 있는 파일을 파싱 대기열에 넣음
+        for local_path in ready:
+            work.put((local_path, None))
+        for future in as_completed(futures):
+            file, local_path = futures[future]
+            try:
+                elapsed, size, buffer, finished = future.result()
+            except Exception as e:
+                print(f"  [{local_path.name}] ❌ 다운로드 실패: {e}")
+                continue
+            succeeded.append((file, local_path, buffer))
+            timings.append(elapsed)
+            download_end = max(download_end, finished)
+            print(f"  [{local_path.name}] {size / 1024:.1f} KB, {elapsed:.2f}초")
+
+    work.put(None)
+    consumer.join()
+
+    stats = overlap_stats(time.perf_counter() - start, download_end - start, spans, waits)
+    print_overlap(stats, timings, queue_size)
+    return succeeded, parsed, parse_failed, stats
+
+
+def overlap_stats(wall, download_wall, spans, waits):
+    """
+    겹침으로 숨겨진 시간 = (다운로드 구간 + 파싱 시간) - 실제 전체 시간
+    다운로드를 모두 마친 뒤 파싱하는 기존 순서라면 두 시간이 그대로 더해짐
+    """
+    parse_seconds = sum(end - begin for begin, end in spans)
+    serial = download_wall + parse_seconds
+    return {
+        'wall': wall,
+        'download': download_wall,
+        'parse': parse_seconds,
+        'serial': serial,
+        'hidden': max(0.0, serial - wall),
+        'backpressure': sum(waits),
+    }
+
+
+def print_overlap(stats, timings, queue_size):
+    """파이프라인 모드 시간 요약"""
+    if timings:
+        print(f"\n  ⏱️ 다운로드 {stats['download']:.2f}초 (파일별 합계 {sum(timings):.2f}초, 최대 {max(timings):.2f}초)")
+    ratio = stats['hidden'] / stats['serial'] * 100 if stats['serial'] else 0.0
+    print(f"  ⏱️ 전체 {stats['wall']:.2f}초 = 다운로드 {stats['download']:.2f}초 + 파싱 {stats['parse']:.2f}초"
+          f" - 겹침 {stats['hidden']:.2f}초 ({ratio:.0f}% 숨김)")
+    if stats['backpressure'] > 0.01:
+        print(f"  ⏳ 파싱 대기열 가득 참 (크기 {queue_size}) - 다운로드 워커 대기 {stats['backpressure']:.2f}초")
+
+
+def write_parsed_artifact(parsed):
+    """파이프라인 모드 파싱 결과 → 공유 아티팩트 (공장 순서는 FACTORY_FILES 기준, 도착 순서와 무관)"""
+    from parsed_artifact import FACTORY_FILES, ARTIFACT_FILE, assemble_artifact, write_artifact
+
+    sources = {factory: parsed[factory][0] for factory in FACTORY_FILES if factory in parsed}
+    artifact = assemble_artifact(sources, {factory: parsed[factory][1] for factory in sources})
+    write_artifact(artifact, ARTIFACT_FILE)
+    print(f"  ✅ 파싱 아티팩트 저장: {ARTIFACT_FILE} ({len(artifact['records'])}개 레코드)")
+    return artifact
+
+
+def persist_buffer(buffer, local_path):
+    """메모리 버퍼를 로컬 파일로 보관 (임시 파일에 쓴 뒤 교체)"""
+    tmp_path = local_path.with_name(local_path.name + '.tmp')
+    buffer.seek(0)
+    with open(tmp_path, 'wb') as f:
+        shutil.copyfileobj(buffer, f)
+    buffer.seek(0)
+    os.replace(tmp_path, local_path)
+
+
+def remove_stale_workbooks(keep=()):
+    """
+    메모리 모드: 아티팩트에 쓰이지 않은 data/ 공장 파일 삭제 (keep: 방금 보관한 파일명)
+    남겨 두면 load_artifact가 이 오래된 파일로 다시 파싱해서 새 아티팩트를 덮어씀
+    """
+    for name in FILE_MAPPING.values():
+        path = DATA_DIR / name
+        if name not in keep and path.exists():
+            path.unlink()
+            print(f"  🗑️ 이전 로컬 파일 삭제 (메모리 모드, 아티팩트 재파싱 방지): {name}")
+
+
+def build_artifact_in_memory(succeeded, persist=False):
+    """다운로드 버퍼를 바로 파싱하여 공유 아티팩트 저장 (디스크 왕복 없음)"""
+    from parsed_artifact import FACTORY_FILES, ARTIFACT_FILE, build_artifact_from_buffers, write_artifact
+
+    factory_by_file = {filename: factory for factory, filename in FACTORY_FILES.items()}
+    buffers = {}
+    for file, local_path, buffer in succeeded:
+        factory = factory_by_file.get(local_path.name)
+        if factory:
+            buffers[factory] = (local_path.name, buffer)
+        if persist:
+            persist_buffer(buffer, local_path)
+
+    print(f"\n🧩 메모리 버퍼 파싱: {', '.join(sorted(buffers))}")
+    artifact = build_artifact_from_buffers(buffers)
+    write_artifact(artifact, ARTIFACT_FILE)
+    print(f"  ✅ 파싱 아티팩트 저장: {ARTIFACT_FILE} ({len(artifact['records'])}개 레코드)")
+    remove_stale_workbooks({local_path.name for _, local_path, _ in succeeded} if persist else ())
+
+    for _, _, buffer in succeeded:
+        buffer.close()
+    return artifact
+
+
+def main(argv=None):
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='Google Drive → data/ 다운로드')
+    parser.add_argument('--storage', default=None,
+                        help='저장소 백엔드: drive 또는 local:<디렉토리> (기본: PIPELINE_STORAGE 또는 drive)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'동시 다운로드 수 (기본 {DEFAULT_WORKERS})')
+    parser.add_argument('--chunk-size-mb', type=int, default=DEFAULT_RANGE_SIZE // (1024 * 1024),
+                        help=f'Range 요청(재시도 단위) 크기 MB (기본 {DEFAULT_RANGE_SIZE // (1024 * 1024)})')
+    parser.add_argument('--retries', type=int, default=MAX_RETRIES,
+                        help=f'청크별 재시도 횟수 (기본 {MAX_RETRIES}, 지수 백오프 + 지터)')
+    parser.add_argument('--force', action='store_true',
+                        help='다운로드 매니페스트를 무시하고 모든 파일 다운로드')
+    parser.add_argument('--incremental', action='store_true',
+                        help='저장된 Drive changes 토큰 이후 변경된 파일만 조회')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='디스크 대신 메모리 버퍼로 받아 바로 파싱 (data/parsed_orders.json 생성)')
+    parser.add_argument('--persist', action='store_true',
+                        help='--in-memory 모드에서 원본 xlsx도 data/에 보관')
+    parser.add_argument('--pipelined', action='store_true',
+                        help='다운로드가 끝난 파일부터 바로 파싱 (data/parsed_orders.json 생성)')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f'--pipelined 파싱 대기열 크기 (가득 차면 다운로드 대기, 기본 {DEFAULT_QUEUE_SIZE})')
+    parser.add_argument('--defer-commit', action='store_true',
+                        help='매니페스트/changes 토큰을 .pending 파일에 기록 (호출 측이 이후 단계 성공 후 확정)')
+    args = parser.parse_args(argv)
+
+    # 메모리 모드는 공장 파일 전체로 아티팩트를 만들므로 증분 조회 미사용
+    if args.in_memory and args.incremental:
+        print("⚠️ --in-memory 모드에서는 --incremental을 사용하지 않습니다 (전체 조회)")
+        args.incremental = False
+    chunk_size = args.chunk_size_mb * 1024 * 1024
+
+    # 확정 보류 모드: 지난 실행이 남긴 보류 파일은 버리고 이번 결과만 기록
+    manifest_path, changes_path = MANIFEST_FILE, CHANGES_STATE_FILE
+    if args.defer_commit:
+        discard_pending()
+        manifest_path, changes_path = pending_path(MANIFEST_FILE), pending_path(CHANGES_STATE_FILE)
+
     print("=" * 60)
     print("🚀 Google Drive 자동 다운로드 시작")
     print("=" * 60)
 
+    # 저장소 백엔드 / 인증
+    print("\n📝 저장소 연결 중...")
+    try:
+        storage = open_storage(args.storage)
+        print(f"  ✅ 연결 성공 ({storage.name})")
+    except Exception as e:
+        print(f"  ❌ 저장소 연결/인증 실패: {e}")
+        sys.exit(1)
+
     # 폴더 ID 확인
-    folder_id = os.environ.get('GOOGLE_DRIVE_FOLDER_ID')
+    folder_id = os.environ.get('GOOGLE_DRIVE_FOLDER_ID') or storage.default_folder
     if not folder_id:
         print("❌ GOOGLE_DRIVE_FOLDER_ID 환경 변수가 설정되지 않았습니다.")
         sys.exit(1)
 
-    # 인증
-    print("\n📝 Google 인증 중...")
-    try:
-        credentials = get_credentials()
-        service = build('drive', 'v3', credentials=credentials)
-        print("  ✅ 인증 성공")
-    except Exception as e:
-        print(f"  ❌ 인증 실패: {e}")
-        sys.exit(1)
+    if args.incremental and not storage.supports_changes:
+        print(f"  ⚠️ {storage.name} 백엔드는 증분 조회를 지원하지 않음 - 전체 조회")
+        args.incremental = False
 
     # 데이터 디렉토리 생성
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+    # 증분 조회는 토큰과 로컬 파일(매니페스트 포함)이 모두 있을 때만 사용
+    manifest = {} if args.force else load_manifest()
+    changes_state = None
+    if args.incremental and not args.force:
+        changes_state = load_changes_state(folder_id)
+        local_ready = all(
+            name in manifest and (DATA_DIR / name).exists() for name in FILE_MAPPING.values()
+        )
+        if changes_state and not local_ready:
+            print("  ⚠️ 로컬 파일/매니페스트 불완전 - 전체 조회로 전환")
+            changes_state = None
+
     # 파일 목록 조회
     print(f"\n📂 폴더 조회 중: {folder_id}")
+    new_page_token = None
     try:
-        files = list_files_in_folder(service, folder_id)
-        print(f"  발견된 파일: {len(files)}개")
+        if changes_state:
+            files, new_page_token = storage.list_changes(
+                folder_id, changes_state['page_token'], ignore_prefixes=(REPORT_NAME_PREFIX,))
+            # 공장 파일이 아닌 변경 (다른 xlsx 등)은 다운로드 대상이 아니므로 변경 없음과 같음
+            files = [f for f in files if any(pattern in f['name'] for pattern in FILE_MAPPING)]
+            print(f"  변경된 파일: {len(files)}개 (증분 조회)")
+        else:
+            if args.incremental:
+                # 목록 조회 전에 토큰을 받아야 조회 중 변경을 놓치지 않음
+                new_page_token = storage.start_page_token()
+            files = storage.list(folder_id)
+            print(f"  발견된 파일: {len(files)}개")
     except Exception as e:
         print(f"  ❌ 폴더 조회 실패: {e}")
         sys.exit(1)
 
     if not files:
+        if changes_state:
+            save_changes_state(folder_id, new_page_token, changes_path)
+            print("\n⏭️ 마지막 조회 이후 변경된 파일 없음 - 이후 단계 생략 가능")
+            return EXIT_UNCHANGED
         print("  ⚠️ 폴더에 Excel 파일이 없습니다.")
         sys.exit(1)
 
-    # 파일 다운로드
+    # 다운로드 대상 선정 (같은 로컬 파일로 매핑되면 순차 실행 때처럼 마지막 파일 사용)
     print("\n📥 파일 다운로드 시작...")
-    downloaded = 0
+    jobs = {}
 
     for file in files:
         file_name = file['name']
@@ -153,17 +697,95 @@ def main():
             print(f"     ⏭️ 스킵 (매핑 없음)")
             continue
 
-        local_path = DATA_DIR / local_name
-
-        try:
-            download_file(service, file_id, str(local_path))
-            downloaded += 1
-        except Exception as e:
-            print(f"     ❌ 다운로드 실패: {e}")
+        if local_name in jobs:
+            print(f"     ↪️ {local_name} 대상 교체 (이전: {jobs[local_name][0]['name']})")
+        jobs[local_name] = (file, DATA_DIR / local_name)
+
+    # 변경 없는 파일 제외 (다운로드 매니페스트 비교)
+    pending = []
+    unchanged = 0
+    if args.in_memory:
+        # 아티팩트는 전체 공장으로 만들어지므로 하나라도 바뀌면 전부 다시 받음
+        from parsed_artifact import ARTIFACT_FILE
+        all_same = all(manifest.get(lp.name) == manifest_entry(f) for f, lp in jobs.values())
+        if all_same and ARTIFACT_FILE.exists():
+            print("  ⏭️ 모든 파일 변경 없음 (매니페스트 일치, 아티팩트 있음)")
+            unchanged = len(jobs)
+        else:
+            pending = list(jobs.values())
+    else:
+        for file, local_path in jobs.values():
+            if is_unchanged(file, local_path, manifest):
+                print(f"  [{local_path.name}] ⏭️ 변경 없음 (수정: {file.get('modifiedTime')})")
+                unchanged += 1
+            else:
+                pending.append((file, local_path))
+
+    # 동시 다운로드 (스레드별 HTTP 세션)
+    parse_failed = []
+    print(f"\n  동시 다운로드: {len(pending)}개 파일, 워커 {args.workers}개, 청크 {args.chunk_size_mb}MB")
+    if args.pipelined and pending:
+        # 변경 없는 로컬 파일도 아티팩트에 들어가야 하므로 다운로드와 함께 파싱
+        pending_names = {local_path.name for _, local_path in pending}
+        ready = [] if args.in_memory else [
+            DATA_DIR / name for name in FILE_MAPPING.values()
+            if name not in pending_names and (DATA_DIR / name).exists()
+        ]
+        print(f"  파이프라인 모드: 파싱 대기열 {args.queue_size}, 로컬 파일 {len(ready)}개 함께 파싱")
+        succeeded, parsed, parse_failed, _ = download_and_parse(storage, pending, ready, args.workers, chunk_size,
+                                                                args.in_memory, args.retries, args.queue_size)
+    else:
+        succeeded = download_all(storage, pending, args.workers, chunk_size, args.in_memory, args.retries)
+    downloaded = len(succeeded)
+
+    if args.pipelined and succeeded:
+        # 전부 받고 전부 파싱됐을 때만 아티팩트 갱신 (일부 실패 시 이전 아티팩트 유지)
+        # 공장이 빠진 아티팩트를 쓰면 메모리 모드에서는 is_artifact_fresh가 그대로 받아들임
+        complete = downloaded == len(pending) and not parse_failed
+        if downloaded < len(pending):
+            print("  ❌ 일부 다운로드 실패 - 아티팩트 갱신 생략")
+        elif parse_failed:
+            print(f"  ❌ 파싱 실패 ({', '.join(parse_failed)}) - 아티팩트 갱신 생략")
+        else:
+            write_parsed_artifact(parsed)
+        if args.in_memory:
+            for file, local_path, buffer in succeeded:
+                if args.persist and complete:
+                    persist_buffer(buffer, local_path)
+                buffer.close()
+            if complete:
+                remove_stale_workbooks({lp.name for _, lp, _ in succeeded} if args.persist else ())
+            else:
+                # 매니페스트에 남기지 않아야 다음 실행이 다시 받아서 파싱
+                succeeded = []
+                if downloaded < len(pending):
+                    downloaded = 0
+
+    # 메모리 모드: 전부 받았을 때만 바로 파싱 (일부 실패 시 아티팩트 미갱신)
+    elif args.in_memory and succeeded:
+        if downloaded < len(pending):
+            print("  ❌ 일부 다운로드 실패 - 아티팩트 갱신 생략")
+            for _, _, buffer in succeeded:
+                buffer.close()
+            succeeded = []
+            downloaded = 0
+        else:
+            build_artifact_in_memory(succeeded, args.persist)
+
+    # 매니페스트 갱신 (성공한 파일만 기록, 실패한 파일은 다음 실행에서 재시도)
+    for file, local_path in pending:
+        manifest.pop(local_path.name, None)
+    for file, local_path, _ in succeeded:
+        manifest[local_path.name] = manifest_entry(file)
+    save_manifest(manifest, manifest_path)
+
+    # 실패 없이 끝났을 때만 토큰 전진 (실패 파일은 다음 증분 조회에서 다시 잡힘)
+    if new_page_token and len(succeeded) == len(pending) and not parse_failed:
+        save_changes_state(folder_id, new_page_token, changes_path)
 
     # 결과 요약
     print("\n" + "=" * 60)
-    print(f"✅ 다운로드 완료: {downloaded}개 파일")
+    print(f"✅ 다운로드 완료: {downloaded}개 파일 (변경 없음 {unchanged}개, 실패 {len(pending) - downloaded}개)")
     print(f"📂 저장 위치: {DATA_DIR}")
     print("=" * 60)
 
@@ -173,7 +795,19 @@ def main():
         size = f.stat().st_size / 1024
         print(f"  - {f.name} ({size:.1f} KB)")
 
-    return 0 if downloaded > 0 else 1
+    # 재시도 후에도 실패한 파일이 있으면 오래된 데이터로 빌드하지 않도록 오류 종료
+    if downloaded < len(pending):
+        print(f"\n❌ {len(pending) - downloaded}개 파일 다운로드 실패 - 이전 파일은 그대로 유지됨")
+        return 1
+    if parse_failed:
+        print(f"\n❌ {len(parse_failed)}개 파일 파싱 실패 - 파싱 아티팩트는 갱신하지 않음")
+        return 1
+    if downloaded > 0:
+        return 0
+    if unchanged > 0 and not pending:
+        print("\n⏭️ 모든 파일 변경 없음 - 이후 단계 생략 가능")
+        return EXIT_UNCHANGED
+    return 1
 
 
 if __name__ == '__main__':
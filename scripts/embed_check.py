@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+embed_data 날짜 컬럼 포맷 추론 검증
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+d/m, m/d 모두 가능한 값(03/04/2025 등)이 섞인 날짜 컬럼을 합성 워크북으로 만들어
+parse_excel_file을 돌리고, 한 컬럼 안의 같은 값이 샘플 구간(DATE_SAMPLE_SIZE) 안팎에서
+같은 날짜로 풀리는지 확인한다.
+
+검사 항목 (CHECKS):
+    ambiguous-md    m/d 컬럼 (DATE_SAMPLE_SIZE보다 긴) - 모호한 값이 샘플 구간에서도 m/d로 풀리는지
+    ambiguous-dm    d/m 컬럼 (DATE_SAMPLE_SIZE보다 긴) - 모호한 값이 끝까지 d/m로 풀리는지
+    short-column    샘플 수보다 짧은 컬럼 - 모인 집계로 포맷을 정해 모호한 값을 보정하는지
+
+사용법:
+    python scripts/embed_check.py
+    python scripts/embed_check.py --checks ambiguous-md
+
+종료 코드:
+    0: 모든 검사 통과
+    1: 실패한 검사 있음
+"""
+
+import io
+import sys
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+import openpyxl
+
+import embed_data
+
+# 설정
+HEADERS = ['Order No', 'Style', 'Qty', 'CRD']
+AMBIGUOUS = '03/04/2025'  # d/m → 2025-04-03, m/d → 2025-03-04
+
+
+def quiet():
+    """검사 대상 함수의 진행 로그 숨김"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def parse_column(work_dir, values):
+    """CRD 컬럼이 values인 합성 워크북 → parse_excel_file 결과의 crd 목록"""
+    path = work_dir / 'dates.xlsx'
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append(HEADERS)
+    for i, value in enumerate(values):
+        sheet.append([f'ORD{i:04d}', 'STYLE', 100, value])
+    wb.save(path)
+    with quiet():
+        records = embed_data.parse_excel_file(path, 'A')
+    return [record['crd'] for record in records]
+
+
+def ambiguous_column(unambiguous, length):
+    """모호한 값과 포맷이 확실한 값을 2:1로 섞은 컬럼 (샘플 구간 첫 값부터 모호한 값)"""
+    return [AMBIGUOUS if i % 3 != 2 else unambiguous for i in range(length)]
+
+
+def check_ambiguous(work_dir, unambiguous, expected):
+    length = embed_data.DATE_SAMPLE_SIZE * 3
+    crds = parse_column(work_dir, ambiguous_column(unambiguous, length))
+    sample = embed_data.DATE_SAMPLE_SIZE
+    inside = {crd for i, crd in enumerate(crds[:sample]) if i % 3 != 2}
+    outside = {crd for i, crd in enumerate(crds[sample:], sample) if i % 3 != 2}
+    return [
+        (f'레코드 {length}개 모두 파싱', len(crds) == length),
+        (f'샘플 구간 {AMBIGUOUS} → {expected}', inside == {expected}),
+        (f'샘플 이후 {AMBIGUOUS} → {expected}', outside == {expected}),
+    ]
+
+
+def check_ambiguous_md(work_dir):
+    return check_ambiguous(work_dir, '12/25/2025', '2025-03-04')
+
+
+def check_ambiguous_dm(work_dir):
+    return check_ambiguous(work_dir, '25/12/2025', '2025-04-03')
+
+
+def check_short_column(work_dir):
+    crds = parse_column(work_dir, [AMBIGUOUS, '12/25/2025', AMBIGUOUS])
+    return [('샘플 부족 컬럼도 집계 포맷(m/d)으로 보정',
+             crds == ['2025-03-04', '2025-12-25', '2025-03-04'])]
+
+
+CHECKS = {
+    'ambiguous-md': check_ambiguous_md,
+    'ambiguous-dm': check_ambiguous_dm,
+    'short-column': check_short_column,
+}
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='embed_data 날짜 컬럼 포맷 추론 검증')
+    parser.add_argument('--checks', default=','.join(CHECKS),
+                        help=f'실행할 검사 (쉼표 구분, 기본: {",".join(CHECKS)})')
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.checks.split(',') if name.strip()]
+    unknown = [name for name in selected if name not in CHECKS]
+    if unknown:
+        print(f"❌ 알 수 없는 검사: {', '.join(unknown)} (가능: {', '.join(CHECKS)})")
+        return 1
+
+    print("=" * 60)
+    print(f"🔬 날짜 컬럼 포맷 추론 검증 (샘플 {embed_data.DATE_SAMPLE_SIZE}개)")
+    print("=" * 60)
+
+    failures = 0
+    for name in selected:
+        print(f"\n▶️ {name}")
+        with tempfile.TemporaryDirectory(prefix='embed_check_') as tmp:
+            try:
+                results = CHECKS[name](Path(tmp))
+            except Exception as e:
+                print(f"   ❌ 실행 실패: {e}")
+                failures += 1
+                continue
+        for description, ok in results:
+            print(f"   {'✅' if ok else '❌'} {description}")
+            failures += not ok
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"❌ 실패 {failures}건")
+        return 1
+    print("✅ 모든 검사 통과")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,8 +5,14 @@ Rachgia Dashboard v19 - 자동화 빌드 시스템
 
 사용법:
     python scripts/embed_data.py
+    python scripts/embed_data.py --legacy-parser   # 헤더 기반 openpyxl 파서 사용
+    python scripts/embed_data.py --format json     # 컬럼 인코딩 없이 레코드 배열 그대로 임베드
+    python scripts/embed_data.py --shards data/shards  # 공장 × SDD 월 단위 샤드 + manifest.json 추가 출력
+    python scripts/embed_data.py --precompress     # HTML/샤드의 .gz/.br 사전 압축본 + 크기 리포트 (Apache .htaccess 전용)
+    python scripts/embed_data.py --tiers data/tiers    # 미완료(hot, 매번 재생성) / 완료(cold, 추가 전용) 계층 출력
+    python scripts/embed_data.py --profile-memory  # 구간별 메모리 리포트 (memory_profile.py)
 
-입력: data/*.xlsx (4개 공장 파일)
+입력: data/parsed_orders.json (parsed_artifact.py 공유 아티팩트, 없으면 data/*.xlsx 파싱)
 출력: rachgia_dashboard_v19.html (EMBEDDED_DATA 업데이트)
 """
 
@@ -14,8 +20,14 @@ import os
 import sys
 import json
 import re
+import mmap
+import gzip
+import base64
+import hashlib
+import argparse
+from collections import Counter
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date
 
 try:
     import openpyxl
@@ -24,10 +36,55 @@ except ImportError:
     os.system("pip install openpyxl")
     import openpyxl
 
+# brotli는 선택 사항 (없으면 .br 생략)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from parsed_artifact import load_artifact
+from parse_loadplan import profile_stage
+from memory_profile import add_profile_argument, start_profiling
+
 # 경로 설정
 PROJECT_DIR = Path(__file__).parent.parent
 DATA_DIR = PROJECT_DIR / 'data'
 HTML_FILE = PROJECT_DIR / 'rachgia_dashboard_v19.html'
+SW_FILE = PROJECT_DIR / 'sw.js'
+
+# EMBEDDED_DATA 스플라이스 마커 (HTML: const EMBEDDED_DATA = /*BEGIN*/[...]/*END*/;)
+DATA_BEGIN_MARKER = b'/* EMBEDDED_DATA:BEGIN */'
+DATA_END_MARKER = b'/* EMBEDDED_DATA:END */'
+CACHE_VERSION_PREFIX = b"CACHE_VERSION = 'rachgia-v"
+CONTENT_HASH_LENGTH = 10
+DEFAULT_BASE_VERSION = '19.0.0'
+
+# 컬럼 인코딩 페이로드 포맷 (HTML의 decodeEmbeddedPayload와 계약)
+COLUMNAR_FORMAT = 'dict-columnar-v1'
+DAY_EPOCH = date(1970, 1, 1)
+ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# 샤드 출력 (orders-<공장>-<SDD 월>.<해시>.json + manifest.json)
+SHARD_PREFIX = 'orders-'
+SHARD_MANIFEST = 'manifest.json'
+
+# 핫/콜드 계층 출력 (hot.<해시>.json + cold-<순번>.<해시>.json + tiers.json)
+# cold_index.json은 세그먼트별 레코드 키 (다음 실행의 추가분 계산용, 배포 대상 아님)
+# 아직 대시보드 로더가 없으므로 배포 파이프라인에는 연결하지 않음 (HTML 임베드는 전체 데이터 유지)
+HOT_PREFIX = 'hot.'
+COLD_PREFIX = 'cold-'
+TIER_MANIFEST = 'tiers.json'
+COLD_INDEX = 'cold_index.json'
+COLD_INDEX_VERSION = 2
+RECORD_KEY_LENGTH = 16
+
+# cold 레코드가 바뀌거나 사라지면 세그먼트 행 번호를 삭제 표시(tombstone)만 하고,
+# 삭제 표시된 행이 cold 전체의 이 비율을 넘을 때만 세그먼트 하나로 재구성 (압축)
+COLD_COMPACT_RATIO = 0.25
+
+# 사전 압축 (.gz / .br) 리포트
+PRECOMPRESS_REPORT = DATA_DIR / 'precompress_report.json'
+COMPRESSED_SUFFIXES = ('.gz', '.br')
 
 # 공장 파일 매핑
 FACTORY_FILES = {
@@ -57,25 +114,38 @@ COLUMN_MAPPING = {
     'code04': ['Code04', 'CODE04', 'code04', 'Code 04'],
 }
 
+# 정규화 헤더(소문자) → JSON 키 (헤더당 O(1) 조회)
+HEADER_ALIASES = {}
+for _json_key, _aliases in COLUMN_MAPPING.items():
+    for _alias in _aliases:
+        HEADER_ALIASES.setdefault(_alias.strip().lower(), _json_key)
+
+HEADER_SEARCH_ROWS = 10
+
+# 문자열 날짜 포맷 (우선순위 순) 및 컬럼 포맷 추론 샘플 수
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%Y.%m.%d']
+DATE_SAMPLE_SIZE = 20
 
-def find_header_row(sheet):
-    """헤더 행 찾기"""
-    for row_idx, row in enumerate(sheet.iter_rows(min_row=1, max_row=10, values_only=True), 1):
-        row_str = ' '.join(str(cell) for cell in row if cell)
-        if any(keyword in row_str.upper() for keyword in ['ORDER', 'STYLE', 'QTY', 'CRD']):
-            return row_idx
-    return 1
 
+def is_header_candidate(row):
+    """헤더 행 후보인지 확인 (주요 키워드 포함 여부)"""
+    row_str = ' '.join(str(cell) for cell in row if cell)
+    return any(keyword in row_str.upper() for keyword in ['ORDER', 'STYLE', 'QTY', 'CRD'])
 
-def find_column_index(headers, target_keys):
-    """컬럼 인덱스 찾기"""
+
+def build_column_index(headers):
+    """
+    헤더 → 컬럼 인덱스 매핑 (정규화 alias 사전으로 헤더당 O(1) 조회)
+    같은 키에 여러 헤더가 맞으면 가장 앞 컬럼 사용
+    """
+    col_indices = {}
     for idx, header in enumerate(headers):
-        if header:
-            header_str = str(header).strip()
-            for key in target_keys:
-                if header_str.lower() == key.lower():
-                    return idx
-    return None
+        if not header:
+            continue
+        json_key = HEADER_ALIASES.get(str(header).strip().lower())
+        if json_key is not None and json_key not in col_indices:
+            col_indices[json_key] = idx
+    return col_indices
 
 
 def parse_date(value):
@@ -86,7 +156,7 @@ def parse_date(value):
         return value.strftime('%Y-%m-%d')
     if isinstance(value, str):
         # 다양한 날짜 형식 처리
-        for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%Y.%m.%d']:
+        for fmt in DATE_FORMATS:
             try:
                 return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
             except ValueError:
@@ -94,6 +164,101 @@ def parse_date(value):
     return str(value) if value else None
 
 
+class DateColumnParser:
+    """
+    컬럼 단위 날짜 파서 (포맷 추론)
+    - 처음 DATE_SAMPLE_SIZE개 문자열 값은 parse_date와 같은 결과를 임시로 반환하면서
+      값마다 파싱에 성공하는 포맷을 모두 집계 (목록 앞 포맷만 세면 d/m, m/d 모두 되는 값이 앞 포맷으로 쏠림)
+    - 이후에는 가장 많이 맞은 포맷(동률이면 DATE_FORMATS 순서)을 먼저 시도하고,
+      실패할 때만 나머지 포맷으로 폴백 (d/m, m/d 모두 가능한 값은 컬럼 포맷을 따름)
+    - 샘플 값은 호출 순번과 함께 보관했다가 finish()에서 컬럼 포맷으로 다시 변환
+      (03/04/2025 같은 값이 샘플 구간 안팎에서 다른 날짜가 되지 않도록)
+    """
+
+    def __init__(self, sample_size=None):
+        self.sample_size = DATE_SAMPLE_SIZE if sample_size is None else sample_size
+        self.format = None
+        self.calls = 0
+        self.sampled = 0
+        self.fast_hits = 0
+        self.fallbacks = 0
+        self._votes = {}
+        self._samples = []
+
+    def __call__(self, value):
+        self.calls += 1
+        if not isinstance(value, str):
+            return parse_date(value)
+
+        if self.format is None:
+            return self._sample(value)
+
+        result, fast = self._resolve(value)
+        if fast:
+            self.fast_hits += 1
+        else:
+            self.fallbacks += 1
+        return result
+
+    def _resolve(self, value):
+        """컬럼 포맷 우선 변환 → (결과, 컬럼 포맷으로 풀렸는지)"""
+        try:
+            return datetime.strptime(value, self.format).strftime('%Y-%m-%d'), True
+        except ValueError:
+            pass
+
+        for fmt in DATE_FORMATS:
+            if fmt == self.format:
+                continue
+            try:
+                return datetime.strptime(value, fmt).strftime('%Y-%m-%d'), False
+            except ValueError:
+                continue
+        return (value if value else None), False
+
+    def _sample(self, value):
+        """샘플 구간: 전체 포맷 시도 (임시 결과는 첫 번째로 맞은 포맷) + 맞은 포맷 모두 집계"""
+        self.sampled += 1
+        self._samples.append((self.calls - 1, value))
+        result = None
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+            self._votes[fmt] = self._votes.get(fmt, 0) + 1
+            if result is None:
+                result = parsed
+        if result is None:
+            result = value if value else None
+
+        if self.sampled >= self.sample_size:
+            self._choose_format()
+        return result
+
+    def _choose_format(self):
+        if self._votes:
+            # max는 동률이면 앞 요소를 반환 → DATE_FORMATS 순서가 동률 우선순위
+            self.format = max(DATE_FORMATS, key=lambda fmt: self._votes.get(fmt, 0))
+
+    def finish(self):
+        """
+        샘플 값을 컬럼 포맷으로 다시 변환 → [(호출 순번, 값)] (호출 순번 = 이 파서로 변환한 n번째 값)
+        샘플이 sample_size보다 적게 끝난 컬럼도 모인 집계로 포맷을 정함
+        """
+        if self.format is None:
+            self._choose_format()
+        samples, self._samples = self._samples, []
+        if self.format is None:
+            return []
+        return [(index, self._resolve(value)[0]) for index, value in samples]
+
+    def summary(self):
+        """추론 결과 요약 문자열"""
+        fmt = self.format or '(샘플 부족)'
+        return f"{fmt} - 샘플 {self.sampled}, 빠른 경로 {self.fast_hits}, 폴백 {self.fallbacks}"
+
+
 def parse_number(value):
     """숫자 파싱"""
     if value is None:
@@ -109,138 +274,707 @@ def parse_number(value):
     return 0
 
 
-def parse_excel_file(file_path, factory_name):
-    """Excel 파일 파싱"""
-    print(f"\n📊 파싱 중: {file_path.name} (Factory {factory_name})")
+def parse_text(value):
+    """문자열 파싱"""
+    return str(value).strip() if value else ''
 
-    wb = openpyxl.load_workbook(file_path, data_only=True)
-    sheet = wb.active
 
-    # 헤더 행 찾기
-    header_row = find_header_row(sheet)
-    headers = [cell for cell in sheet[header_row]]
-    header_values = [cell.value for cell in headers]
+# 컬럼별 변환 함수 (날짜 컬럼은 파일마다 DateColumnParser, 나머지는 parse_text)
+DATE_COLUMNS = ('crd', 'sdd')
+COLUMN_CONVERTERS = {
+    **{key: parse_number for key in ['qty', 's_cut', 'pre_sew', 'sew_input', 'sew_bal',
+                                     'osc', 'ass', 'wh_in', 'wh_out', 'aql']},
+}
 
-    print(f"  헤더 행: {header_row}")
-    print(f"  컬럼 수: {len(header_values)}")
 
-    # 컬럼 인덱스 매핑
-    col_indices = {}
-    for json_key, possible_headers in COLUMN_MAPPING.items():
-        idx = find_column_index(header_values, possible_headers)
-        if idx is not None:
-            col_indices[json_key] = idx
+def compile_converters(col_indices):
+    """(JSON 키, 컬럼 인덱스, 변환 함수) 목록 - COLUMN_MAPPING 순서 유지"""
+    converters = []
+    for json_key in COLUMN_MAPPING:
+        if json_key not in col_indices:
+            continue
+        if json_key in DATE_COLUMNS:
+            convert = DateColumnParser()
+        else:
+            convert = COLUMN_CONVERTERS.get(json_key, parse_text)
+        converters.append((json_key, col_indices[json_key], convert))
+    return converters
 
-    print(f"  매핑된 컬럼: {list(col_indices.keys())}")
 
-    # 데이터 파싱
-    records = []
-    for row_idx, row in enumerate(sheet.iter_rows(min_row=header_row + 1, values_only=True), header_row + 1):
-        # 빈 행 스킵
-        if not any(row):
-            continue
+def parse_excel_file(file_path, factory_name):
+    """Excel 파일 파싱 (read-only 스트리밍, 단일 패스)"""
+    print(f"\n📊 파싱 중: {file_path.name} (Factory {factory_name})")
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = wb.active
+        rows = sheet.iter_rows(values_only=True)
+
+        # 헤더 행 찾기 (상위 10행, 없으면 1행)
+        header_row = None
+        header_values = ()
+        first_rows = []
+        for row_idx, row in enumerate(rows, 1):
+            first_rows.append(row)
+            if is_header_candidate(row):
+                header_row, header_values = row_idx, row
+                break
+            if row_idx >= HEADER_SEARCH_ROWS:
+                break
+
+        if header_row is None:
+            header_row = 1
+            header_values = first_rows[0] if first_rows else ()
+            pending_rows = first_rows[1:]
+        else:
+            pending_rows = []
+
+        print(f"  헤더 행: {header_row}")
+        print(f"  컬럼 수: {len(header_values)}")
 
-        # Order No가 없으면 스킵
+        # 컬럼 인덱스 매핑 + 컬럼별 변환 함수
+        col_indices = build_column_index(header_values)
+        converters = compile_converters(col_indices)
         order_no_idx = col_indices.get('order_no')
-        if order_no_idx is None or not row[order_no_idx]:
-            continue
 
-        record = {
-            'factory': factory_name,
-        }
+        print(f"  매핑된 컬럼: {[json_key for json_key, _, _ in converters]}")
 
-        for json_key, col_idx in col_indices.items():
-            value = row[col_idx] if col_idx < len(row) else None
+        # 데이터 파싱
+        records = []
+        if order_no_idx is not None:
+            for source in (pending_rows, rows):
+                for row in source:
+                    # 빈 행 / Order No 없는 행 스킵
+                    if not any(row):
+                        continue
+                    if order_no_idx >= len(row) or not row[order_no_idx]:
+                        continue
 
-            # 타입별 파싱
-            if json_key in ['crd', 'sdd']:
-                record[json_key] = parse_date(value)
-            elif json_key in ['qty', 's_cut', 'pre_sew', 'sew_input', 'sew_bal', 'osc', 'ass', 'wh_in', 'wh_out', 'aql']:
-                record[json_key] = parse_number(value)
-            else:
-                record[json_key] = str(value).strip() if value else ''
+                    record = {'factory': factory_name}
+                    row_len = len(row)
+                    for json_key, col_idx, convert in converters:
+                        record[json_key] = convert(row[col_idx] if col_idx < row_len else None)
+                    records.append(record)
+    finally:
+        wb.close()
 
-        records.append(record)
+    # 날짜 컬럼: 샘플 구간 값을 추론된 컬럼 포맷으로 보정 (변환 함수는 레코드마다 한 번 호출 → 호출 순번 = 레코드 인덱스)
+    for json_key, _, convert in converters:
+        if isinstance(convert, DateColumnParser):
+            for index, value in convert.finish():
+                records[index][json_key] = value
 
     print(f"  파싱된 레코드: {len(records)}개")
-    wb.close()
-
+    for json_key, _, convert in converters:
+        if isinstance(convert, DateColumnParser):
+            print(f"  날짜 포맷 [{json_key}]: {convert.summary()}")
     return records
 
 
-def update_html_with_data(html_path, all_data):
-    """HTML 파일의 EMBEDDED_DATA 업데이트"""
-    print(f"\n📝 HTML 업데이트 중: {html_path.name}")
+def flatten_record(record, prefix=''):
+    """중첩 레코드를 '.' 경로 → 값 딕셔너리로 평탄화"""
+    flat = {}
+    for key, value in record.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict) and value:
+            flat.update(flatten_record(value, f'{path}.'))
+        else:
+            flat[path] = value
+    return flat
+
 
-    with open(html_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+def to_day_number(value):
+    """'YYYY-MM-DD' → 1970-01-01 기준 일수 (날짜가 아니면 None)"""
+    if not isinstance(value, str) or not ISO_DATE_RE.match(value):
+        return None
+    try:
+        return (date.fromisoformat(value) - DAY_EPOCH).days
+    except ValueError:
+        return None
 
-    # JSON 데이터 생성
-    json_data = json.dumps(all_data, ensure_ascii=False, indent=2)
 
-    # EMBEDDED_DATA 패턴 찾기 및 교체
-    pattern = r'(const EMBEDDED_DATA = )\[[\s\S]*?\];'
-    replacement = f'const EMBEDDED_DATA = {json_data};'
+def infer_column_kind(values):
+    """
+    컬럼 인코딩 방식 결정
+    - day: 문자열 컬럼에 ISO 날짜가 있으면 일수(int)로, 나머지 문자열은 그대로
+    - dict: 반복이 많은 문자열 컬럼은 사전 인덱스로
+    - raw: 숫자/불리언/고유값이 많은 문자열은 그대로
+    """
+    present = [v for v in values if v is not None]
+    if not present or not all(isinstance(v, str) for v in present):
+        return 'raw'
+    if any(to_day_number(v) is not None for v in present):
+        return 'day'
+    if len(set(present)) * 2 <= len(present):
+        return 'dict'
+    return 'raw'
 
-    if re.search(pattern, content):
-        new_content = re.sub(pattern, replacement, content, count=1)
-        print("  ✅ EMBEDDED_DATA 교체 완료")
-    else:
-        # 패턴이 없으면 삽입 위치 찾기
-        insert_pattern = r'(<script>[\s\S]*?// =+ Data =+)'
-        if re.search(insert_pattern, content):
-            new_content = re.sub(
-                insert_pattern,
-                f'\\1\n        {replacement}',
-                content,
-                count=1
-            )
-            print("  ✅ EMBEDDED_DATA 삽입 완료")
+
+def encode_columnar(records):
+    """
+    레코드 배열 → 사전 인코딩 컬럼 페이로드
+    {format, count, fields: [[경로, 종류, 선택여부]], dicts: {경로: [...]}, columns: {경로: [...]}}
+    선택(optional) 필드는 항상 dict 종류이며 인덱스 -1 = 키 없음
+    """
+    flat_records = [flatten_record(r) for r in records]
+
+    paths = {}
+    for flat in flat_records:
+        for path in flat:
+            paths.setdefault(path, None)
+
+    fields, dicts, columns = [], {}, {}
+    for path in paths:
+        optional = any(path not in flat for flat in flat_records)
+        values = [flat.get(path) for flat in flat_records]
+        kind = 'dict' if optional else infer_column_kind(values)
+
+        if kind == 'dict':
+            index = {}
+            column = []
+            for flat in flat_records:
+                if path not in flat:
+                    column.append(-1)
+                    continue
+                value = flat[path]
+                key = json.dumps(value)
+                if key not in index:
+                    index[key] = len(index)
+                    dicts.setdefault(path, []).append(value)
+                column.append(index[key])
+        elif kind == 'day':
+            column = []
+            for value in values:
+                day = to_day_number(value)
+                column.append(value if day is None else day)
         else:
-            print("  ❌ EMBEDDED_DATA 삽입 위치를 찾을 수 없습니다.")
-            return False
+            column = values
 
-    # 버전 업데이트
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-    version_pattern = r"(CACHE_VERSION = 'rachgia-v)[\d.]+(';)"
+        fields.append([path, kind, optional])
+        columns[path] = column
 
-    # 버전 번호 추출 및 증가
-    version_match = re.search(r"CACHE_VERSION = 'rachgia-v([\d.]+)'", content)
-    if version_match:
-        old_version = version_match.group(1)
-        parts = old_version.split('.')
-        parts[-1] = str(int(parts[-1]) + 1)
-        new_version = '.'.join(parts)
-        new_content = re.sub(version_pattern, f"\\g<1>{new_version}\\2", new_content)
-        print(f"  버전 업데이트: v{old_version} → v{new_version}")
+    return {
+        'format': COLUMNAR_FORMAT,
+        'count': len(records),
+        'fields': fields,
+        'dicts': dicts,
+        'columns': columns,
+    }
 
-    # 파일 저장
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(new_content)
 
-    print(f"  ✅ 저장 완료: {html_path}")
+def decode_columnar(payload):
+    """encode_columnar 역변환 (HTML decodeEmbeddedPayload와 동일한 규칙)"""
+    if isinstance(payload, list):
+        return payload
+
+    records = [{} for _ in range(payload['count'])]
+    for path, kind, _optional in payload['fields']:
+        *parents, last = path.split('.')
+        column = payload['columns'][path]
+        lookup = payload['dicts'].get(path, [])
+        for record, value in zip(records, column):
+            if kind == 'dict':
+                if value == -1:
+                    continue
+                value = lookup[value]
+            elif kind == 'day' and isinstance(value, int):
+                value = date.fromordinal(DAY_EPOCH.toordinal() + value).isoformat()
+            target = record
+            for key in parents:
+                target = target.setdefault(key, {})
+            target[last] = value
+    return records
+
+
+def build_payload(all_data, data_format):
+    """임베드 페이로드 생성 (columnar는 왕복 검증 실패 시 레코드 배열로 폴백)"""
+    if data_format != 'columnar':
+        return all_data
+
+    payload = encode_columnar(all_data)
+    if decode_columnar(payload) != all_data:
+        print("  ⚠️ 컬럼 인코딩 왕복 검증 실패 - 레코드 배열로 임베드")
+        return all_data
+    return payload
+
+
+def iter_json_chunks(payload):
+    """
+    compact JSON 청크 생성 (레코드 배열은 레코드별 C 인코더 사용)
+    '</' 와 '*/' 는 이스케이프하여 <script> 종료 / 마커 충돌을 방지
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def escape(text):
+        return text.replace('</', '<\\/').replace('*/', '*\\/').encode('utf-8')
+
+    if not isinstance(payload, list):
+        yield escape(encoder.encode(payload))
+        return
+
+    yield b'['
+    for idx, record in enumerate(payload):
+        yield (b',' if idx else b'') + escape(encoder.encode(record))
+    yield b']'
+
+
+def write_bytes_atomic(path, data):
+    """임시 파일에 쓴 뒤 교체"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def sri_hash(data):
+    """Subresource Integrity 값 (fetch integrity 옵션용)"""
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode('ascii')
+
+
+def precompress_file(path):
+    """
+    파일의 최대 압축 .gz / .br 사본 생성 (gzip mtime=0 고정 → 결정적 출력)
+    반환: 원본/압축본 크기와 해시 리포트 항목
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    entry = {
+        'file': path.name,
+        'size': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'integrity': sri_hash(data),
+    }
+
+    variants = {'gz': lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = lambda: brotli.compress(data, quality=11)
+
+    for suffix, compress in variants.items():
+        target = path.with_name(f'{path.name}.{suffix}')
+        compressed = compress()
+        write_bytes_atomic(target, compressed)
+        entry[suffix] = {
+            'size': len(compressed),
+            'sha256': hashlib.sha256(compressed).hexdigest(),
+        }
+    return entry
+
+
+def precompress_outputs(paths, report_path=PRECOMPRESS_REPORT):
+    """HTML/샤드 사전 압축 + 크기 리포트 출력 및 저장"""
+    print("\n🗜️ 사전 압축 중...")
+    if brotli is None:
+        print("  ⚠️ brotli 모듈 없음 - .gz만 생성 (pip install brotli)")
+
+    entries = [precompress_file(path) for path in paths]
+
+    total = {'size': 0, 'gz': 0, 'br': 0}
+    for entry in entries:
+        total['size'] += entry['size']
+        line = f"  {entry['file']}: {entry['size'] / 1024:.1f} KB"
+        for suffix in ('gz', 'br'):
+            if suffix in entry:
+                total[suffix] += entry[suffix]['size']
+                ratio = entry[suffix]['size'] / entry['size'] * 100 if entry['size'] else 0
+                line += f" → .{suffix} {entry[suffix]['size'] / 1024:.1f} KB ({ratio:.0f}%)"
+        print(line)
+
+    summary = f"  합계: {total['size'] / 1024:.1f} KB → .gz {total['gz'] / 1024:.1f} KB"
+    if brotli is not None:
+        summary += f" / .br {total['br'] / 1024:.1f} KB"
+    print(summary)
+
+    report = {'total': total, 'files': entries}
+    write_bytes_atomic(Path(report_path), json.dumps(report, ensure_ascii=False, indent=2).encode('utf-8'))
+    print(f"  ✅ 리포트 저장: {report_path}")
+    return report
+
+
+def write_shards(all_data, shard_dir, data_format='columnar'):
+    """
+    공장 × sddYearMonth 단위 샤드 파일과 manifest.json 생성
+    - 샤드 파일명에 내용 해시 포함 → 변경 없는 샤드는 배포 간 브라우저 캐시 유지
+    - manifest: 샤드별 이름/공장/월/행 수/크기/해시 (대시보드가 필터에 필요한 샤드만 fetch)
+    - manifest에 없는 이전 샤드 파일은 삭제
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    print(f"\n🧱 샤드 생성 중: {shard_dir}")
+
+    groups = {}
+    for record in all_data:
+        key = (record.get('factory') or 'unknown', record.get('sddYearMonth') or '')
+        groups.setdefault(key, []).append(record)
+
+    shards = []
+    for (factory, year_month), records in sorted(groups.items()):
+        payload = build_payload(records, data_format)
+        body = b''.join(iter_json_chunks(payload))
+        digest = hashlib.sha256(body).hexdigest()
+        name = f"{SHARD_PREFIX}{factory}-{year_month or 'none'}.{digest[:12]}.json"
+
+        path = shard_dir / name
+        if not path.exists():
+            write_bytes_atomic(path, body)
+
+        shards.append({
+            'name': name,
+            'factory': factory,
+            'sddYearMonth': year_month,
+            'format': COLUMNAR_FORMAT if isinstance(payload, dict) else 'records',
+            'rows': len(records),
+            'size': len(body),
+            'sha256': digest,
+            'integrity': sri_hash(body),
+        })
+
+    manifest = {
+        'rows': len(all_data),
+        'size': sum(shard['size'] for shard in shards),
+        'shards': shards,
+    }
+    write_bytes_atomic(
+        shard_dir / SHARD_MANIFEST,
+        json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'),
+    )
+
+    names = {shard['name'] for shard in shards}
+    removed = 0
+    for path in shard_dir.glob(f'{SHARD_PREFIX}*'):
+        base_name = path.name
+        if base_name.endswith(COMPRESSED_SUFFIXES):
+            base_name = base_name[:-3]
+        if base_name not in names:
+            path.unlink()
+            removed += 1
+
+    print(f"  ✅ 샤드 {len(shards)}개 ({manifest['size'] / 1024:.1f} KB), 이전 샤드 {removed}개 삭제")
+    return manifest
+
+
+def is_completed_order(record):
+    """BAL 단계 8개가 모두 완료 (날짜/INHOUSE/잔량 0) → 더 바뀌지 않는 cold 계층 대상"""
+    production = record.get('production') or {}
+    return bool(production) and all(stage.get('status') == 'completed' for stage in production.values())
+
+
+def record_key(record):
+    """레코드 내용 해시 (키 순서 무관) - 값이 하나라도 바뀌면 다른 키"""
+    body = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:RECORD_KEY_LENGTH]
+
+
+def load_cold_index(tier_dir, data_format):
+    """cold 세그먼트 목록 (포맷이 다르거나 세그먼트 파일이 없으면 빈 목록 → 전체 재구성)"""
+    try:
+        with open(Path(tier_dir) / COLD_INDEX, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if index.get('version') != COLD_INDEX_VERSION or index.get('format') != data_format:
+        return []
+    segments = index.get('segments', [])
+    if not all((Path(tier_dir) / segment['name']).exists() for segment in segments):
+        return []
+    return segments
+
+
+def live_cold_keys(segments):
+    """삭제 표시되지 않은 cold 행의 키 개수"""
+    live = Counter()
+    for segment in segments:
+        deleted = set(segment['deleted'])
+        live.update(key for row, key in enumerate(segment['keys']) if row not in deleted)
+    return live
+
+
+def write_tier_file(tier_dir, prefix, records, data_format):
+    """계층 파일 하나 기록 (파일명에 내용 해시, 같은 파일이 있으면 쓰지 않음) → 매니페스트 항목"""
+    payload = build_payload(records, data_format)
+    body = b''.join(iter_json_chunks(payload))
+    digest = hashlib.sha256(body).hexdigest()
+    name = f"{prefix}{digest[:12]}.json"
+    path = Path(tier_dir) / name
+    if not path.exists():
+        write_bytes_atomic(path, body)
+    return {
+        'name': name,
+        'format': COLUMNAR_FORMAT if isinstance(payload, dict) else 'records',
+        'rows': len(records),
+        'size': len(body),
+        'sha256': digest,
+        'integrity': sri_hash(body),
+    }
+
+
+def tombstone_cold(segments, excess):
+    """excess(키 → 개수)만큼 세그먼트 행에 삭제 표시 (세그먼트 파일은 그대로)"""
+    excess = Counter(excess)
+    for segment in segments:
+        deleted = set(segment['deleted'])
+        for row, key in enumerate(segment['keys']):
+            if excess[key] > 0 and row not in deleted:
+                excess[key] -= 1
+                deleted.add(row)
+        segment['deleted'] = sorted(deleted)
+
+
+def write_tiers(all_data, tier_dir, data_format='columnar'):
+    """
+    완료 / 미완료 오더를 cold / hot 계층으로 나눠 출력
+    - hot: 미완료·부분 완료 오더 전체, 매 실행 재생성 (hot.<해시>.json 하나)
+    - cold: 완료 오더, 지난 실행 이후 새로 완료된 레코드만 새 세그먼트로 추가
+            (cold-<순번>.<해시>.json, 기존 세그먼트는 다시 인코딩/기록/압축하지 않음)
+    - 이미 cold에 들어간 레코드가 바뀌거나 사라지면 해당 행만 삭제 표시 (segments[].deleted 행 번호)
+      → 바뀐 내용은 새 세그먼트로 추가, 삭제 표시가 COLD_COMPACT_RATIO를 넘을 때만 재구성
+    - tiers.json: 계층별 파일 목록 (hot + cold 세그먼트에서 deleted 행을 빼면 전체 데이터)
+    반환: (매니페스트, 이번 실행에서 새로 만든 파일 경로 목록)
+    """
+    tier_dir = Path(tier_dir)
+    tier_dir.mkdir(parents=True, exist_ok=True)
+    print(f"\n🧊 핫/콜드 계층 생성 중: {tier_dir}")
+
+    hot_records, cold_records = [], []
+    for record in all_data:
+        (cold_records if is_completed_order(record) else hot_records).append(record)
+    cold_keys = [record_key(record) for record in cold_records]
+
+    segments = load_cold_index(tier_dir, data_format)
+    current = Counter(cold_keys)
+    stored = live_cold_keys(segments)
+    excess = stored - current
+    if excess:
+        tombstone_cold(segments, excess)
+        stored -= excess
+        deleted = sum(len(segment['deleted']) for segment in segments)
+        total = sum(segment['rows'] for segment in segments)
+        print(f"  🪦 cold 레코드 {sum(excess.values())}개 변경/삭제 - 삭제 표시 (누적 {deleted}/{total})")
+        if deleted > total * COLD_COMPACT_RATIO:
+            print(f"  ♻️ 삭제 표시 비율 {deleted / total:.0%} > {COLD_COMPACT_RATIO:.0%} - cold 계층 재구성")
+            segments, stored = [], Counter()
+
+    # 새로 완료된 레코드 (같은 내용의 행이 여러 개면 개수 차이만큼)
+    missing = current - stored
+    appended = []
+    for record, key in zip(cold_records, cold_keys):
+        if missing[key] > 0:
+            missing[key] -= 1
+            appended.append((record, key))
+
+    created = []
+    if appended:
+        entry = write_tier_file(tier_dir, f"{COLD_PREFIX}{len(segments) + 1:04d}.",
+                                [record for record, _ in appended], data_format)
+        entry['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        entry['keys'] = [key for _, key in appended]
+        entry['deleted'] = []
+        segments.append(entry)
+        created.append(tier_dir / entry['name'])
+
+    hot = write_tier_file(tier_dir, HOT_PREFIX, hot_records, data_format)
+    created.append(tier_dir / hot['name'])
+
+    index = {'version': COLD_INDEX_VERSION, 'format': data_format, 'segments': segments}
+    write_bytes_atomic(tier_dir / COLD_INDEX, json.dumps(index, ensure_ascii=False).encode('utf-8'))
+
+    cold_segments = [{k: v for k, v in segment.items() if k != 'keys'} for segment in segments]
+    manifest = {
+        'rows': len(all_data),
+        'hot': hot,
+        'cold': {
+            'rows': sum(segment['rows'] - len(segment['deleted']) for segment in cold_segments),
+            'size': sum(segment['size'] for segment in cold_segments),
+            'segments': cold_segments,
+        },
+    }
+    write_bytes_atomic(tier_dir / TIER_MANIFEST,
+                       json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+    created.append(tier_dir / TIER_MANIFEST)
+
+    # 매니페스트에 없는 이전 hot / 재구성 전 cold 파일 정리
+    names = {hot['name']} | {segment['name'] for segment in cold_segments}
+    removed = 0
+    for path in list(tier_dir.glob(f'{HOT_PREFIX}*')) + list(tier_dir.glob(f'{COLD_PREFIX}*')):
+        base_name = path.name
+        if base_name.endswith(COMPRESSED_SUFFIXES):
+            base_name = base_name[:-3]
+        if base_name not in names:
+            path.unlink()
+            removed += 1
+
+    print(f"  🔥 hot: {hot['rows']}개 레코드 ({hot['size'] / 1024:.1f} KB, 매 실행 재생성)")
+    print(f"  🧊 cold: {manifest['cold']['rows']}개 레코드, 세그먼트 {len(cold_segments)}개"
+          f" (이번 실행 추가 {len(appended)}개), 이전 파일 {removed}개 삭제")
+    return manifest, created
+
+
+def find_data_span(mm):
+    """BEGIN/END 마커 사이 데이터 구간의 바이트 오프셋 (없으면 None)"""
+    begin = mm.find(DATA_BEGIN_MARKER)
+    if begin < 0:
+        return None
+    start = begin + len(DATA_BEGIN_MARKER)
+    end = mm.find(DATA_END_MARKER, start)
+    if end < 0:
+        return None
+    return start, end
+
+
+def find_cache_version(mm):
+    """CACHE_VERSION 버전 문자열의 (시작, 끝, 값) - 없으면 None (mmap/bytes 모두 가능)"""
+    pos = mm.find(CACHE_VERSION_PREFIX)
+    if pos < 0:
+        return None
+    start = pos + len(CACHE_VERSION_PREFIX)
+    end = mm.find(b"'", start)
+    if end < 0:
+        return None
+    return start, end, mm[start:end].decode('ascii')
+
+
+def write_spliced(html_path, mm, patches):
+    """
+    원본(mmap)의 변경 없는 구간은 그대로 복사하고 patches 구간만 교체하여
+    임시 파일에 스트리밍 기록 (patches: 오프셋 순 (start, end, 바이트 청크 iterable))
+    """
+    tmp_path = html_path.with_name(html_path.name + '.tmp')
+    view = memoryview(mm)
+    written = 0
+    try:
+        with open(tmp_path, 'wb') as out:
+            pos = 0
+            for start, end, chunks in patches:
+                written += out.write(view[pos:start])
+                for chunk in chunks:
+                    written += out.write(chunk)
+                pos = end
+            written += out.write(view[pos:])
+    finally:
+        view.release()
+    return tmp_path, written
+
+
+def hash_excluding(digest, buf, ranges):
+    """buf에서 ranges (start, end) 구간을 제외한 나머지를 digest에 추가"""
+    view = memoryview(buf)
+    try:
+        pos = 0
+        for start, end in sorted(ranges):
+            digest.update(view[pos:start])
+            pos = end
+        digest.update(view[pos:])
+    finally:
+        view.release()
+
+
+def content_version(base_version, payload_chunks, code_segments):
+    """
+    데이터 + 앱 코드 해시 기반 CACHE_VERSION (예: 19.13.0-1a2b3c4d5e)
+    payload_chunks: 페이로드 바이트 청크 iterable (한 번 순회하며 해시에 바로 추가, 합치지 않음)
+    code_segments: (버퍼, 제외 구간 목록) - 데이터 구간과 버전 문자열 자체는 제외
+    반환: (버전, 페이로드 (SHA-256, 바이트 수)) - 기존 데이터 구간과 비교용
+    """
+    digest = hashlib.sha256()
+    for buf, excluded in code_segments:
+        hash_excluding(digest, buf, excluded)
+    payload_digest = hashlib.sha256()
+    payload_size = 0
+    for chunk in payload_chunks:
+        digest.update(chunk)
+        payload_digest.update(chunk)
+        payload_size += len(chunk)
+    version = f"{base_version.split('-')[0]}-{digest.hexdigest()[:CONTENT_HASH_LENGTH]}"
+    return version, (payload_digest.digest(), payload_size)
+
+
+def span_fingerprint(mm, span):
+    """기존 데이터 구간의 (SHA-256, 바이트 수) - 복사 없이 mmap에서 해시"""
+    digest = hashlib.sha256()
+    with memoryview(mm) as view, view[span[0]:span[1]] as data:
+        digest.update(data)
+    return digest.digest(), span[1] - span[0]
+
+
+def update_service_worker_version(sw_path, sw_bytes, version_loc, new_version):
+    """sw.js CACHE_VERSION 교체 (값이 같으면 쓰지 않음)"""
+    v_start, v_end, old_version = version_loc
+    if old_version == new_version:
+        return False
+    write_bytes_atomic(sw_path, sw_bytes[:v_start] + new_version.encode('ascii') + sw_bytes[v_end:])
+    print(f"  {sw_path.name} 버전: v{old_version} → v{new_version}")
     return True
 
 
-def main():
-    """메인 실행 함수"""
-    print("=" * 60)
-    print("🚀 Excel → HTML 임베드 시작")
-    print(f"   시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 60)
+def update_html_with_data(html_path, all_data, data_format='columnar', sw_path=SW_FILE):
+    """
+    HTML 파일의 EMBEDDED_DATA 업데이트 (마커 기반 스플라이스 + 원자적 교체)
+    CACHE_VERSION은 데이터 + 앱 코드(HTML, sw.js) 해시로 결정하며,
+    데이터와 버전이 모두 그대로면 HTML을 다시 쓰지 않는다.
+    """
+    print(f"\n📝 HTML 업데이트 중: {html_path.name}")
 
-    # 데이터 디렉토리 확인
-    if not DATA_DIR.exists():
-        print(f"❌ 데이터 디렉토리가 없습니다: {DATA_DIR}")
-        print("   먼저 download_from_drive.py를 실행하세요.")
-        sys.exit(1)
+    payload = build_payload(all_data, data_format)
+    print(f"  페이로드 포맷: {COLUMNAR_FORMAT if isinstance(payload, dict) else 'records'}")
+
+    sw_path = Path(sw_path)
+    sw_bytes = sw_path.read_bytes() if sw_path.exists() else b''
+    sw_version = find_cache_version(sw_bytes)
+
+    with open(html_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        span = find_data_span(mm)
+        if span is None:
+            print("  ❌ EMBEDDED_DATA 마커를 찾을 수 없습니다.")
+            print(f"     {DATA_BEGIN_MARKER.decode()} ... {DATA_END_MARKER.decode()}")
+            return False
+
+        html_version = find_cache_version(mm)
+        html_excluded = [span] + ([html_version[:2]] if html_version else [])
+        sw_excluded = [sw_version[:2]] if sw_version else []
+        base_version = (sw_version or html_version or (0, 0, DEFAULT_BASE_VERSION))[2]
+        # 페이로드는 합치지 않고 청크 단위로 해시 → 기존 구간 해시와 같으면 스플라이스 생략
+        new_version, payload_fingerprint = content_version(
+            base_version, iter_json_chunks(payload),
+            [(mm, html_excluded), (sw_bytes, sw_excluded)],
+        )
+        print(f"  콘텐츠 버전: v{new_version}")
+
+        data_changed = span_fingerprint(mm, span) != payload_fingerprint
+        html_version_changed = html_version is not None and html_version[2] != new_version
+
+        if data_changed or html_version_changed:
+            # 데이터가 바뀐 경우에만 청크를 다시 생성해 스트리밍 기록 (그대로면 기존 구간 복사)
+            patches = [(span[0], span[1], iter_json_chunks(payload))] if data_changed else []
+            if html_version_changed:
+                patches.append((html_version[0], html_version[1], [new_version.encode('ascii')]))
+                patches.sort(key=lambda p: p[0])
+                print(f"  버전 업데이트: v{html_version[2]} → v{new_version}")
+
+            old_size = len(mm)
+            tmp_path, new_size = write_spliced(html_path, mm, patches)
+
+    if sw_version:
+        update_service_worker_version(sw_path, sw_bytes, sw_version, new_version)
+
+    if not (data_changed or html_version_changed):
+        print("  ⏭️ 데이터/코드 변경 없음 - HTML 유지")
+        return True
+
+    # 파일 교체 (원자적)
+    os.replace(tmp_path, html_path)
+
+    print("  ✅ EMBEDDED_DATA 교체 완료")
+    print(f"  HTML 크기: {old_size / 1024:.1f} KB → {new_size / 1024:.1f} KB")
+    print(f"  ✅ 저장 완료: {html_path}")
+    return True
 
-    # Excel 파일 파싱
+
+def parse_legacy(data_dir):
+    """헤더 기반 openpyxl 파서로 공장 파일 파싱 (레거시 경로)"""
     all_data = []
     parsed_factories = []
 
     for factory_name, file_name in FACTORY_FILES.items():
-        file_path = DATA_DIR / file_name
+        file_path = data_dir / file_name
 
         if not file_path.exists():
             print(f"\n⚠️ 파일 없음: {file_name}")
@@ -253,6 +987,83 @@ def main():
         except Exception as e:
             print(f"  ❌ 파싱 오류: {e}")
 
+    return all_data, parsed_factories
+
+
+def embed_outputs(all_data, data_format='columnar', shard_dir=None, precompress=False, tier_dir=None):
+    """
+    HTML 임베드 + (선택) 샤드 / 핫·콜드 계층 / 사전 압축 출력
+    반환: (성공 여부, 생성/갱신된 파일 경로 목록)
+    """
+    with profile_stage('html_embed'):
+        success = update_html_with_data(HTML_FILE, all_data, data_format)
+        outputs = [HTML_FILE, SW_FILE]
+
+        manifest = None
+        if shard_dir:
+            shard_dir = Path(shard_dir)
+            manifest = write_shards(all_data, shard_dir, data_format)
+            outputs.append(shard_dir / SHARD_MANIFEST)
+
+        tier_files = []
+        if tier_dir:
+            tier_manifest, tier_files = write_tiers(all_data, tier_dir, data_format)
+            outputs.append(Path(tier_dir) / TIER_MANIFEST)
+            # 압축본이 이미 있는 cold 세그먼트는 다시 압축하지 않음 (내용 해시 파일명 → 내용 불변)
+            tier_files += [
+                Path(tier_dir) / segment['name'] for segment in tier_manifest['cold']['segments']
+                if not (Path(tier_dir) / (segment['name'] + '.gz')).exists()
+                and Path(tier_dir) / segment['name'] not in tier_files
+            ]
+
+        if precompress and success:
+            targets = [HTML_FILE]
+            if manifest:
+                targets += [shard_dir / shard['name'] for shard in manifest['shards']]
+                targets.append(shard_dir / SHARD_MANIFEST)
+            targets += tier_files
+            precompress_outputs(targets)
+            outputs += [HTML_FILE.with_name(HTML_FILE.name + suffix) for suffix in COMPRESSED_SUFFIXES]
+
+    return success, [path for path in outputs if path.exists()]
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='Excel → HTML 임베드')
+    parser.add_argument('--legacy-parser', action='store_true',
+                        help='공유 아티팩트 대신 헤더 기반 openpyxl 파서 사용')
+    parser.add_argument('--format', choices=['columnar', 'json'], default='columnar',
+                        help='임베드 포맷 (columnar: 사전 인코딩 컬럼, json: 레코드 배열)')
+    parser.add_argument('--shards', type=Path, metavar='DIR',
+                        help='공장 × SDD 월 단위 샤드와 manifest.json을 DIR에 추가 출력')
+    parser.add_argument('--precompress', action='store_true',
+                        help='HTML과 샤드의 .gz/.br 사전 압축본 및 크기 리포트 생성 (Apache .htaccess 전용, Firebase는 자체 압축)')
+    parser.add_argument('--tiers', type=Path, metavar='DIR',
+                        help='미완료(hot) / 완료(cold, 추가 전용) 계층 파일과 tiers.json을 DIR에 추가 출력')
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    start_profiling(args.profile_memory)
+
+    print("=" * 60)
+    print("🚀 Excel → HTML 임베드 시작")
+    print(f"   시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    # 데이터 디렉토리 확인
+    if not DATA_DIR.exists():
+        print(f"❌ 데이터 디렉토리가 없습니다: {DATA_DIR}")
+        print("   먼저 download_from_drive.py를 실행하세요.")
+        sys.exit(1)
+
+    if args.legacy_parser:
+        all_data, parsed_factories = parse_legacy(DATA_DIR)
+    else:
+        # 공유 파싱 아티팩트 (Excel 디코딩은 파이프라인당 1회)
+        artifact = load_artifact(DATA_DIR)
+        all_data = artifact['records'] if artifact else []
+        parsed_factories = list(artifact['sources']) if artifact else []
+
     if not all_data:
         print("\n❌ 파싱된 데이터가 없습니다.")
         sys.exit(1)
@@ -262,7 +1073,7 @@ def main():
         print(f"\n❌ HTML 파일이 없습니다: {HTML_FILE}")
         sys.exit(1)
 
-    success = update_html_with_data(HTML_FILE, all_data)
+    success, _ = embed_outputs(all_data, args.format, args.shards, args.precompress, args.tiers)
 
     # 결과 요약
     print("\n" + "=" * 60)
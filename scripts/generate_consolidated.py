@@ -5,19 +5,24 @@ Rachgia Dashboard v19 - 자동화 빌드 시스템
 
 사용법:
     python scripts/generate_consolidated.py
+    python scripts/generate_consolidated.py --profile-memory   # 구간별 메모리 리포트 (memory_profile.py)
 
-입력: data/*.xlsx (4개 공장 파일)
+입력: data/parsed_orders.json (parsed_artifact.py 공유 아티팩트, 없으면 data/*.xlsx 파싱)
 출력: data/종합_오더현황_YYYY-MM-DD.xlsx → Google Drive 업로드
 
 환경 변수 (업로드용, 없으면 로컬 생성만):
     GOOGLE_SERVICE_ACCOUNT_KEY: 서비스 계정 JSON 키
     GOOGLE_DRIVE_FOLDER_ID: Google Drive 폴더 ID
+    PIPELINE_STORAGE: 저장소 백엔드 (drive 또는 local:<디렉토리>, storage.py 참고)
 """
 
 import os
 import sys
 import json
 import io
+import re
+import zipfile
+import argparse
 from pathlib import Path
 from datetime import datetime
 
@@ -34,19 +39,24 @@ except ImportError:
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
     from openpyxl.utils import get_column_letter
 
-# 프로젝트 루트를 sys.path에 추가 (parse_loadplan.py import용)
-PROJECT_DIR = Path(__file__).parent.parent
-sys.path.insert(0, str(PROJECT_DIR))
-from parse_loadplan import parse_factory_file
+# 공유 파싱 아티팩트 (parse_loadplan.parse_factory_file 결과)
+from parsed_artifact import load_artifact
+from parse_loadplan import profile_stage
+from memory_profile import add_profile_argument, start_profiling
+
+# 저장소 백엔드 (Google Drive / 로컬 디렉토리)
+from storage import XLSX_MIMETYPE, file_md5, open_storage
 
 # 설정
+PROJECT_DIR = Path(__file__).parent.parent
 DATA_DIR = PROJECT_DIR / 'data'
-FACTORY_FILES = {
-    'A': 'Factory_A.xlsx',
-    'B': 'Factory_B.xlsx',
-    'C': 'Factory_C.xlsx',
-    'D': 'Factory_D.xlsx',
-}
+CACHE_DIR = PROJECT_DIR / '.pipeline_cache'
+DRIVE_FILE_CACHE = CACHE_DIR / 'drive_files.json'
+
+# Resumable 업로드 청크 크기 (256KB 배수여야 함)
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+# 결정적 출력을 위한 zip 엔트리 타임스탬프 (zip 포맷 최소값)
+ZIP_FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
 
 # Excel 컬럼 정의 (31개)
 EXCEL_COLUMNS = [
@@ -120,9 +130,20 @@ def flatten_record(record):
     ]
 
 
-def create_excel(all_records, output_path):
-    """종합 오더현황 Excel 파일 생성"""
+def create_excel(all_records, output_path, report_date=None):
+    """
+    종합 오더현황 Excel 파일 생성
+    같은 데이터 + 같은 기준 일자면 바이트 단위로 동일한 파일을 생성한다.
+    """
+    if report_date is None:
+        report_date = datetime.now().strftime('%Y-%m-%d')
+    timestamp = datetime.strptime(report_date, '%Y-%m-%d')
+
+    # 공장 기준 안정 정렬 (공장 내 순서는 원본 행 순서 유지)
+    all_records = sorted(all_records, key=lambda r: r.get('factory', ''))
+
     wb = Workbook()
+    wb.properties.created = timestamp
 
     # --- 종합 오더현황 시트 ---
     ws = wb.active
@@ -222,7 +243,7 @@ def create_excel(all_records, output_path):
     info_font = Font(name='맑은 고딕', size=10)
 
     info_data = [
-        ('생성 일시', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+        ('기준 일자', report_date),
         ('총 오더 수', len(all_records)),
         ('', ''),
         ('공장별 오더 수', ''),
@@ -268,12 +289,37 @@ def create_excel(all_records, output_path):
     ws_info.column_dimensions['A'].width = 20
     ws_info.column_dimensions['B'].width = 25
 
-    # 저장
-    wb.save(output_path)
+    # 저장 (타임스탬프 고정)
+    save_workbook_deterministic(wb, output_path, timestamp)
     print(f"  ✅ Excel 파일 저장: {output_path}")
     print(f"     총 {len(all_records)}개 오더, {len(factory_counts)}개 공장")
 
 
+def save_workbook_deterministic(wb, output_path, timestamp):
+    """
+    워크북 저장 - openpyxl이 기록하는 수정 시각과 zip 엔트리 시각을 고정값으로 교체
+    (동일 데이터 → 동일 바이트 → 동일 md5, 업로드 스킵 판정에 사용)
+    """
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+
+    fixed = timestamp.strftime('%Y-%m-%dT%H:%M:%SZ')
+    with zipfile.ZipFile(buffer) as src, zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = src.read(info.filename)
+            if info.filename == 'docProps/core.xml':
+                data = re.sub(
+                    rb'(<dcterms:(?:created|modified)[^>]*>)[^<]*(</dcterms:)',
+                    rb'\g<1>' + fixed.encode() + rb'\g<2>',
+                    data,
+                )
+            entry = zipfile.ZipInfo(info.filename, date_time=ZIP_FIXED_DATE_TIME)
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            entry.external_attr = 0o644 << 16
+            dst.writestr(entry, data)
+
+
 def is_delayed_record(record):
     """지연 오더 여부 판정"""
     crd = record.get('crd', '')
@@ -287,82 +333,81 @@ def is_delayed_record(record):
     return False
 
 
-def get_drive_service():
-    """Google Drive API 서비스 생성"""
+def get_storage(spec=None):
+    """업로드용 저장소 백엔드 (라이브러리/인증 정보 없으면 None)"""
     try:
-        from google.oauth2 import service_account
-        from googleapiclient.discovery import build
+        return open_storage(spec)
     except ImportError:
         print("  ⚠️ Google API 라이브러리 없음 - 업로드 스킵")
-        return None
-
-    service_account_key = os.environ.get('GOOGLE_SERVICE_ACCOUNT_KEY')
-    if not service_account_key:
-        # 로컬 개발용
-        key_file = PROJECT_DIR / 'credentials' / 'service-account.json'
-        if key_file.exists():
-            SCOPES = ['https://www.googleapis.com/auth/drive']
-            creds = service_account.Credentials.from_service_account_file(
-                str(key_file), scopes=SCOPES
-            )
-            return build('drive', 'v3', credentials=creds)
-        print("  ⚠️ 서비스 계정 키 없음 - 업로드 스킵")
-        return None
-
-    SCOPES = ['https://www.googleapis.com/auth/drive']
-    key_dict = json.loads(service_account_key)
-    creds = service_account.Credentials.from_service_account_info(key_dict, scopes=SCOPES)
-    return build('drive', 'v3', credentials=creds)
-
-
-def find_existing_file(service, folder_id, filename):
-    """Drive 폴더에서 동일 파일명 검색"""
-    query = (
-        f"'{folder_id}' in parents and name='{filename}' and trashed=false"
-    )
-    results = service.files().list(
-        q=query, pageSize=1, fields="files(id, name)"
-    ).execute()
-    files = results.get('files', [])
-    return files[0]['id'] if files else None
+    except ValueError as e:
+        print(f"  ⚠️ {e} - 업로드 스킵")
+    return None
 
 
-def upload_to_drive(service, folder_id, local_path, filename):
-    """Google Drive에 파일 업로드 (기존 파일 있으면 덮어쓰기)"""
-    from googleapiclient.http import MediaFileUpload
-
-    media = MediaFileUpload(
-        str(local_path),
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-
-    existing_id = find_existing_file(service, folder_id, filename)
-
-    if existing_id:
-        # 기존 파일 업데이트 (파일 ID, 공유 설정 유지)
-        file = service.files().update(
-            fileId=existing_id,
-            media_body=media,
-        ).execute()
-        print(f"  ✅ Drive 파일 업데이트: {filename} (ID: {existing_id})")
+def load_file_id_cache(cache_path=DRIVE_FILE_CACHE):
+    """파일명 → Drive 파일 ID 캐시 로드"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_file_id_cache(cache, cache_path=DRIVE_FILE_CACHE):
+    """파일명 → Drive 파일 ID 캐시 저장"""
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+
+def upload_to_drive(storage, folder_id, local_path, filename,
+                    cache_path=DRIVE_FILE_CACHE, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    저장소에 파일 업로드 (기존 파일 있으면 덮어쓰기)
+    - 파일 ID는 캐시에서 먼저 찾고, 없을 때만 폴더 검색
+    - 원격 md5Checksum이 로컬과 같으면 업로드 스킵
+    - 업로드는 resumable 청크 방식 (Drive)
+    """
+    local_md5 = file_md5(local_path)
+    cache = load_file_id_cache(cache_path)
+
+    existing = None
+    if filename in cache:
+        existing = storage.metadata(cache[filename])
+    if existing is None:
+        existing = storage.find(folder_id, filename)
+
+    if existing and existing.get('md5Checksum') == local_md5:
+        print(f"  ⏭️ 변경 없음 - 업로드 스킵: {filename} (md5: {local_md5})")
+        cache[filename] = existing['id']
+        save_file_id_cache(cache, cache_path)
+        return existing
+
+    # 기존 파일이 있으면 업데이트 (파일 ID, 공유 설정 유지), 없으면 새로 생성
+    file = storage.put(folder_id, local_path, filename, existing=existing,
+                       mime_type=XLSX_MIMETYPE, chunk_size=chunk_size)
+    if existing:
+        print(f"  ✅ 파일 업데이트: {filename} (ID: {existing['id']})")
     else:
-        # 새 파일 생성
-        file_metadata = {
-            'name': filename,
-            'parents': [folder_id],
-        }
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id',
-        ).execute()
-        print(f"  ✅ Drive 파일 생성: {filename} (ID: {file.get('id')})")
+        print(f"  ✅ 파일 생성: {filename} (ID: {file.get('id')})")
+
+    remote_md5 = file.get('md5Checksum')
+    if remote_md5 and remote_md5 != local_md5:
+        print(f"  ⚠️ 업로드 체크섬 불일치: local={local_md5} remote={remote_md5}")
 
+    cache[filename] = file['id']
+    save_file_id_cache(cache, cache_path)
     return file
 
 
-def main():
+def main(argv=None):
     """메인 실행"""
+    parser = argparse.ArgumentParser(description='종합 오더현황 Excel 생성 및 업로드')
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    start_profiling(args.profile_memory)
+
     print("=" * 60)
     print("📊 종합 오더현황 Excel 생성 시작")
     print(f"   시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -373,20 +418,14 @@ def main():
         print(f"❌ 데이터 디렉토리가 없습니다: {DATA_DIR}")
         sys.exit(1)
 
-    # 공장별 파일 파싱
-    all_records = []
-    parsed_factories = []
-
-    for factory, filename in FACTORY_FILES.items():
-        filepath = DATA_DIR / filename
-        if not filepath.exists():
-            print(f"  ⚠️ 파일 없음: {filename}")
-            continue
+    # 공유 파싱 아티팩트 로드 (없거나 오래되면 여기서 파싱)
+    artifact = load_artifact(DATA_DIR)
+    all_records = artifact['records'] if artifact else []
+    parsed_factories = list(artifact['sources']) if artifact else []
 
-        records = parse_factory_file(factory, str(filepath))
-        all_records.extend(records)
-        parsed_factories.append(factory)
-        print(f"  Factory {factory}: {len(records)}개 레코드")
+    if artifact:
+        for factory, source in artifact['sources'].items():
+            print(f"  Factory {factory}: {source.get('records', 0)}개 레코드")
 
     if not all_records:
         print("\n❌ 파싱된 데이터가 없습니다.")
@@ -400,23 +439,25 @@ def main():
     output_path = DATA_DIR / filename
 
     print(f"\n📄 Excel 파일 생성 중...")
-    create_excel(all_records, output_path)
+    with profile_stage('workbook_build'):
+        create_excel(all_records, output_path, report_date=today)
 
-    # Google Drive 업로드
+    # Google Drive (또는 로컬 저장소) 업로드
+    storage_spec = os.environ.get('PIPELINE_STORAGE') or 'drive'
     folder_id = os.environ.get('GOOGLE_DRIVE_FOLDER_ID')
-    if not folder_id:
+    if not folder_id and storage_spec == 'drive':
         print(f"\n⚠️ GOOGLE_DRIVE_FOLDER_ID 미설정 - 업로드 스킵")
         print(f"   로컬 파일: {output_path}")
         return 0
 
-    print(f"\n☁️ Google Drive 업로드 중...")
-    service = get_drive_service()
-    if not service:
+    print(f"\n☁️ 업로드 중 ({storage_spec})...")
+    storage = get_storage()
+    if not storage:
         print(f"   로컬 파일만 생성됨: {output_path}")
         return 0
 
     try:
-        upload_to_drive(service, folder_id, output_path, filename)
+        upload_to_drive(storage, folder_id or storage.default_folder, output_path, filename)
     except Exception as e:
         print(f"  ❌ 업로드 실패: {e}")
         print(f"   로컬 파일: {output_path}")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+파이프라인 메모리 프로파일러 (--profile-memory)
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+run_pipeline.py / parsed_artifact.py / embed_data.py / generate_consolidated.py 에
+--profile-memory [REPORT] 를 주면 아래 구간마다 피크 RSS와 할당 위치 상위 N개를 기록한다.
+
+    excel_read      pd.read_excel (parse_factory_file)
+    record_build    행 → 레코드 변환 (parse_factory_file)
+    json_dump       파싱 아티팩트 저장 (write_artifact)
+    workbook_build  종합 오더현황 Excel 생성 (create_excel)
+    html_embed      HTML 임베드 / 샤드 / 사전 압축 (embed_outputs)
+
+- 피크 RSS: Linux는 구간 시작 시 /proc/self/clear_refs로 VmHWM을 초기화해서 구간별 피크를 잰다.
+  그 외 플랫폼은 ru_maxrss (프로세스 시작 이후 피크)라서 구간별로 줄어들지 않는다.
+- 할당 위치: tracemalloc 스냅샷을 구간 전후로 비교해서 늘어난 크기 순 (파일:줄).
+  tracemalloc 추적과 스냅샷 비교 때문에 프로파일 모드는 평소보다 몇 배 느리다.
+- 같은 구간이 여러 번 실행되면 (공장 4개) 횟수/시간은 합계, 피크는 최댓값, 할당 위치는 합산.
+
+리포트 (기본 .pipeline_cache/memory_profile.json) 는 실행 종료 시 (sys.exit 포함) 기록된다.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import platform
+import threading
+import contextlib
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+
+# 프로젝트 루트를 sys.path에 추가 (parse_loadplan.py import용)
+PROJECT_DIR = Path(__file__).parent.parent
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+import parse_loadplan
+
+# 설정
+DEFAULT_REPORT_FILE = PROJECT_DIR / '.pipeline_cache' / 'memory_profile.json'
+TOP_SITES = 10
+TRACE_FRAMES = 1
+
+# 구간 이름 → 표시 이름 (리포트 순서)
+STAGE_LABELS = {
+    'excel_read': 'Excel 읽기',
+    'record_build': '레코드 생성',
+    'json_dump': 'JSON 저장',
+    'workbook_build': '종합 Excel 생성',
+    'html_embed': 'HTML 임베드',
+}
+
+MB = 1024 * 1024
+
+
+def read_status_kb(field):
+    """/proc/self/status 값 (kB). Linux가 아니면 None"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """VmHWM(피크 RSS) 초기화 → 성공하면 True (Linux 4.0+)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """현재 피크 RSS (MB) - VmHWM, 없으면 ru_maxrss"""
+    hwm = read_status_kb('VmHWM')
+    if hwm is not None:
+        return hwm / 1024
+    return parse_loadplan.peak_rss_mb()
+
+
+def current_rss_mb():
+    """현재 RSS (MB). 측정할 수 없으면 None"""
+    rss = read_status_kb('VmRSS')
+    return rss / 1024 if rss is not None else None
+
+
+class MemoryProfiler:
+    """구간별 피크 RSS + tracemalloc 할당 위치 수집"""
+
+    def __init__(self, top=TOP_SITES):
+        self.top = top
+        self.stages = {}
+        self.stage_scoped_rss = False
+        self.process_peak_mb = 0.0  # VmHWM 초기화 후에도 전체 피크 유지
+        self._lock = threading.RLock()  # 구간은 한 번에 하나씩 (피크/스냅샷이 프로세스 전체 기준)
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        self.process_peak_mb = peak_rss_mb() or 0.0
+        self.stage_scoped_rss = reset_peak_rss()
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        with self._lock:
+            self.process_peak_mb = max(self.process_peak_mb, peak_rss_mb() or 0.0)
+            reset_peak_rss()
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+            rss_before = current_rss_mb()
+            before = self.snapshot()
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                seconds = time.perf_counter() - start
+                traced_now, traced_peak = tracemalloc.get_traced_memory()
+                self.record(name, {
+                    'seconds': seconds,
+                    'rss_before_mb': rss_before,
+                    'rss_peak_mb': peak_rss_mb(),
+                    'traced_peak_mb': (traced_peak - traced_before) / MB,
+                    'traced_growth_mb': (traced_now - traced_before) / MB,
+                }, self.snapshot().compare_to(before, 'lineno'))
+
+    def record(self, name, sample, diffs):
+        """구간 측정값 누적 (같은 구간 여러 번 → 합계/최댓값)"""
+        entry = self.stages.setdefault(name, {
+            'calls': 0, 'seconds': 0.0, 'rss_before_mb': None, 'rss_peak_mb': None,
+            'traced_peak_mb': 0.0, 'traced_growth_mb': 0.0, 'sites': {},
+        })
+        entry['calls'] += 1
+        entry['seconds'] += sample['seconds']
+        self.process_peak_mb = max(self.process_peak_mb, sample['rss_peak_mb'] or 0.0)
+        entry['traced_peak_mb'] = max(entry['traced_peak_mb'], sample['traced_peak_mb'])
+        entry['traced_growth_mb'] += sample['traced_growth_mb']
+        for key in ('rss_before_mb', 'rss_peak_mb'):
+            if sample[key] is not None:
+                entry[key] = max(entry[key] or 0.0, sample[key])
+
+        for diff in diffs:
+            if diff.size_diff <= 0:
+                continue
+            frame = diff.traceback[0]
+            site = f'{frame.filename}:{frame.lineno}'
+            size, count = entry['sites'].get(site, (0, 0))
+            entry['sites'][site] = (size + diff.size_diff, count + diff.count_diff)
+
+    def report(self, command):
+        """리포트 dict (구간은 STAGE_LABELS 순서, 할당 위치는 크기 순 상위 N개)"""
+        stages = []
+        order = list(STAGE_LABELS) + [name for name in self.stages if name not in STAGE_LABELS]
+        for name in order:
+            entry = self.stages.get(name)
+            if not entry:
+                continue
+            sites = sorted(entry['sites'].items(), key=lambda item: item[1][0], reverse=True)[:self.top]
+            stages.append({
+                'stage': name,
+                'label': STAGE_LABELS.get(name, name),
+                'calls': entry['calls'],
+                'seconds': round(entry['seconds'], 3),
+                'rss_before_mb': round(entry['rss_before_mb'], 1) if entry['rss_before_mb'] is not None else None,
+                'rss_peak_mb': round(entry['rss_peak_mb'], 1) if entry['rss_peak_mb'] is not None else None,
+                'traced_peak_mb': round(entry['traced_peak_mb'], 2),
+                'traced_growth_mb': round(entry['traced_growth_mb'], 2),
+                'top_sites': [
+                    {'site': shorten_path(site), 'size_kb': round(size / 1024, 1), 'count': count}
+                    for site, (size, count) in sites
+                ],
+            })
+        return {
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'command': command,
+            'python': platform.python_version(),
+            'platform': sys.platform,
+            'rss_peak_scope': 'stage' if self.stage_scoped_rss else 'process',
+            'process_peak_rss_mb': round(max(self.process_peak_mb, peak_rss_mb() or 0.0), 1),
+            'stages': stages,
+        }
+
+
+def shorten_path(site):
+    """할당 위치 경로 축약 (프로젝트 → 상대 경로, 패키지 → site-packages 이후, 표준 라이브러리 → 모듈 경로)"""
+    project = str(PROJECT_DIR.resolve()) + os.sep
+    if site.startswith(project):
+        return site[len(project):]
+    stdlib = os.path.dirname(os.__file__) + os.sep
+    if site.startswith(stdlib) and 'site-packages' not in site:
+        return site[len(stdlib):]
+    marker = 'site-packages' + os.sep
+    if marker in site:
+        return site.split(marker, 1)[1]
+    return site
+
+
+def print_report(report, path):
+    """구간별 요약 출력"""
+    scope = '구간별' if report['rss_peak_scope'] == 'stage' else '프로세스 누적'
+    print("\n" + "=" * 60)
+    print(f"💾 메모리 프로파일 (피크 RSS: {scope})")
+    for stage in report['stages']:
+        rss = f"{stage['rss_peak_mb']:7.1f}MB" if stage['rss_peak_mb'] is not None else '      -  '
+        print(f"   {stage['label']:<14} x{stage['calls']:<3} {stage['seconds']:7.2f}초  "
+              f"RSS {rss}  Python 피크 {stage['traced_peak_mb']:7.2f}MB")
+        if stage['top_sites']:
+            top = stage['top_sites'][0]
+            print(f"      최대 할당: {top['site']} ({top['size_kb']:.0f}KB)")
+    print(f"   프로세스 피크 RSS: {report['process_peak_rss_mb']:.1f}MB")
+    print(f"   리포트: {path}")
+    print("=" * 60)
+
+
+def add_profile_argument(parser):
+    """--profile-memory [REPORT] 옵션 추가"""
+    parser.add_argument('--profile-memory', nargs='?', const=DEFAULT_REPORT_FILE, default=None,
+                        type=Path, metavar='REPORT',
+                        help='구간별 피크 RSS / 할당 위치 리포트 기록 (기본 .pipeline_cache/memory_profile.json)')
+
+
+def start_profiling(report_path, command=None):
+    """
+    프로파일링 시작 (report_path가 없으면 None)
+    parse_loadplan.profile_stage 구간을 측정하고, 프로세스 종료 시 리포트를 기록한다.
+    """
+    if not report_path:
+        return None
+
+    profiler = MemoryProfiler()
+    profiler.start()
+    parse_loadplan.stage_profiler = profiler
+    command = command or [Path(sys.argv[0]).name] + sys.argv[1:]
+
+    def finish():
+        parse_loadplan.stage_profiler = None
+        report = profiler.report(command)
+        profiler.stop()
+        path = Path(report_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print_report(report, path)
+
+    atexit.register(finish)
+    print(f"💾 메모리 프로파일링 켜짐 → {report_path}")
+    return profiler
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+공장 Excel 파싱 결과 공유 아티팩트 생성 스크립트
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+사용법:
+    python scripts/parsed_artifact.py
+    python scripts/parsed_artifact.py --profile-memory   # 구간별 메모리 리포트 (memory_profile.py)
+
+입력: data/Factory_*.xlsx (4개 공장 파일)
+출력: data/parsed_orders.json (버전 + 소스 해시 + 파싱 레코드)
+
+embed_data.py / generate_consolidated.py 는 이 아티팩트를 읽어서 사용하므로
+Excel 디코딩은 파이프라인 실행당 한 번만 일어난다.
+소스 파일 해시 또는 파서 코드가 바뀌면 자동으로 다시 파싱한다.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# 프로젝트 루트를 sys.path에 추가 (parse_loadplan.py import용)
+PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+import parse_loadplan
+from parse_loadplan import parse_factory_file, profile_stage
+from memory_profile import add_profile_argument, start_profiling
+
+# 설정
+DATA_DIR = PROJECT_DIR / 'data'
+ARTIFACT_FILE = DATA_DIR / 'parsed_orders.json'
+
+# 아티팩트 포맷 버전 (레코드 구조가 바뀌면 증가)
+ARTIFACT_VERSION = 1
+
+FACTORY_FILES = {
+    'A': 'Factory_A.xlsx',
+    'B': 'Factory_B.xlsx',
+    'C': 'Factory_C.xlsx',
+    'D': 'Factory_D.xlsx',
+}
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """파일 SHA-256 해시 (청크 단위로 읽기)"""
+    with open(path, 'rb') as f:
+        return buffer_sha256(f, chunk_size)
+
+
+def buffer_sha256(fileobj, chunk_size=1024 * 1024):
+    """파일 객체 SHA-256 해시 (처음부터 읽고 위치를 처음으로 되돌림)"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def parser_fingerprint():
+    """파서 코드 해시 - parse_loadplan.py가 바뀌면 아티팩트 무효화"""
+    return file_sha256(parse_loadplan.__file__)[:16]
+
+
+def collect_sources(data_dir=DATA_DIR):
+    """공장별 소스 파일 정보 (파일명, 크기, 해시)"""
+    sources = {}
+    for factory, filename in FACTORY_FILES.items():
+        filepath = Path(data_dir) / filename
+        if not filepath.exists():
+            continue
+        sources[factory] = file_source(filepath)
+    return sources
+
+
+def file_source(filepath):
+    """로컬 파일 소스 정보 (파일명, 크기, 해시)"""
+    filepath = Path(filepath)
+    return {
+        'file': filepath.name,
+        'size': filepath.stat().st_size,
+        'sha256': file_sha256(filepath),
+    }
+
+
+def build_artifact(data_dir=DATA_DIR, sources=None, workbooks=None):
+    """
+    모든 공장 파일을 parse_factory_file로 파싱하여 아티팩트 생성
+    workbooks: {공장: 파일 객체} - 주어지면 디스크 대신 메모리 버퍼를 파싱
+    """
+    if sources is None:
+        sources = collect_sources(data_dir)
+
+    records_by_factory = {}
+    for factory, source in sources.items():
+        if workbooks is not None:
+            target = workbooks[factory]
+            target.seek(0)
+        else:
+            target = str(Path(data_dir) / source['file'])
+        records_by_factory[factory] = parse_factory_file(factory, target)
+    return assemble_artifact(sources, records_by_factory)
+
+
+def assemble_artifact(sources, records_by_factory):
+    """
+    공장별 파싱 결과로 아티팩트 구성 (레코드는 sources 순서대로 이어 붙임)
+    파싱 순서와 상관없이 같은 입력이면 같은 아티팩트 (download_from_drive.py --pipelined)
+    """
+    all_records = []
+    for factory, source in sources.items():
+        records = records_by_factory[factory]
+        source['records'] = len(records)
+        all_records.extend(records)
+
+    return {
+        'version': ARTIFACT_VERSION,
+        'parser': parser_fingerprint(),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'sources': sources,
+        'records': all_records,
+    }
+
+
+def buffer_source(filename, fileobj):
+    """메모리 버퍼 소스 정보 (collect_sources와 같은 형식)"""
+    fileobj.seek(0, os.SEEK_END)
+    return {
+        'file': filename,
+        'size': fileobj.tell(),
+        'sha256': buffer_sha256(fileobj),
+    }
+
+
+def build_artifact_from_buffers(buffers):
+    """
+    다운로드한 메모리 버퍼로 아티팩트 생성 (디스크 쓰기/읽기 없음)
+    buffers: {공장: (파일명, 파일 객체)}
+    """
+    sources = {}
+    workbooks = {}
+    for factory in FACTORY_FILES:
+        if factory not in buffers:
+            continue
+        filename, fileobj = buffers[factory]
+        sources[factory] = buffer_source(filename, fileobj)
+        workbooks[factory] = fileobj
+    return build_artifact(sources=sources, workbooks=workbooks)
+
+
+def write_artifact(artifact, path=ARTIFACT_FILE):
+    """아티팩트 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with profile_stage('json_dump'), open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_artifact(path=ARTIFACT_FILE):
+    """아티팩트 읽기 (없거나 손상되면 None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_artifact_fresh(artifact, sources):
+    """
+    아티팩트가 현재 소스/파서/포맷 버전과 일치하는지 확인
+    원본 파일이 하나도 없으면 (메모리 다운로드 모드) 포맷/파서만 확인
+    """
+    if not artifact:
+        return False
+    if artifact.get('version') != ARTIFACT_VERSION:
+        return False
+    if artifact.get('parser') != parser_fingerprint():
+        return False
+    if not sources:
+        return bool(artifact.get('sources'))
+
+    cached = artifact.get('sources', {})
+    if set(cached) != set(sources):
+        return False
+    return all(cached[f].get('sha256') == s['sha256'] for f, s in sources.items())
+
+
+def load_artifact(data_dir=DATA_DIR, path=ARTIFACT_FILE):
+    """최신 아티팩트 반환 - 유효하면 재사용, 아니면 파싱 후 저장"""
+    sources = collect_sources(data_dir)
+    artifact = read_artifact(path)
+
+    if is_artifact_fresh(artifact, sources):
+        print(f"  ♻️ 파싱 아티팩트 재사용: {Path(path).name} ({len(artifact['records'])}개 레코드)")
+        return artifact
+
+    if not sources:
+        return None
+
+    artifact = build_artifact(data_dir, sources)
+    write_artifact(artifact, path)
+    print(f"  ✅ 파싱 아티팩트 저장: {path} ({len(artifact['records'])}개 레코드)")
+    return artifact
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='공장 Excel 파싱 → 공유 아티팩트 생성')
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    start_profiling(args.profile_memory)
+
+    print("=" * 60)
+    print("🧩 파싱 아티팩트 생성 시작")
+    print(f"   시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    if not DATA_DIR.exists():
+        print(f"❌ 데이터 디렉토리가 없습니다: {DATA_DIR}")
+        print("   먼저 download_from_drive.py를 실행하세요.")
+        sys.exit(1)
+
+    start_time = time.time()
+    artifact = load_artifact(DATA_DIR, ARTIFACT_FILE)
+
+    if not artifact or not artifact['records']:
+        print("\n❌ 파싱된 데이터가 없습니다.")
+        sys.exit(1)
+
+    elapsed = time.time() - start_time
+    print("\n" + "=" * 60)
+    print("✅ 아티팩트 준비 완료!")
+    for factory, source in artifact['sources'].items():
+        print(f"   Factory {factory}: {source.get('records', 0)}개 ({source['sha256'][:12]})")
+    print(f"   총 레코드: {len(artifact['records'])}개")
+    print(f"   소요 시간: {elapsed:.2f}초")
+    print("=" * 60)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
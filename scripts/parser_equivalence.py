@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+파서 경로 동일성 검증 (differential harness)
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+기준 파서(parse_factory_file, openpyxl)와 다른 파싱 경로를 같은 워크북에 돌려서
+레코드를 하나씩 비교하고, 다르면 첫 번째로 어긋난 필드를 보고한다.
+성능 개선 경로는 여기서 통과해야 배포할 수 있다.
+
+비교 경로 (PATHS, 새 경로는 여기에 등록):
+    chunked         parse_factory_file_chunked (작은 배치로 배치 경계까지 검증)
+    in-memory       build_artifact_from_buffers (다운로드 버퍼 → 바로 파싱)
+    cached          write_artifact → read_artifact (아티팩트 JSON 왕복)
+    parallel        backfill_loadplan.parse_job (프로세스 풀 + 체크포인트 왕복)
+    archive         과거 스냅샷(2024-12-20) 백필 - M/D 날짜가 스냅샷 연도 기준인지 (year_window_for)
+
+연도 구간: 3월/6월/9월/12월 스냅샷에서 10/.., 11/.., 12/.. 등 M/D 날짜가 기대 연도로 풀리는지
+           (YEAR_WINDOW_CASES) - 경로 선택과 관계없이 항상 확인
+    filtered        조건부 파싱 (row_filter 조기 탈락) - 기준 결과에 record_matches를 적용한 것과 비교
+    engine:<이름>   설치된 다른 Excel 엔진 (예: engine:calamine)
+
+워크북:
+    합성    공장 레이아웃 4종마다 파서의 특이 동작을 일부러 섞어 만든 워크북
+            (M/D 날짜의 year_window 연도 넘김, INHOUSE, partial/pending 경계, oscRemaining,
+             '00:00:00', 반복 헤더/합계/빈 행, 숫자 문자열 등) - 기준 결과가 이 경우들을
+            실제로 포함하는지도 확인한다
+    기록    data/Factory_*.xlsx + --workbooks 디렉토리의 날짜별 로드플랜 (FACTORY X ... MM.DD.YYYY.xlsx)
+
+사용법:
+    python scripts/parser_equivalence.py
+    python scripts/parser_equivalence.py --paths chunked,parallel --rows 1000 --seed 7
+    python scripts/parser_equivalence.py --workbooks /path/to/archive --no-synthetic
+    python scripts/parser_equivalence.py --keep /tmp/synthetic   # 합성 워크북 보관
+
+종료 코드:
+    0: 모든 경로 결과 동일
+    1: 불일치 / 경로 실행 실패 / 합성 워크북이 특이 동작을 포함하지 않음
+"""
+
+import io
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# parsed_artifact가 프로젝트 루트를 sys.path에 추가 (parse_loadplan.py import용)
+from parsed_artifact import (
+    DATA_DIR, FACTORY_FILES, build_artifact, build_artifact_from_buffers, parser_fingerprint,
+    read_artifact, write_artifact,
+)
+import parse_loadplan
+import backfill_loadplan
+
+# 설정
+DEFAULT_ROWS = 400
+DEFAULT_SEED = 20251220
+DEFAULT_BATCH_SIZE = 7  # 배치 경계가 자주 생기도록 작게
+
+# 합성 워크북 값 목록 (None = 빈 셀)
+DATE_VALUES = [
+    datetime(2025, 12, 1), datetime(2026, 1, 27), '11/20', '1/20', '10/1', '9/30',
+    '2025.11.03', '2026-02-05', '12-25',
+]
+BAL_VALUES = DATE_VALUES + [
+    'INHOUSE', 'inhouse', 0, 'QTY', 'PARTIAL', 'PARTIAL', 'OVER', '50', 12.5,
+    '00:00:00', '#N/A', None, None, 'weird', 'NO HAPPO',
+]
+COLUMN_VALUES = {
+    'unit': ['U1', 'U3', 'U5', 'U9', ' U2 ', 7],
+    'season': ['SS26', 'FW25', None],
+    'model': ['GAZELLE', 'SAMBA', 'CAMPUS', 'SPEZIAL'],
+    'article': ['A8582', 'A1428', 8582],
+    'color': ['BLK', 'WHT', None],
+    'destination': ['USA', 'JPN', 'KOR', ' EU ', None, '#N/A', 'nan'],
+    'crd': [datetime(2025, 12, 11), '00:00:00', '12/05', '2025.12.01', None],
+    'sdd_original': [datetime(2025, 12, 1), '1/15', '00:00:00', None, 'TBD'],
+    'sdd_current': [datetime(2026, 1, 10), '10/15', '00:00:00', None, None, 'TBD'],
+    'code04': [None, '-', 'C04-OK', 'C04 APPROVED'],
+    'outsole_vendor': ['OK', 'RACH', None, 'VENDOR X'],
+    'mrp_qty': [100, '200', 'weird', None, 150.0],
+    'mrp_date': [datetime(2025, 11, 20), '11/20', None, 'x'],
+    'setp': ['PO95880', 12345, None],
+    'intertek': ['YES', 'y', 'NO', None, 'AQL', 1],
+    'wh_return_fac': [0, 3, '2', None, 'n/a'],
+    'inspection': [datetime(2025, 12, 1), '12/01', None, '00:00:00'],
+}
+QUANTITY_VALUES = [200, 200, 1200, 100, 50, '300', 150.0, 0, -5, None, 'abc']
+BAL_KEYS = [
+    's_cut_bal', 'pre_sew_bal', 'sew_input_bal', 'sew_bal', 's_fit_bal', 'ass_bal',
+    'wh_in_bal', 'wh_out_bal', 'outsourcing_in_bal', 'outsourcing_out_bal', 'sew_prod_scan',
+]
+
+# 백필 스냅샷 날짜 (parallel은 기준 파서와 같은 연도, archive는 1년 전 로드플랜)
+REFERENCE_SNAPSHOT = '2025-12-20'
+ARCHIVE_SNAPSHOT = '2024-12-20'
+
+# 스냅샷 날짜별 M/D 날짜 → 기대 결과 (year_window_for 구간: 스냅샷 월 2개월 전 ~ 9개월 후)
+YEAR_WINDOW_CASES = {
+    '2025-03-15': {'10/05': '2025-10-05', '11/20': '2025-11-20', '12/31': '2025-12-31', '1/10': '2025-01-10'},
+    '2025-06-15': {'10/05': '2025-10-05', '11/20': '2025-11-20', '12/31': '2025-12-31', '3/01': '2026-03-01'},
+    '2025-09-20': {'10/05': '2025-10-05', '11/20': '2025-11-20', '12/31': '2025-12-31', '6/30': '2026-06-30'},
+    REFERENCE_SNAPSHOT: {'10/05': '2025-10-05', '11/20': '2025-11-20', '12/31': '2025-12-31', '9/30': '2026-09-30'},
+}
+
+# filtered 경로 필터 (공장 건너뛰기, 문자열/SDD/wh_out 단계 탈락을 모두 거치도록)
+FILTER_OPTIONS = {
+    'factories': ['A', 'B', 'C'],
+    'seasons': ['ss26', 'FW25'],
+    'destinations': ['USA', 'EU', 'unknown'],
+    'sdd_from': '2025-10',
+    'sdd_to': '2026-01',
+    'open_only': True,
+}
+
+# 기준 결과에 반드시 나와야 하는 특이 동작
+QUIRKS = {
+    'year_window 연도 넘김 (M/D → 2026)': lambda r: any(
+        (stage.get('expected_date') or '').startswith('2026-') for stage in r['production'].values()),
+    'M/D 10월 이후 (→ 2025)': lambda r: any(
+        (stage.get('expected_date') or '').startswith('2025-1') for stage in r['production'].values()),
+    'INHOUSE': lambda r: any(stage.get('note') == 'INHOUSE' for stage in r['production'].values()),
+    'partial': lambda r: any(stage['status'] == 'partial' for stage in r['production'].values()),
+    'pending (잔량 ≥ 수량)': lambda r: any(
+        stage['status'] == 'pending' and stage['pending'] >= r['quantity'] > 0 for stage in r['production'].values()),
+    'unknown': lambda r: any(stage['status'] == 'unknown' for stage in r['production'].values()),
+    'oscRemaining < 수량': lambda r: r['oscRemaining'] < r['quantity'],
+    'oscRemaining = 수량': lambda r: r['oscRemaining'] == r['quantity'],
+    'destination 자동 수정': lambda r: r['destination'] == 'Unknown',
+}
+
+
+class ListSink:
+    """청크 모드 출력을 메모리 목록으로 받는 싱크"""
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, records):
+        self.records.extend(records)
+
+
+@contextlib.contextmanager
+def quiet():
+    """파서 로그 숨기기"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def bal_value(rng, qty):
+    """BAL 셀 값 (수량 기준 QTY / PARTIAL / OVER 치환)"""
+    value = rng.choice(BAL_VALUES)
+    base = qty if isinstance(qty, int) and qty > 1 else 100
+    if value == 'QTY':
+        return base
+    if value == 'PARTIAL':
+        return rng.randint(1, base - 1)
+    if value == 'OVER':
+        return base + 50
+    return value
+
+
+def synthetic_row(rng, cols, width):
+    """합성 데이터 행 하나 (일반 / 반복 헤더 / 합계 / 빈 행)"""
+    row = [None] * width
+    kind = rng.random()
+    if kind < 0.03:
+        return row  # 빈 행
+    if kind < 0.06:
+        row[cols['quantity']], row[cols['model']], row[cols['destination']] = 'Q.ty', 'Model', 'Dest'
+        return row  # 반복 헤더
+    if kind < 0.09:
+        row[cols['quantity']] = rng.choice([5000, '12000'])
+        return row  # 합계 행 (unit/model 없음)
+
+    for key, values in COLUMN_VALUES.items():
+        if key in cols:
+            row[cols[key]] = rng.choice(values)
+    if rng.random() < 0.05:
+        row[cols['unit']] = None  # unit만 없는 행도 데이터 행
+    qty = rng.choice(QUANTITY_VALUES)
+    row[cols['quantity']] = qty
+    for key in BAL_KEYS:
+        row[cols[key]] = bal_value(rng, qty)
+    return row
+
+
+def build_synthetic_workbook(factory, path, rows, seed):
+    """공장 레이아웃 합성 워크북 생성 (헤더 4행 + 데이터 rows행 + 끝 빈 행)"""
+    from openpyxl import Workbook
+
+    cols = parse_loadplan.get_factory_columns(factory)
+    width = max(cols.values()) + 3
+    rng = random.Random(f'{seed}-{factory}')
+
+    wb = Workbook(write_only=True)
+    sheet = wb.create_sheet()
+    for i in range(parse_loadplan.DATA_START_ROW):
+        sheet.append([f'LOADPLAN FACTORY {factory}' if i == 0 else 'hdr'] * width)
+    for _ in range(rows):
+        sheet.append(synthetic_row(rng, cols, width))
+    sheet.append([None] * width)
+    wb.save(path)
+
+
+def collect_cases(args, work_dir):
+    """비교할 워크북 목록 [{id, factory, path, kind}]"""
+    cases = []
+    if not args.no_synthetic:
+        for factory in FACTORY_FILES:
+            path = work_dir / f'synthetic_{factory}.xlsx'
+            build_synthetic_workbook(factory, path, args.rows, args.seed)
+            cases.append({'id': f'합성 {factory}', 'factory': factory, 'path': path, 'kind': 'synthetic'})
+
+    for factory, filename in FACTORY_FILES.items():
+        path = Path(args.data_dir) / filename
+        if path.exists():
+            cases.append({'id': f'기록 {filename}', 'factory': factory, 'path': path, 'kind': 'recorded'})
+
+    for root in args.workbooks:
+        for snapshot, factories in backfill_loadplan.discover_loadplans(root).items():
+            for factory, path in sorted(factories.items()):
+                cases.append({'id': f'기록 {snapshot} {factory}', 'factory': factory,
+                              'path': Path(path), 'kind': 'recorded'})
+    return cases
+
+
+# ===== 비교 경로: (cases, args, work_dir) → {case id: records} =====
+
+def run_reference(cases, args, work_dir):
+    with quiet():
+        return {case['id']: parse_loadplan.parse_factory_file(
+            case['factory'], case['path'], parse_loadplan.DEFAULT_ENGINE) for case in cases}
+
+
+def run_chunked(cases, args, work_dir):
+    results = {}
+    for case in cases:
+        sink = ListSink()
+        with quiet():
+            parse_loadplan.parse_factory_file_chunked(case['factory'], case['path'], sink, args.batch_size)
+        results[case['id']] = sink.records
+    return results
+
+
+def run_in_memory(cases, args, work_dir):
+    results = {}
+    for case in cases:
+        buffer = io.BytesIO(Path(case['path']).read_bytes())
+        with quiet():
+            artifact = build_artifact_from_buffers({case['factory']: (Path(case['path']).name, buffer)})
+        results[case['id']] = artifact['records']
+    return results
+
+
+def run_cached(cases, args, work_dir):
+    results = {}
+    for i, case in enumerate(cases):
+        data_dir = work_dir / f'cached_{i}'
+        data_dir.mkdir()
+        shutil.copyfile(case['path'], data_dir / FACTORY_FILES[case['factory']])
+        artifact_path = data_dir / 'parsed_orders.json'
+        with quiet():
+            artifact = build_artifact(data_dir)
+        write_artifact(artifact, artifact_path)
+        results[case['id']] = read_artifact(artifact_path)['records']
+    return results
+
+
+def run_parallel(cases, args, work_dir, snapshot=REFERENCE_SNAPSHOT):
+    checkpoint_dir = work_dir / 'checkpoints'
+    checkpoint_dir.mkdir()
+    parser = parser_fingerprint()
+    results = {}
+    with ProcessPoolExecutor() as pool:
+        futures = {}
+        for i, case in enumerate(cases):
+            checkpoint = checkpoint_dir / f'{i}.json'
+            futures[case['id']] = (checkpoint, pool.submit(
+                backfill_loadplan.parse_job, snapshot, case['factory'], case['path'], checkpoint, parser))
+        for case_id, (checkpoint, future) in futures.items():
+            try:
+                future.result()
+            except ValueError:
+                results[case_id] = []  # 레코드 없음 → 체크포인트 없음
+                continue
+            with open(checkpoint, 'r', encoding='utf-8') as f:
+                records = json.load(f)['records']
+            for record in records:
+                record.pop('snapshot', None)  # 백필이 붙이는 스냅샷 태그는 비교 대상 아님
+            results[case_id] = records
+    return results
+
+
+def run_archive(cases, args, work_dir):
+    return run_parallel(cases, args, work_dir, ARCHIVE_SNAPSHOT)
+
+
+def parse_archive_reference(case):
+    """과거 스냅샷 기준 결과 (기준 파서 + 스냅샷 연도)"""
+    with quiet():
+        return parse_loadplan.parse_factory_file(
+            case['factory'], case['path'], parse_loadplan.DEFAULT_ENGINE,
+            year_window=parse_loadplan.year_window_for(ARCHIVE_SNAPSHOT))
+
+
+def run_filtered(cases, args, work_dir):
+    row_filter = parse_loadplan.build_row_filter(**FILTER_OPTIONS)
+    with quiet():
+        return {case['id']: parse_loadplan.parse_factory_file(
+            case['factory'], case['path'], parse_loadplan.DEFAULT_ENGINE, row_filter) for case in cases}
+
+
+def filter_reference(case, records):
+    row_filter = parse_loadplan.build_row_filter(**FILTER_OPTIONS)
+    return [record for record in records if parse_loadplan.record_matches(record, row_filter)]
+
+
+def engine_path(engine):
+    def run_engine(cases, args, work_dir):
+        with quiet():
+            return {case['id']: parse_loadplan.parse_factory_file(
+                case['factory'], case['path'], engine) for case in cases}
+    return run_engine
+
+
+PATHS = {
+    'chunked': run_chunked,
+    'in-memory': run_in_memory,
+    'cached': run_cached,
+    'parallel': run_parallel,
+    'archive': run_archive,
+    'filtered': run_filtered,
+}
+
+# 기준 결과를 그대로 비교하지 않는 경로: 경로 이름 → (case, 기준 레코드) → 기대 레코드
+EXPECTED = {
+    'archive': lambda case, records: parse_archive_reference(case),
+    'filtered': filter_reference,
+}
+
+
+def available_paths():
+    """비교 가능한 경로 (기본 엔진 외 설치된 엔진 포함)"""
+    paths = dict(PATHS)
+    for engine in parse_loadplan.available_engines():
+        if engine != parse_loadplan.DEFAULT_ENGINE:
+            paths[f'engine:{engine}'] = engine_path(engine)
+    return paths
+
+
+def first_divergence(expected, actual, path=''):
+    """두 값의 첫 번째 차이 위치 설명 (같으면 None)"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in list(expected) + [k for k in actual if k not in expected]:
+            if key not in actual or key not in expected:
+                return f"{path}{key}: {'필드 없음' if key not in actual else '추가 필드'}"
+            found = first_divergence(expected[key], actual[key], f'{path}{key}.')
+            if found:
+                return found
+        return None
+    if isinstance(expected, list) and isinstance(actual, list):
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            found = first_divergence(a, b, f'{path}[{i}] ')
+            if found:
+                return found
+        if len(expected) != len(actual):
+            return f'{path}개수 {len(expected)} != {len(actual)}'
+        return None
+    if expected != actual or type(expected) is not type(actual):
+        return f'{path.rstrip(". ")}: {expected!r} != {actual!r}'
+    return None
+
+
+def compare_records(expected, actual):
+    """레코드 목록 비교 → (다른 레코드 수, 첫 차이 설명 또는 None)"""
+    diverged = 0
+    first = None
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        found = first_divergence(a, b)
+        if found:
+            diverged += 1
+            if first is None:
+                first = f"레코드 #{i} ({a.get('poNumber') or '-'} / {a.get('model') or '-'}) {found}"
+    if len(expected) != len(actual):
+        diverged += abs(len(expected) - len(actual))
+        if first is None:
+            first = f'레코드 수 {len(expected)} != {len(actual)} (#{min(len(expected), len(actual))}부터)'
+    return diverged, first
+
+
+def check_quirks(reference, cases):
+    """합성 워크북 기준 결과에 특이 동작이 모두 나오는지 → 빠진 항목 목록"""
+    records = [r for case in cases if case['kind'] == 'synthetic' for r in reference[case['id']]]
+    if not records:
+        return {}, []
+    counts = {name: sum(1 for r in records if test(r)) for name, test in QUIRKS.items()}
+    return counts, [name for name, count in counts.items() if not count]
+
+
+def check_archive_year(reference, cases):
+    """합성 워크북의 과거 스냅샷 결과가 실제로 연도가 바뀌는지 → 달라진 레코드 수"""
+    changed = 0
+    for case in cases:
+        if case['kind'] == 'synthetic':
+            archive = parse_archive_reference(case)
+            changed += sum(1 for a, b in zip(archive, reference[case['id']]) if a != b)
+    return changed
+
+
+def check_year_window():
+    """YEAR_WINDOW_CASES의 스냅샷별 M/D 연도 결정 → 어긋난 (스냅샷, 값, 기대, 결과) 목록"""
+    mismatches = []
+    for snapshot, values in YEAR_WINDOW_CASES.items():
+        window = parse_loadplan.year_window_for(snapshot)
+        for value, expected in values.items():
+            actual = parse_loadplan.parse_date_to_string(value, window)
+            if actual != expected:
+                mismatches.append((snapshot, value, expected, actual))
+    return mismatches
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    paths = available_paths()
+    parser = argparse.ArgumentParser(description='기준 파서 대비 파싱 경로 레코드 동일성 검증')
+    parser.add_argument('--paths', default=','.join(paths),
+                        help=f'비교할 경로 (쉼표 구분, 기본: {",".join(paths)})')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help='기록 워크북 디렉토리 (기본 data/)')
+    parser.add_argument('--workbooks', type=Path, action='append', default=[],
+                        help='날짜별 로드플랜 아카이브 디렉토리 추가 (여러 번 가능)')
+    parser.add_argument('--no-synthetic', action='store_true', help='합성 워크북 제외')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help=f'합성 워크북 행 수 (기본 {DEFAULT_ROWS})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='합성 워크북 시드')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'chunked 경로 배치 행 수 (기본 {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--keep', type=Path, metavar='DIR', help='합성 워크북을 DIR에 보관')
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.paths.split(',') if name.strip()]
+    unknown = [name for name in selected if name not in paths]
+    if unknown:
+        print(f"❌ 알 수 없는(또는 미설치) 경로: {', '.join(unknown)} (가능: {', '.join(paths)})")
+        return 1
+
+    print("=" * 60)
+    print("🔬 파서 경로 동일성 검증")
+    print(f"   기준: parse_factory_file ({parse_loadplan.DEFAULT_ENGINE})")
+    print(f"   경로: {', '.join(selected)}")
+    print("=" * 60)
+
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix='parser_equivalence_') as tmp:
+        work_dir = Path(tmp)
+        cases = collect_cases(args, work_dir)
+        if not cases:
+            print("❌ 비교할 워크북이 없습니다")
+            return 1
+        if args.keep:
+            args.keep.mkdir(parents=True, exist_ok=True)
+            for case in cases:
+                if case['kind'] == 'synthetic':
+                    shutil.copyfile(case['path'], args.keep / Path(case['path']).name)
+
+        reference = run_reference(cases, args, work_dir)
+        print(f"\n📂 워크북 {len(cases)}개")
+        for case in cases:
+            print(f"   {case['id']:<28} 기준 레코드 {len(reference[case['id']])}개")
+
+        counts, missing = check_quirks(reference, cases)
+        if counts:
+            print("\n🧪 합성 워크북 특이 동작 포함 여부")
+            for name, count in counts.items():
+                print(f"   {'✅' if count else '❌'} {name}: {count}건")
+            if missing:
+                print(f"   ⚠️ 빠진 특이 동작이 있습니다 - --rows를 늘리거나 --seed를 바꾸세요")
+                failures += 1
+            changed = check_archive_year(reference, cases)
+            print(f"   {'✅' if changed else '❌'} {ARCHIVE_SNAPSHOT} 스냅샷 M/D 연도 적용: {changed}건")
+            if not changed:
+                failures += 1
+
+        mismatches = check_year_window()
+        total = sum(len(values) for values in YEAR_WINDOW_CASES.values())
+        print(f"\n📅 스냅샷별 M/D 연도 구간 ({', '.join(YEAR_WINDOW_CASES)})")
+        print(f"   {'✅' if not mismatches else '❌'} {total - len(mismatches)}/{total}건 기대 연도")
+        for snapshot, value, expected, actual in mismatches:
+            print(f"      {snapshot} '{value}': 기대 {expected}, 결과 {actual}")
+        failures += bool(mismatches)
+
+        for name in selected:
+            print(f"\n▶️ {name}")
+            path_dir = work_dir / name.replace(':', '_')
+            path_dir.mkdir()
+            try:
+                results = paths[name](cases, args, path_dir)
+            except Exception as e:
+                print(f"   ❌ 실행 실패: {e}")
+                failures += 1
+                continue
+            expected = EXPECTED.get(name, lambda case, records: records)
+            for case in cases:
+                diverged, first = compare_records(expected(case, reference[case['id']]), results.get(case['id'], []))
+                if not diverged:
+                    print(f"   ✅ {case['id']}")
+                    continue
+                failures += 1
+                print(f"   ❌ {case['id']}: {diverged}개 레코드 불일치")
+                print(f"      첫 차이: {first}")
+
+    print("\n" + "=" * 60)
+    print("✅ 모든 경로가 기준 파서와 동일" if not failures else f"❌ 검증 실패 {failures}건")
+    print("=" * 60)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+파싱 오더 로컬 조회 서비스 (읽기 전용 HTTP/JSON)
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+data/parsed_orders.json (parse_loadplan 파싱 결과)을 메모리 컬럼 저장소로 올리고
+필터/정렬/페이지 조회와 공장/월/공정별 집계를 제공한다.
+아티팩트 파일이 교체되면 새 스냅샷을 옆에서 만든 뒤 참조만 바꾼다 (무중단 교체).
+
+사용법:
+    python scripts/query_service.py
+    python scripts/query_service.py --port 8765 --reload-interval 5
+
+엔드포인트 (GET만 지원):
+    /health                       스냅샷 정보, 필드 목록
+    /orders                       오더 조회
+        ?factory=A,B              같음 (쉼표 = OR), 중첩 필드는 production.wh_out.status 형식
+        ?quantity__gte=100        범위 (__gte / __lte, 숫자 또는 ISO 날짜 문자열)
+        ?sort=-quantity,poNumber  정렬 (- = 내림차순, 빈 값은 항상 마지막)
+        ?limit=100&offset=0       페이지 (limit 최대 1000)
+        ?fields=factory,poNumber  지정 필드만 평탄화해서 반환
+    /aggregate?by=factory,sddYearMonth&sum=quantity   그룹별 건수/합계 (필터 동일)
+    /aggregate/factory            공장별
+    /aggregate/month              월별 (?month_field=crdYearMonth, 기본 sddYearMonth)
+    /aggregate/stage              공정별 완료/잔량 합계와 상태 건수
+"""
+
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from parsed_artifact import ARTIFACT_FILE, read_artifact
+
+# 설정
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_RELOAD_INTERVAL = 5.0
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# 역인덱스를 만드는 필드 (같음 필터를 스캔 없이 처리)
+INDEXED_FIELDS = (
+    'factory', 'unit', 'season', 'model', 'article', 'color', 'destination',
+    'crdYearMonth', 'sddYearMonth', 'code04', 'inspection', 'aql',
+)
+
+# 필터가 아닌 예약 파라미터
+RESERVED_PARAMS = {'sort', 'limit', 'offset', 'fields', 'by', 'sum', 'month_field'}
+RANGE_OPERATORS = {'__gte': 'gte', '__lte': 'lte'}
+
+# 생산 공정 순서 (parse_loadplan production 키)
+STAGES = ['s_cut', 'pre_sew', 'sew_input', 'sew_bal', 's_fit', 'ass_bal', 'wh_in', 'wh_out']
+# parse_bal_column 상태값 (그 외 값이 데이터에 있으면 집계에 그대로 추가)
+STAGE_STATUSES = ('completed', 'partial', 'pending', 'unknown')
+
+
+class QueryError(ValueError):
+    """잘못된 조회 파라미터 (HTTP 400)"""
+
+
+def flatten_record(record, prefix=''):
+    """중첩 레코드를 '.' 경로 → 값 딕셔너리로 평탄화"""
+    flat = {}
+    for key, value in record.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict) and value:
+            flat.update(flatten_record(value, f'{path}.'))
+        else:
+            flat[path] = value
+    return flat
+
+
+def to_text(value):
+    """필터 비교용 문자열 (쿼리스트링 값과 같은 형태)"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def snapshot_id(artifact):
+    """스냅샷 식별자 (소스 해시 + 파서 지문)"""
+    sources = sorted((f, s.get('sha256', '')) for f, s in artifact.get('sources', {}).items())
+    body = json.dumps([artifact.get('parser'), sources])
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:12]
+
+
+class OrderStore:
+    """
+    스냅샷 하나의 읽기 전용 컬럼 저장소
+    - columns: 평탄화 경로 → 행 순서 값 목록
+    - indexes: INDEXED_FIELDS 값(문자열) → 행 번호 목록
+    생성 후 변경하지 않으므로 여러 요청 스레드가 잠금 없이 공유한다.
+    """
+
+    def __init__(self, artifact):
+        self.records = artifact.get('records', [])
+        self.snapshot = snapshot_id(artifact)
+        self.generated_at = artifact.get('generated_at')
+        self.sources = {f: s.get('records', 0) for f, s in artifact.get('sources', {}).items()}
+        self.loaded_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        flat_records = [flatten_record(r) for r in self.records]
+        paths = {}
+        for flat in flat_records:
+            for path in flat:
+                paths.setdefault(path, None)
+        self.columns = {path: [flat.get(path) for flat in flat_records] for path in paths}
+
+        self.indexes = {}
+        for path in INDEXED_FIELDS:
+            if path not in self.columns:
+                continue
+            index = {}
+            for row, value in enumerate(self.columns[path]):
+                index.setdefault(to_text(value), []).append(row)
+            self.indexes[path] = index
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, path):
+        if path not in self.columns:
+            raise QueryError(f"알 수 없는 필드: {path}")
+        return self.columns[path]
+
+    def select(self, filters):
+        """필터 [(경로, 연산, 값 목록)] → 일치하는 행 번호 (오름차순)"""
+        candidates = None
+        scans = []
+        for path, op, values in filters:
+            column = self.column(path)
+            if op == 'eq' and path in self.indexes:
+                index = self.indexes[path]
+                rows = set()
+                for value in values:
+                    rows.update(index.get(value, ()))
+                candidates = rows if candidates is None else candidates & rows
+            else:
+                scans.append((column, op, values))
+
+        rows = range(len(self)) if candidates is None else sorted(candidates)
+        for column, op, values in scans:
+            rows = [row for row in rows if matches(column[row], op, values)]
+        return list(rows)
+
+    def sort(self, rows, sort_keys):
+        """[(경로, 내림차순 여부)] 순으로 안정 정렬 (빈 값은 방향과 무관하게 마지막)"""
+        for path, descending in reversed(sort_keys):
+            column = self.column(path)
+            present = [row for row in rows if column[row] is not None]
+            missing = [row for row in rows if column[row] is None]
+            present.sort(key=lambda row: sort_value(column[row]), reverse=descending)
+            rows = present + missing
+        return rows
+
+    def project(self, row, fields):
+        """행 → 원본 레코드 또는 지정 필드만 평탄화한 딕셔너리"""
+        if not fields:
+            return self.records[row]
+        return {path: self.columns[path][row] for path in fields}
+
+    def info(self):
+        return {
+            'snapshot': self.snapshot,
+            'generated_at': self.generated_at,
+            'loaded_at': self.loaded_at,
+            'records': len(self),
+            'sources': self.sources,
+            'indexed': sorted(self.indexes),
+            'fields': list(self.columns),
+        }
+
+
+def sort_value(value):
+    """정렬 키 (숫자 < 문자열, 타입이 섞여도 비교 가능)"""
+    if isinstance(value, (int, float)):
+        return (0, value, '')
+    return (1, 0, str(value))
+
+
+def matches(value, op, values):
+    """스캔 필터 비교"""
+    if op == 'eq':
+        return to_text(value) in values
+    if value is None:
+        return False
+    bound = values[0]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            bound = float(bound)
+        except ValueError:
+            raise QueryError(f"숫자 필드에 숫자가 아닌 범위 값: {bound}")
+    else:
+        value = str(value)
+    return value >= bound if op == 'gte' else value <= bound
+
+
+def parse_filters(params):
+    """쿼리 파라미터 → [(경로, 연산, 값 목록)]"""
+    filters = []
+    for key, raw_values in params.items():
+        if key in RESERVED_PARAMS:
+            continue
+        op = 'eq'
+        for suffix, name in RANGE_OPERATORS.items():
+            if key.endswith(suffix):
+                key, op = key[:-len(suffix)], name
+                break
+        values = [v for raw in raw_values for v in raw.split(',')] if op == 'eq' else raw_values[-1:]
+        filters.append((key, op, values))
+    return filters
+
+
+def parse_int(params, name, default, maximum=None):
+    raw = params.get(name, [None])[-1]
+    if raw is None or raw == '':
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise QueryError(f"{name}는 정수여야 합니다: {raw}")
+    if value < 0:
+        raise QueryError(f"{name}는 0 이상이어야 합니다: {raw}")
+    return min(value, maximum) if maximum else value
+
+
+def parse_list(params, name, default=()):
+    raw = params.get(name, [''])[-1]
+    return [item for item in raw.split(',') if item] or list(default)
+
+
+def query_orders(store, params):
+    """필터 → 정렬 → 페이지"""
+    rows = store.select(parse_filters(params))
+    sort_keys = [(key.lstrip('-'), key.startswith('-')) for key in parse_list(params, 'sort')]
+    if sort_keys:
+        rows = store.sort(rows, sort_keys)
+
+    fields = parse_list(params, 'fields')
+    for path in fields:
+        store.column(path)
+    limit = parse_int(params, 'limit', DEFAULT_LIMIT, MAX_LIMIT)
+    offset = parse_int(params, 'offset', 0)
+    return {
+        'total': len(rows),
+        'offset': offset,
+        'limit': limit,
+        'orders': [store.project(row, fields) for row in rows[offset:offset + limit]],
+    }
+
+
+def aggregate(store, params, by=None):
+    """그룹별 건수와 숫자 필드 합계"""
+    by = by or parse_list(params, 'by')
+    if not by:
+        raise QueryError("by 파라미터가 필요합니다 (예: by=factory,sddYearMonth)")
+    sums = parse_list(params, 'sum', ['quantity'])
+    key_columns = [store.column(path) for path in by]
+    sum_columns = [store.column(path) for path in sums]
+
+    groups = {}
+    for row in store.select(parse_filters(params)):
+        key = tuple(column[row] for column in key_columns)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'count': 0, 'sums': [0] * len(sums)}
+        group['count'] += 1
+        for i, column in enumerate(sum_columns):
+            value = column[row]
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                group['sums'][i] += value
+
+    result = []
+    for key in sorted(groups, key=lambda k: [sort_value(v) if v is not None else (2, 0, '') for v in k]):
+        group = groups[key]
+        entry = dict(zip(by, key))
+        entry['count'] = group['count']
+        entry.update(zip(sums, group['sums']))
+        result.append(entry)
+    return {'by': by, 'sum': sums, 'groups': result}
+
+
+def aggregate_stages(store, params):
+    """공정별 완료/잔량 합계와 상태별 건수"""
+    rows = store.select(parse_filters(params))
+    stages = []
+    for stage in STAGES:
+        prefix = f'production.{stage}.'
+        if prefix + 'status' not in store.columns:
+            continue
+        completed = store.columns.get(prefix + 'completed') or [0] * len(store)
+        pending = store.columns.get(prefix + 'pending') or [0] * len(store)
+        status = store.columns[prefix + 'status']
+        statuses = {name: 0 for name in STAGE_STATUSES}
+        entry = {'stage': stage, 'completed': 0, 'pending': 0, 'statuses': statuses}
+        for row in rows:
+            entry['completed'] += completed[row] or 0
+            entry['pending'] += pending[row] or 0
+            if status[row] is not None:
+                statuses[status[row]] = statuses.get(status[row], 0) + 1
+        stages.append(entry)
+    return {'orders': len(rows), 'stages': stages}
+
+
+class QueryService:
+    """아티팩트 파일 감시 + 스냅샷 교체 (요청은 시작 시점의 스냅샷 하나만 사용)"""
+
+    def __init__(self, artifact_path=ARTIFACT_FILE, reload_interval=DEFAULT_RELOAD_INTERVAL):
+        self.artifact_path = Path(artifact_path)
+        self.reload_interval = reload_interval
+        self.store = None
+        self._stamp = None
+        self._stop = threading.Event()
+
+    def file_stamp(self):
+        try:
+            stat = self.artifact_path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload(self):
+        """파일이 바뀌었으면 새 스냅샷을 만든 뒤 교체 (실패 시 기존 스냅샷 유지)"""
+        stamp = self.file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        start = time.time()
+        artifact = read_artifact(self.artifact_path)
+        if not artifact or 'records' not in artifact:
+            print(f"  ⚠️ 아티팩트를 읽을 수 없음 - 기존 스냅샷 유지: {self.artifact_path}")
+            return False
+        store = OrderStore(artifact)
+        self.store, self._stamp = store, stamp
+        print(f"  🔄 스냅샷 {store.snapshot}: {len(store)}개 오더 ({(time.time() - start) * 1000:.0f}ms)")
+        return True
+
+    def watch(self):
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"  ⚠️ 스냅샷 갱신 실패 - 기존 스냅샷 유지: {e}")
+
+    def start_watcher(self):
+        thread = threading.Thread(target=self.watch, name='snapshot-watcher', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def handle(self, path, params):
+        """경로 + 파라미터 → (HTTP 상태, 응답 딕셔너리)"""
+        store = self.store
+        if store is None:
+            return 503, {'error': '스냅샷 없음 (parsed_orders.json 대기 중)'}
+
+        if path == '/health':
+            body = store.info()
+        elif path == '/orders':
+            body = query_orders(store, params)
+        elif path == '/aggregate':
+            body = aggregate(store, params)
+        elif path == '/aggregate/factory':
+            body = aggregate(store, params, ['factory'])
+        elif path == '/aggregate/month':
+            body = aggregate(store, params, [params.get('month_field', ['sddYearMonth'])[-1]])
+        elif path == '/aggregate/stage':
+            body = aggregate_stages(store, params)
+        else:
+            return 404, {'error': f'알 수 없는 경로: {path}'}
+
+        body['snapshot'] = store.snapshot
+        return 200, body
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET 전용 JSON 핸들러"""
+
+    server_version = 'RachgiaQuery/1.0'
+
+    def do_GET(self):
+        start = time.time()
+        url = urlsplit(self.path)
+        try:
+            status, body = self.server.service.handle(url.path.rstrip('/') or '/', parse_qs(url.query))
+        except QueryError as e:
+            status, body = 400, {'error': str(e)}
+        body['took_ms'] = round((time.time() - start) * 1000, 2)
+        self.send_json(status, body)
+
+    def do_POST(self):
+        self.send_json(405, {'error': '읽기 전용 서비스입니다'})
+
+    do_PUT = do_DELETE = do_PATCH = do_POST
+
+    def send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='파싱 오더 로컬 조회 서비스')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'바인드 주소 (기본 {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'포트 (기본 {DEFAULT_PORT})')
+    parser.add_argument('--artifact', type=Path, default=ARTIFACT_FILE, help='파싱 아티팩트 경로')
+    parser.add_argument('--reload-interval', type=float, default=DEFAULT_RELOAD_INTERVAL,
+                        help=f'아티팩트 변경 확인 주기 초 (기본 {DEFAULT_RELOAD_INTERVAL})')
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("🔎 오더 조회 서비스 시작")
+    print(f"   아티팩트: {args.artifact}")
+    print("=" * 60)
+
+    service = QueryService(args.artifact, args.reload_interval)
+    if not service.reload():
+        print("  ⚠️ 아티팩트 없음 - 생성되면 자동으로 로드합니다")
+    service.start_watcher()
+
+    server = ThreadingHTTPServer((args.host, args.port), QueryHandler)
+    server.daemon_threads = True
+    server.service = service
+    print(f"\n🌐 http://{args.host}:{args.port}/health")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ 종료")
+    finally:
+        service.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+단일 프로세스 파이프라인 오케스트레이터
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+download → parse → (embed ∥ consolidate) → upload 를 한 프로세스 안에서 작은 DAG로 실행한다.
+- 라이브러리 import와 파싱 아티팩트 로드는 한 번만 하고 단계 간에는 메모리로 공유
+- 입력 지문과 출력 파일 해시가 지난 실행과 같으면 단계 생략 (.pipeline_cache/pipeline_state.json)
+- 서로 독립인 embed / consolidate 는 동시 실행
+- 다운로드 매니페스트 / changes 토큰은 모든 단계가 성공한 뒤에만 확정 (실패 시 다음 실행에서 재처리)
+- 마지막에 단계별 상태 / 소요 시간 요약 출력
+
+사용법:
+    python scripts/run_pipeline.py
+    python scripts/run_pipeline.py --incremental --shards data/shards
+    python scripts/run_pipeline.py --precompress     # .gz/.br 사전 압축본 (Apache 배포 전용)
+    python scripts/run_pipeline.py --pipelined       # 다운로드 ∥ 파싱 겹치기
+    python scripts/run_pipeline.py --skip-download   # data/ 기존 파일로 빌드만
+    python scripts/run_pipeline.py --no-cache        # 단계 캐시 무시 (--force도 동일)
+    python scripts/run_pipeline.py --skip-download --no-cache --profile-memory   # 구간별 메모리 리포트
+
+종료 코드:
+    0: 새 빌드 결과 있음 (배포 필요)
+    1: 실패한 단계 있음
+    3: 변경 없음 (임베드 입력과 앱 코드가 마지막 배포와 동일 → 배포 생략 가능)
+
+환경 변수: download_from_drive.py / generate_consolidated.py 와 동일
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import download_from_drive
+import embed_data
+import generate_consolidated
+from parsed_artifact import (
+    ARTIFACT_FILE, build_artifact, collect_sources, file_sha256, is_artifact_fresh,
+    read_artifact, write_artifact,
+)
+from parse_loadplan import ENGINE_ENV, EXCEL_ENGINES, profile_stage
+from memory_profile import add_profile_argument, start_profiling
+
+# 설정
+PROJECT_DIR = Path(__file__).parent.parent
+DATA_DIR = PROJECT_DIR / 'data'
+CACHE_DIR = PROJECT_DIR / '.pipeline_cache'
+STATE_FILE = CACHE_DIR / 'pipeline_state.json'
+
+# 배포 키 (임베드 입력 지문 + 배포되는 앱 코드 해시) - 워크플로우가 배포 성공 후 deployed 파일로 보관
+DEPLOY_KEY_FILE = CACHE_DIR / 'deploy_key.json'
+
+# 배포되는 앱 코드 (deploy.yml dist/ 구성과 같게 유지). HTML/sw.js는 데이터 구간과 버전 문자열 제외
+SHIPPED_FILES = ['manifest.json']
+SHIPPED_DIRS = ['locales', 'icons', 'src']
+
+EXIT_UNCHANGED = download_from_drive.EXIT_UNCHANGED
+
+# 동시에 실행할 수 있는 최대 단계 수 (embed ∥ consolidate)
+STAGE_WORKERS = 2
+
+# 단계 상태 표시
+STATUS_ICONS = {
+    'done': '✅',
+    'cached': '♻️',
+    'unchanged': '⏭️',
+    'skipped': '⏭️',
+    'failed': '❌',
+    'blocked': '⛔',
+}
+FAILED_STATUSES = ('failed', 'blocked')
+
+
+def fingerprint(*parts):
+    """입력 요소 목록 → 짧은 지문"""
+    body = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+
+
+def code_hash(module):
+    """단계 코드 해시 (스크립트가 바뀌면 캐시 무효화)"""
+    return file_sha256(module.__file__)[:16]
+
+
+def artifact_key(artifact):
+    """아티팩트 내용 지문 (generated_at 제외 - 같은 소스면 같은 값)"""
+    sources = {factory: source['sha256'] for factory, source in artifact['sources'].items()}
+    return fingerprint(artifact['version'], artifact['parser'], sources)
+
+
+def shipped_code_hash():
+    """배포되는 앱 코드 해시 (데이터가 같아도 코드가 바뀌면 배포해야 함)"""
+    digest = hashlib.sha256()
+    for path, excluded in ((embed_data.HTML_FILE, True), (embed_data.SW_FILE, True)):
+        if not path.exists():
+            continue
+        data = path.read_bytes()
+        ranges = []
+        if excluded:
+            span = embed_data.find_data_span(data)
+            version = embed_data.find_cache_version(data)
+            ranges = ([span] if span else []) + ([version[:2]] if version else [])
+        digest.update(path.name.encode('utf-8'))
+        embed_data.hash_excluding(digest, data, ranges)
+
+    files = [PROJECT_DIR / name for name in SHIPPED_FILES]
+    for name in SHIPPED_DIRS:
+        files += sorted(p for p in (PROJECT_DIR / name).rglob('*') if p.is_file())
+    for path in files:
+        if path.exists():
+            digest.update(str(path.relative_to(PROJECT_DIR)).encode('utf-8'))
+            digest.update(file_sha256(path).encode('ascii'))
+    return digest.hexdigest()[:16]
+
+
+def read_deploy_key(path):
+    """배포 키 파일 값 (없거나 손상되면 None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('key')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def write_deploy_key(key, path=DEPLOY_KEY_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'key': key, 'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, f, indent=2)
+
+
+def load_state(path=STATE_FILE):
+    """지난 실행의 단계별 지문/출력 해시"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    """단계 상태 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def hash_outputs(paths):
+    """출력 파일 경로 → SHA-256"""
+    return {str(Path(p).resolve()): file_sha256(p) for p in paths}
+
+
+def outputs_intact(outputs):
+    """기록된 출력 파일이 모두 남아 있고 내용이 같은지"""
+    for path, digest in outputs.items():
+        path = Path(path)
+        if not path.exists() or file_sha256(path) != digest:
+            return False
+    return True
+
+
+# =============================================================================
+# 단계 구현
+# 각 단계: run(ctx) → (상태, 출력 파일 목록), fingerprint(ctx) → 지문 또는 None (캐시 안 함)
+# =============================================================================
+
+def run_download(ctx):
+    """Drive(또는 로컬 저장소) → data/"""
+    args = ctx['args']
+    if args.skip_download:
+        return 'skipped', []
+
+    # 매니페스트 / changes 토큰은 이후 단계가 모두 성공한 뒤 확정 (main 참고)
+    argv = ['--workers', str(args.workers), '--defer-commit']
+    if args.storage:
+        argv += ['--storage', args.storage]
+    for flag in ('force', 'incremental', 'in_memory', 'persist', 'pipelined'):
+        if getattr(args, flag):
+            argv.append('--' + flag.replace('_', '-'))
+    if args.pipelined:
+        argv += ['--queue-size', str(args.queue_size)]
+
+    try:
+        code = download_from_drive.main(argv)
+    except SystemExit as e:
+        code = e.code
+    if code == EXIT_UNCHANGED:
+        return 'unchanged', []
+    if code:
+        raise RuntimeError(f"download_from_drive 종료 코드 {code}")
+    return 'done', []
+
+
+def run_parse(ctx):
+    """공유 파싱 아티팩트 로드 (소스 해시가 같으면 재사용)"""
+    artifact = read_artifact(ARTIFACT_FILE)
+    if ctx['args'].in_memory and artifact:
+        # 메모리 다운로드 모드에서는 download 단계가 방금 아티팩트를 만들었음
+        status = 'cached' if ctx['results']['download']['status'] == 'unchanged' else 'done'
+    else:
+        sources = collect_sources(DATA_DIR)
+        if is_artifact_fresh(artifact, sources):
+            # 파이프라인 다운로드 모드에서는 download 단계가 파싱까지 마쳤음
+            downloaded = ctx['results']['download']['status'] == 'done'
+            status = 'done' if ctx['args'].pipelined and downloaded else 'cached'
+        elif sources:
+            artifact = build_artifact(DATA_DIR, sources)
+            write_artifact(artifact, ARTIFACT_FILE)
+            status = 'done'
+        else:
+            artifact = None
+
+    if not artifact or not artifact['records']:
+        raise RuntimeError("파싱된 데이터가 없습니다")
+    ctx['artifact'] = artifact
+    ctx['artifact_key'] = artifact_key(artifact)
+    print(f"  🧩 파싱 아티팩트: {len(artifact['records'])}개 레코드 ({status})")
+    return status, [ARTIFACT_FILE]
+
+
+def embed_fingerprint(ctx):
+    args = ctx['args']
+    return fingerprint(ctx['artifact_key'], code_hash(embed_data), args.format,
+                       str(args.shards) if args.shards else None, args.precompress)
+
+
+def run_embed(ctx):
+    """HTML 임베드 (+ 샤드 / 사전 압축)"""
+    args = ctx['args']
+    success, outputs = embed_data.embed_outputs(
+        ctx['artifact']['records'], args.format, args.shards, args.precompress,
+    )
+    if not success:
+        raise RuntimeError("HTML 임베드 실패")
+    return 'done', outputs
+
+
+def consolidate_fingerprint(ctx):
+    return fingerprint(ctx['artifact_key'], code_hash(generate_consolidated), ctx['report_date'])
+
+
+def run_consolidate(ctx):
+    """종합 오더현황 Excel 생성"""
+    with profile_stage('workbook_build'):
+        generate_consolidated.create_excel(
+            ctx['artifact']['records'], ctx['report_path'], report_date=ctx['report_date'],
+        )
+    return 'done', [ctx['report_path']]
+
+
+def upload_fingerprint(ctx):
+    args = ctx['args']
+    return fingerprint(file_sha256(ctx['report_path']), args.storage or os.environ.get('PIPELINE_STORAGE'),
+                       os.environ.get('GOOGLE_DRIVE_FOLDER_ID'))
+
+
+def run_upload(ctx):
+    """종합 Excel 업로드 (원격 md5가 같으면 generate_consolidated가 업로드 생략)"""
+    spec = ctx['args'].storage or os.environ.get('PIPELINE_STORAGE') or 'drive'
+    folder_id = os.environ.get('GOOGLE_DRIVE_FOLDER_ID')
+    if not folder_id and spec == 'drive':
+        print("  ⚠️ GOOGLE_DRIVE_FOLDER_ID 미설정 - 업로드 스킵")
+        return 'skipped', []
+
+    storage = generate_consolidated.get_storage(spec)
+    if not storage:
+        return 'skipped', []
+    generate_consolidated.upload_to_drive(
+        storage, folder_id or storage.default_folder, ctx['report_path'], ctx['report_path'].name,
+    )
+    return 'done', []
+
+
+STAGES = [
+    # 이름, 선행 단계, 실행 함수, 지문 함수 (None이면 매번 실행)
+    {'name': 'download', 'deps': (), 'run': run_download, 'fingerprint': None},
+    {'name': 'parse', 'deps': ('download',), 'run': run_parse, 'fingerprint': None},
+    {'name': 'embed', 'deps': ('parse',), 'run': run_embed, 'fingerprint': embed_fingerprint},
+    {'name': 'consolidate', 'deps': ('parse',), 'run': run_consolidate, 'fingerprint': consolidate_fingerprint},
+    {'name': 'upload', 'deps': ('consolidate',), 'run': run_upload, 'fingerprint': upload_fingerprint},
+]
+
+
+# =============================================================================
+# DAG 실행
+# =============================================================================
+
+def execute_stage(stage, ctx, previous, use_cache):
+    """
+    단계 하나 실행 (워커 스레드)
+    반환: {status, seconds, fingerprint, fresh, outputs, error}
+    - fresh: 입력 지문이 지난 성공 실행과 다름 (새 결과물)
+    """
+    start = time.time()
+    result = {'status': 'failed', 'fingerprint': None, 'fresh': True, 'outputs': {}, 'error': None}
+    try:
+        fp = stage['fingerprint'](ctx) if stage['fingerprint'] else None
+        result['fingerprint'] = fp
+        result['fresh'] = fp is None or previous.get('fingerprint') != fp
+
+        if use_cache and fp is not None and not result['fresh'] and outputs_intact(previous.get('outputs', {})):
+            print(f"\n♻️ [{stage['name']}] 입력 변경 없음 - 생략")
+            result.update(status='cached', outputs=previous.get('outputs', {}))
+        else:
+            print(f"\n▶️ [{stage['name']}] 시작")
+            status, outputs = stage['run'](ctx)
+            result.update(status=status, outputs=hash_outputs(outputs))
+    except (Exception, SystemExit) as e:
+        result.update(status='failed', error=str(e) or type(e).__name__)
+        print(f"\n❌ [{stage['name']}] 실패: {result['error']}")
+
+    result['seconds'] = time.time() - start
+    return result
+
+
+def run_dag(stages, ctx, state, use_cache=True, workers=STAGE_WORKERS):
+    """선행 단계가 끝난 단계부터 스레드 풀에서 실행 (선행 단계 실패 시 blocked)"""
+    results = ctx['results']
+    pending = {stage['name']: stage for stage in stages}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(results.get(dep, {}).get('status') in FAILED_STATUSES for dep in stage['deps']):
+                    results[name] = {'status': 'blocked', 'seconds': 0.0, 'error': None}
+                    del pending[name]
+                elif all(dep in results for dep in stage['deps']):
+                    future = pool.submit(execute_stage, stage, ctx, state.get(name, {}), use_cache)
+                    running[future] = name
+                    del pending[name]
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = result = future.result()
+                if result['status'] == 'failed':
+                    state.pop(name, None)
+                elif result['status'] == 'done' and result['fingerprint']:
+                    state[name] = {'fingerprint': result['fingerprint'], 'outputs': result['outputs']}
+
+    return results
+
+
+def print_summary(stages, results, wall):
+    """단계별 상태 / 소요 시간 요약"""
+    print("\n" + "=" * 60)
+    print("⏱️ 파이프라인 단계 요약")
+    for stage in stages:
+        result = results.get(stage['name'], {'status': 'blocked', 'seconds': 0.0})
+        icon = STATUS_ICONS.get(result['status'], '')
+        line = f"   {icon} {stage['name']:<12} {result['status']:<10} {result['seconds']:6.2f}초"
+        if result.get('error'):
+            line += f"  ({result['error']})"
+        print(line)
+    total = sum(result.get('seconds', 0.0) for result in results.values())
+    print(f"   전체 {wall:.2f}초 (단계 합계 {total:.2f}초)")
+    print("=" * 60)
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='download → parse → embed/consolidate → upload 파이프라인')
+    parser.add_argument('--skip-download', action='store_true', help='다운로드 생략 (data/ 기존 파일 사용)')
+    parser.add_argument('--no-cache', action='store_true', help='단계 캐시 무시하고 모든 단계 실행')
+    # download_from_drive.py 옵션
+    parser.add_argument('--storage', default=None, help='저장소 백엔드: drive 또는 local:<디렉토리>')
+    parser.add_argument('--workers', type=int, default=download_from_drive.DEFAULT_WORKERS,
+                        help='동시 다운로드 수')
+    parser.add_argument('--force', action='store_true', help='다운로드 매니페스트와 단계 캐시 모두 무시')
+    parser.add_argument('--incremental', action='store_true', help='Drive changes 토큰 기반 증분 조회')
+    parser.add_argument('--in-memory', action='store_true', help='메모리 버퍼로 받아 바로 파싱')
+    parser.add_argument('--persist', action='store_true', help='--in-memory 모드에서 xlsx도 보관')
+    parser.add_argument('--pipelined', action='store_true', help='다운로드가 끝난 파일부터 바로 파싱')
+    parser.add_argument('--queue-size', type=int, default=download_from_drive.DEFAULT_QUEUE_SIZE,
+                        help='--pipelined 파싱 대기열 크기')
+    # parse_loadplan.py 옵션
+    parser.add_argument('--engine', choices=['auto'] + list(EXCEL_ENGINES), default=None,
+                        help=f'Excel 읽기 엔진 (기본: ${ENGINE_ENV} 또는 auto)')
+    # embed_data.py 옵션
+    parser.add_argument('--format', choices=['columnar', 'json'], default='columnar', help='임베드 포맷')
+    parser.add_argument('--shards', type=Path, metavar='DIR', help='샤드 + manifest.json 출력 디렉토리')
+    parser.add_argument('--precompress', action='store_true', help='.gz/.br 사전 압축본 생성 (Apache .htaccess 전용)')
+    parser.add_argument('--deployed-state', type=Path, metavar='FILE',
+                        help='마지막으로 배포에 성공한 배포 키 파일 (없으면 지난 파이프라인 실행과 비교)')
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    if args.engine:
+        os.environ[ENGINE_ENV] = args.engine  # parse_factory_file 기본 엔진
+    profiler = start_profiling(args.profile_memory)
+
+    print("=" * 60)
+    print("🚀 파이프라인 시작")
+    print(f"   시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    report_date = datetime.now().strftime('%Y-%m-%d')
+    ctx = {
+        'args': args,
+        'results': {},
+        'report_date': report_date,
+        'report_path': DATA_DIR / f'종합_오더현황_{report_date}.xlsx',
+    }
+
+    use_cache = not (args.no_cache or args.force)
+    state = load_state()
+    start = time.time()
+    # 프로파일링 중에는 구간 측정이 겹치지 않도록 단계를 하나씩 실행
+    results = run_dag(STAGES, ctx, state, use_cache, workers=1 if profiler else STAGE_WORKERS)
+    failed = any(result['status'] in FAILED_STATUSES for result in results.values())
+
+    # 다운로드 매니페스트 / changes 토큰 확정: 실패하면 버려서 다음 실행이 같은 변경을 다시 처리
+    if failed:
+        download_from_drive.discard_pending()
+    elif download_from_drive.commit_pending():
+        print("  📝 다운로드 매니페스트 / changes 토큰 확정")
+
+    # 배포 필요 여부: 임베드 입력과 앱 코드가 마지막 배포(또는 지난 실행)와 같으면 생략
+    deploy_key = None
+    if not failed:
+        deploy_key = fingerprint(results['embed'].get('fingerprint'), shipped_code_hash())
+        write_deploy_key(deploy_key)
+    previous_key = read_deploy_key(args.deployed_state) if args.deployed_state else state.get('deploy_key')
+    if deploy_key:
+        state['deploy_key'] = deploy_key
+    save_state(state)
+    print_summary(STAGES, results, time.time() - start)
+
+    if failed:
+        return 1
+    if use_cache and deploy_key == previous_key:
+        print("\n⏭️ 임베드 입력 / 앱 코드 변경 없음 - 배포 생략 가능")
+        return EXIT_UNCHANGED
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
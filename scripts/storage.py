@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+파이프라인 저장소 백엔드 (Google Drive / 로컬 디렉토리)
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+download_from_drive.py / generate_consolidated.py 는 아래 인터페이스만 사용한다.
+    list(folder, mime_type)            폴더 내 파일 메타데이터 목록
+    get(file_id, fh, chunk_size)       파일 내용을 파일 객체에 기록
+    get_range(file_id, start, end)     바이트 범위 [start, end] 읽기 (이어받기/청크 재시도용)
+    put(folder, local_path, filename)  업로드 (existing이 주어지면 해당 파일 덮어쓰기)
+    metadata(file_id)                  메타데이터 조회 (없거나 휴지통이면 None)
+    find(folder, filename)             폴더에서 파일명으로 검색
+
+메타데이터는 Drive API 필드 이름(id, name, mimeType, modifiedTime, md5Checksum, size)을
+그대로 사용하므로 다운로드 매니페스트 / 업로드 캐시 로직을 백엔드와 무관하게 공유한다.
+
+백엔드 선택 (--storage 옵션 또는 PIPELINE_STORAGE 환경 변수):
+    drive              Google Drive (기본값, 서비스 계정 키 필요)
+    local:<디렉토리>    로컬 디렉토리 (폴더 ID = 하위 디렉토리, 네트워크 없이 실행/벤치마크)
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+
+# 설정
+SCOPES = ['https://www.googleapis.com/auth/drive']
+PROJECT_DIR = Path(__file__).parent.parent
+KEY_FILE = PROJECT_DIR / 'credentials' / 'service-account.json'
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+FILE_FIELDS = 'id, name, mimeType, parents, trashed, modifiedTime, md5Checksum, size'
+LIST_PAGE_SIZE = 1000
+
+# 다운로드 청크 크기 (googleapiclient 기본값과 동일)
+DEFAULT_CHUNK_SIZE = 100 * 1024 * 1024
+
+# 로컬 백엔드 확장자 → MIME 타입
+LOCAL_MIMETYPES = {
+    '.xlsx': XLSX_MIMETYPE,
+    '.json': 'application/json',
+}
+
+
+def get_drive_credentials():
+    """서비스 계정 인증 정보 (환경 변수 → credentials/service-account.json 순)"""
+    from google.oauth2 import service_account
+
+    # GitHub Actions에서 환경 변수로 제공
+    service_account_key = os.environ.get('GOOGLE_SERVICE_ACCOUNT_KEY')
+    if service_account_key:
+        key_dict = json.loads(service_account_key)
+        return service_account.Credentials.from_service_account_info(key_dict, scopes=SCOPES)
+
+    # 로컬 개발용: 파일에서 로드
+    if KEY_FILE.exists():
+        return service_account.Credentials.from_service_account_file(str(KEY_FILE), scopes=SCOPES)
+
+    raise ValueError(
+        "서비스 계정 키를 찾을 수 없습니다.\n"
+        "1. GOOGLE_SERVICE_ACCOUNT_KEY 환경 변수 설정, 또는\n"
+        "2. credentials/service-account.json 파일 생성"
+    )
+
+
+def file_md5(path, chunk_size=1024 * 1024):
+    """로컬 파일 MD5 (Drive md5Checksum과 같은 형식)"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DriveStorage:
+    """Google Drive 백엔드 (스레드마다 별도 Drive 서비스 / HTTP 세션)"""
+
+    name = 'drive'
+    supports_changes = True
+    default_folder = None
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        # httplib2 세션은 스레드 간 공유 불가
+        self._thread_local = threading.local()
+
+    @classmethod
+    def from_env(cls):
+        return cls(get_drive_credentials())
+
+    @property
+    def service(self):
+        """현재 스레드 전용 Drive 서비스"""
+        service = getattr(self._thread_local, 'service', None)
+        if service is None:
+            from googleapiclient.discovery import build
+            service = build('drive', 'v3', credentials=self.credentials, cache_discovery=False)
+            self._thread_local.service = service
+        return service
+
+    def list(self, folder, mime_type=XLSX_MIMETYPE):
+        """폴더 내 파일 목록 (nextPageToken을 따라 전체 페이지)"""
+        query = f"'{folder}' in parents"
+        if mime_type:
+            query += f" and mimeType='{mime_type}'"
+
+        files = []
+        page_token = None
+        while True:
+            results = self.service.files().list(
+                q=query,
+                pageSize=LIST_PAGE_SIZE,
+                pageToken=page_token,
+                fields=f"nextPageToken, files({FILE_FIELDS})"
+            ).execute()
+            files.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return files
+
+    def start_page_token(self):
+        """현재 시점의 Drive changes 시작 토큰"""
+        return self.service.changes().getStartPageToken().execute()['startPageToken']
+
+    def list_changes(self, folder, page_token, mime_type=XLSX_MIMETYPE, ignore_prefixes=()):
+        """
+        page_token 이후 변경된 폴더 내 파일 목록 (Drive changes API)
+        ignore_prefixes: 제외할 파일명 접두어 (예: 파이프라인이 직접 올린 종합 리포트)
+        반환: (변경 파일 목록, 다음 실행용 토큰)
+        """
+        changed = {}
+        while True:
+            results = self.service.changes().list(
+                pageToken=page_token,
+                pageSize=LIST_PAGE_SIZE,
+                spaces='drive',
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}))"
+            ).execute()
+
+            for change in results.get('changes', []):
+                file = change.get('file')
+                if change.get('removed') or not file or file.get('trashed'):
+                    changed.pop(change.get('fileId'), None)
+                    continue
+                if file.get('name', '').startswith(tuple(ignore_prefixes)):
+                    continue
+                if folder in file.get('parents', []) and (not mime_type or file.get('mimeType') == mime_type):
+                    changed[file['id']] = file
+
+            if 'newStartPageToken' in results:
+                return list(changed.values()), results['newStartPageToken']
+            page_token = results['nextPageToken']
+
+    def get(self, file_id, fh, chunk_size=DEFAULT_CHUNK_SIZE, label=None):
+        """파일 내용을 fh에 청크 단위로 기록"""
+        from googleapiclient.http import MediaIoBaseDownload
+
+        request = self.service.files().get_media(fileId=file_id)
+        downloader = MediaIoBaseDownload(fh, request, chunksize=chunk_size)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk()
+            if status:
+                print(f"  [{label or file_id}] 다운로드 진행: {int(status.progress() * 100)}%")
+
+    def get_range(self, file_id, start, end):
+        """바이트 범위 [start, end] 다운로드 (HTTP Range 요청)"""
+        request = self.service.files().get_media(fileId=file_id)
+        request.headers['Range'] = f'bytes={start}-{end}'
+        return request.execute()
+
+    def metadata(self, file_id):
+        """파일 ID로 메타데이터 조회 (삭제/휴지통이면 None, 404 외 오류는 그대로 전달)"""
+        from googleapiclient.errors import HttpError
+
+        try:
+            file = self.service.files().get(fileId=file_id, fields=FILE_FIELDS).execute()
+        except HttpError as e:
+            if getattr(e.resp, 'status', None) == 404:
+                return None
+            raise
+        return None if file.get('trashed') else file
+
+    def find(self, folder, filename):
+        """폴더에서 동일 파일명 검색"""
+        query = f"'{folder}' in parents and name='{filename}' and trashed=false"
+        results = self.service.files().list(
+            q=query, pageSize=1, fields=f"files({FILE_FIELDS})"
+        ).execute()
+        files = results.get('files', [])
+        return files[0] if files else None
+
+    def put(self, folder, local_path, filename, existing=None,
+            mime_type=XLSX_MIMETYPE, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        resumable 청크 업로드
+        existing이 있으면 그 파일을 업데이트 (파일 ID, 공유 설정 유지)
+        """
+        from googleapiclient.http import MediaFileUpload
+
+        media = MediaFileUpload(str(local_path), mimetype=mime_type, chunksize=chunk_size, resumable=True)
+        if existing:
+            request = self.service.files().update(
+                fileId=existing['id'], media_body=media, fields='id, md5Checksum',
+            )
+        else:
+            request = self.service.files().create(
+                body={'name': filename, 'parents': [folder]}, media_body=media, fields='id, md5Checksum',
+            )
+
+        response = None
+        while response is None:
+            status, response = request.next_chunk()
+            if status:
+                print(f"  업로드 진행: {int(status.progress() * 100)}%")
+        return response
+
+
+class LocalStorage:
+    """
+    로컬 디렉토리 백엔드
+    root/<폴더>/<파일명> 구조, 파일 ID는 root 기준 상대 경로
+    """
+
+    name = 'local'
+    supports_changes = False
+    default_folder = '.'
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+
+    def _path(self, file_id):
+        path = (self.root / file_id).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"저장소 밖의 경로입니다: {file_id}")
+        return path
+
+    def _describe(self, path):
+        stat = path.stat()
+        return {
+            'id': path.relative_to(self.root).as_posix(),
+            'name': path.name,
+            'mimeType': LOCAL_MIMETYPES.get(path.suffix.lower(), 'application/octet-stream'),
+            'parents': [path.parent.relative_to(self.root).as_posix()],
+            'trashed': False,
+            'modifiedTime': datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+                                    .strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
+            'md5Checksum': file_md5(path),
+            'size': str(stat.st_size),
+        }
+
+    def list(self, folder, mime_type=XLSX_MIMETYPE):
+        """폴더 내 파일 목록 (파일명 순)"""
+        directory = self.root / folder
+        if not directory.is_dir():
+            return []
+        files = [self._describe(p) for p in sorted(directory.iterdir()) if p.is_file()]
+        if mime_type:
+            files = [f for f in files if f['mimeType'] == mime_type]
+        return files
+
+    def get(self, file_id, fh, chunk_size=DEFAULT_CHUNK_SIZE, label=None):
+        """파일 내용을 fh에 청크 단위로 복사"""
+        path = self._path(file_id)
+        total = path.stat().st_size
+        copied = 0
+        with open(path, 'rb') as src:
+            for chunk in iter(lambda: src.read(chunk_size), b''):
+                fh.write(chunk)
+                copied += len(chunk)
+                if copied < total:
+                    print(f"  [{label or file_id}] 다운로드 진행: {int(copied / total * 100)}%")
+
+    def get_range(self, file_id, start, end):
+        """바이트 범위 [start, end] 읽기"""
+        with open(self._path(file_id), 'rb') as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def metadata(self, file_id):
+        """파일 ID로 메타데이터 조회 (없으면 None)"""
+        try:
+            path = self._path(file_id)
+        except ValueError:
+            return None
+        return self._describe(path) if path.is_file() else None
+
+    def find(self, folder, filename):
+        """폴더에서 동일 파일명 검색"""
+        path = self.root / folder / filename
+        return self._describe(path) if path.is_file() else None
+
+    def put(self, folder, local_path, filename, existing=None,
+            mime_type=XLSX_MIMETYPE, chunk_size=DEFAULT_CHUNK_SIZE):
+        """파일 복사 (임시 파일에 쓴 뒤 교체)"""
+        target = self._path(existing['id']) if existing else self.root / folder / filename
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + '.tmp')
+        shutil.copyfile(local_path, tmp_path)
+        os.replace(tmp_path, target)
+        return self._describe(target)
+
+
+def open_storage(spec=None):
+    """
+    저장소 백엔드 생성
+    spec: 'drive' 또는 'local:<디렉토리>' (없으면 PIPELINE_STORAGE 환경 변수, 기본 drive)
+    """
+    spec = spec or os.environ.get('PIPELINE_STORAGE') or 'drive'
+    if spec == 'drive':
+        return DriveStorage.from_env()
+    if spec.startswith('local:'):
+        root = Path(spec[len('local:'):]).expanduser()
+        if not root.is_dir():
+            raise ValueError(f"로컬 저장소 디렉토리가 없습니다: {root}")
+        return LocalStorage(root)
+    raise ValueError(f"알 수 없는 저장소 백엔드: {spec} (drive 또는 local:<디렉토리>)")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+업로드 / 다운로드 캐시 동작 검증 (in-process 가짜 Drive)
+Rachgia Dashboard v19 - 자동화 빌드 시스템
+
+네트워크 없이 LocalStorage 기반 가짜 Drive(FakeDrive)에 호출 횟수 기록과 연결 끊김 주입을 붙여
+upload_to_drive / download_file 의 캐시·재시도 경로를 실제로 실행하고 결과를 확인한다.
+
+검사 항목 (CHECKS):
+    md5-skip        같은 내용 재업로드 → put 없이 스킵, 내용이 바뀌면 같은 파일 ID로 업데이트
+    file-id-cache   캐시된 파일 ID로 metadata만 조회 (find 미호출), 원격에서 지워진 ID면 find로 복구
+    resume          청크 도중 연결 끊김 → .part 보존, 다음 실행은 받은 위치부터 Range 요청으로 이어받기
+    retry           일시적 네트워크 오류는 같은 청크 재시도, 그 외 예외는 재시도 없이 실패
+    metadata-404    DriveStorage.metadata: 404만 None, 그 외 HTTP 오류는 전달 (googleapiclient 설치 시)
+
+사용법:
+    python scripts/storage_check.py
+    python scripts/storage_check.py --checks resume,retry
+
+종료 코드:
+    0: 모든 검사 통과
+    1: 실패한 검사 있음
+"""
+
+import io
+import os
+import sys
+import socket
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+from collections import Counter
+
+import download_from_drive
+import generate_consolidated
+from storage import DriveStorage, LocalStorage, file_md5
+
+# 설정
+FOLDER = 'loadplans'
+REPORT_NAME = '종합_오더현황_check.xlsx'
+SOURCE_NAME = 'LOADPLAN ASSEMBLY OF RACHGIA FACTORY A.xlsx'
+SOURCE_SIZE = 300 * 1024
+RANGE_SIZE = 64 * 1024
+CUT_AT = 200 * 1024  # 이 바이트를 포함하는 청크 요청에서 연결 끊김
+
+
+class FakeDrive(LocalStorage):
+    """호출 횟수를 세고, get_range에 네트워크 오류를 주입할 수 있는 가짜 Drive"""
+
+    name = 'fake-drive'
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = Counter()
+        self.fetched = 0
+        self.faults = []      # 다음 get_range 호출들에서 차례로 발생시킬 예외
+        self.cut_at = None    # 이 바이트를 포함하는 요청에서 한 번 연결 끊김
+
+    def metadata(self, file_id):
+        self.calls['metadata'] += 1
+        return super().metadata(file_id)
+
+    def find(self, folder, filename):
+        self.calls['find'] += 1
+        return super().find(folder, filename)
+
+    def put(self, folder, local_path, filename, existing=None, **kwargs):
+        self.calls['put'] += 1
+        return super().put(folder, local_path, filename, existing=existing, **kwargs)
+
+    def get_range(self, file_id, start, end):
+        self.calls['get_range'] += 1
+        if self.faults:
+            raise self.faults.pop(0)
+        if self.cut_at is not None and start <= self.cut_at <= end:
+            self.cut_at = None
+            raise ConnectionResetError('연결 끊김 (주입)')
+        data = super().get_range(file_id, start, end)
+        self.fetched += len(data)
+        return data
+
+    def reset(self):
+        self.calls.clear()
+        self.fetched = 0
+
+
+def quiet():
+    """검사 대상 함수의 진행 로그 숨김"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def make_drive(work_dir):
+    root = work_dir / 'drive'
+    (root / FOLDER).mkdir(parents=True)
+    return FakeDrive(root)
+
+
+def upload(drive, local_path, cache_path):
+    drive.reset()
+    with quiet():
+        file = generate_consolidated.upload_to_drive(drive, FOLDER, local_path, REPORT_NAME, cache_path=cache_path)
+    return file, dict(drive.calls)
+
+
+def check_md5_skip(work_dir):
+    drive = make_drive(work_dir)
+    local_path = work_dir / REPORT_NAME
+    cache_path = work_dir / 'drive_files.json'
+    local_path.write_bytes(os.urandom(4096))
+
+    first, _ = upload(drive, local_path, cache_path)
+    _, calls = upload(drive, local_path, cache_path)
+    results = [('같은 내용 재업로드 스킵 (put 0회)', calls.get('put', 0) == 0)]
+
+    local_path.write_bytes(os.urandom(4096))
+    second, calls = upload(drive, local_path, cache_path)
+    remote = drive.metadata(second['id'])
+    results += [
+        ('내용 변경 시 업로드 (put 1회)', calls.get('put', 0) == 1),
+        ('같은 파일 ID로 업데이트', second['id'] == first['id']),
+        ('원격 md5 = 로컬 md5', remote['md5Checksum'] == file_md5(local_path)),
+    ]
+    return results
+
+
+def check_file_id_cache(work_dir):
+    drive = make_drive(work_dir)
+    local_path = work_dir / REPORT_NAME
+    cache_path = work_dir / 'drive_files.json'
+    local_path.write_bytes(os.urandom(4096))
+
+    _, calls = upload(drive, local_path, cache_path)
+    results = [('첫 업로드: 캐시 없음 → find 1회', calls.get('find', 0) == 1 and calls.get('metadata', 0) == 0)]
+
+    _, calls = upload(drive, local_path, cache_path)
+    results.append(('재실행: 캐시된 ID로 metadata 1회, find 0회',
+                     calls.get('metadata', 0) == 1 and calls.get('find', 0) == 0))
+
+    # 원격에서 파일이 지워지면 캐시된 ID는 무효 → 폴더 검색 후 새로 생성
+    (drive.root / FOLDER / REPORT_NAME).unlink()
+    file, calls = upload(drive, local_path, cache_path)
+    results.append(('지워진 ID: find로 복구 후 새로 생성',
+                     calls.get('find', 0) == 1 and calls.get('put', 0) == 1
+                     and (drive.root / file['id']).exists()))
+    return results
+
+
+def download(drive, file, local_path, retries):
+    drive.reset()
+    with quiet():
+        download_from_drive.download_file(drive, file, local_path, RANGE_SIZE, retries=retries)
+
+
+def check_resume(work_dir):
+    drive = make_drive(work_dir)
+    source = drive.root / FOLDER / SOURCE_NAME
+    source.write_bytes(os.urandom(SOURCE_SIZE))
+    file = drive.metadata(f'{FOLDER}/{SOURCE_NAME}')
+    local_path = work_dir / 'Factory_A.xlsx'
+    part_path, state_path = download_from_drive.partial_paths(local_path)
+
+    drive.cut_at = CUT_AT
+    try:
+        download(drive, file, local_path, retries=0)
+        interrupted = False
+    except ConnectionResetError:
+        interrupted = True
+    received = part_path.stat().st_size if part_path.exists() else 0
+    results = [
+        ('청크 도중 끊김 → 다운로드 실패', interrupted),
+        ('받은 청크까지 .part 보존', received == CUT_AT // RANGE_SIZE * RANGE_SIZE and state_path.exists()),
+        ('실패 시 로컬 파일 미생성', not local_path.exists()),
+    ]
+
+    download(drive, file, local_path, retries=0)
+    results += [
+        ('재실행은 남은 바이트만 요청', drive.fetched == SOURCE_SIZE - received),
+        ('이어받은 파일 md5 일치', local_path.exists() and file_md5(local_path) == file['md5Checksum']),
+        ('.part / 상태 파일 정리', not part_path.exists() and not state_path.exists()),
+    ]
+    return results
+
+
+def check_retry(work_dir):
+    drive = make_drive(work_dir)
+    source = drive.root / FOLDER / SOURCE_NAME
+    source.write_bytes(os.urandom(SOURCE_SIZE))
+    file = drive.metadata(f'{FOLDER}/{SOURCE_NAME}')
+    local_path = work_dir / 'Factory_A.xlsx'
+
+    drive.faults = [ConnectionResetError('끊김 (주입)'), socket.timeout('시간 초과 (주입)')]
+    download(drive, file, local_path, retries=2)
+    chunks = -(-SOURCE_SIZE // RANGE_SIZE)
+    results = [
+        ('일시적 오류 2회 후 같은 청크 재시도로 완료',
+         drive.calls['get_range'] == chunks + 2 and file_md5(local_path) == file['md5Checksum']),
+    ]
+
+    local_path.unlink()
+    drive.faults = [PermissionError('권한 없음 (주입)')]
+    try:
+        download(drive, file, local_path, retries=3)
+        failed = False
+    except PermissionError:
+        failed = True
+    results.append(('네트워크 외 예외는 재시도 없이 실패', failed and drive.calls['get_range'] == 1))
+    return results
+
+
+def check_metadata_404(work_dir):
+    try:
+        import httplib2
+        from googleapiclient.errors import HttpError
+    except ImportError:
+        return None
+
+    class FakeRequest:
+        def __init__(self, status):
+            self.status = status
+
+        def execute(self):
+            raise HttpError(httplib2.Response({'status': self.status}), b'{}')
+
+    class FakeFiles:
+        def __init__(self, status):
+            self.status = status
+
+        def get(self, **kwargs):
+            return FakeRequest(self.status)
+
+    class FakeService:
+        def __init__(self, status):
+            self.status = status
+
+        def files(self):
+            return FakeFiles(self.status)
+
+    storage = DriveStorage(credentials=None)
+    storage._thread_local.service = FakeService(404)
+    results = [('404 → None', storage.metadata('missing') is None)]
+
+    storage._thread_local.service = FakeService(500)
+    try:
+        storage.metadata('broken')
+        raised = False
+    except HttpError:
+        raised = True
+    results.append(('500 → 예외 전달 (캐시 미스로 오인하지 않음)', raised))
+    return results
+
+
+CHECKS = {
+    'md5-skip': check_md5_skip,
+    'file-id-cache': check_file_id_cache,
+    'resume': check_resume,
+    'retry': check_retry,
+    'metadata-404': check_metadata_404,
+}
+
+
+def main(argv=None):
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='가짜 Drive로 업로드/다운로드 캐시·재시도 동작 검증')
+    parser.add_argument('--checks', default=','.join(CHECKS),
+                        help=f'실행할 검사 (쉼표 구분, 기본: {",".join(CHECKS)})')
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.checks.split(',') if name.strip()]
+    unknown = [name for name in selected if name not in CHECKS]
+    if unknown:
+        print(f"❌ 알 수 없는 검사: {', '.join(unknown)} (가능: {', '.join(CHECKS)})")
+        return 1
+
+    print("=" * 60)
+    print("🔬 저장소 캐시 / 재시도 동작 검증 (가짜 Drive)")
+    print("=" * 60)
+
+    # 재시도 대기 시간은 검증 대상이 아니므로 최소화
+    download_from_drive.BACKOFF_BASE = 0.01
+
+    failures = 0
+    for name in selected:
+        print(f"\n▶️ {name}")
+        with tempfile.TemporaryDirectory(prefix='storage_check_') as tmp:
+            try:
+                results = CHECKS[name](Path(tmp))
+            except Exception as e:
+                print(f"   ❌ 실행 실패: {e}")
+                failures += 1
+                continue
+        if results is None:
+            print("   ⏭️ 건너뜀 (googleapiclient 미설치)")
+            continue
+        for description, ok in results:
+            print(f"   {'✅' if ok else '❌'} {description}")
+            failures += not ok
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"❌ 실패 {failures}건")
+        return 1
+    print("✅ 모든 검사 통과")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())